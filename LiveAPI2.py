@@ -13,18 +13,24 @@ pip install google-genai opencv-python pyaudio pillow mss
 
 import os
 import asyncio
-import base64
-import io
+import time
 import traceback
 
 import cv2
 from exceptiongroup import ExceptionGroup
 import pyaudio
-import PIL.Image
-import mss
 
 import argparse
 
+from frame_encoder import FrameEncoder
+from frame_filter import DEFAULT_THRESHOLD, KEYFRAME_INTERVAL, UNCHANGED, FrameChangeDetector
+from frame_scheduler import MAX_INTERVAL, MIN_INTERVAL, FrameScheduler
+from mic_capture import CallbackMicrophone
+from pipeline_metrics import DUMP_INTERVAL_S, PipelineMetrics
+from playback import PlaybackEngine
+from screen_capture import ScreenGrabber
+from uplink import COALESCE_MS, OutboundMux, is_video
+
 from google import genai
 from google.genai import types
 
@@ -64,18 +70,51 @@ pya = pyaudio.PyAudio()
 
 
 class AudioLoop:
-    def __init__(self, video_mode=DEFAULT_MODE):
+    def __init__(
+        self,
+        video_mode=DEFAULT_MODE,
+        change_threshold=DEFAULT_THRESHOLD,
+        keyframe_interval=KEYFRAME_INTERVAL,
+        min_frame_interval=MIN_INTERVAL,
+        max_frame_interval=MAX_INTERVAL,
+        coalesce_ms=COALESCE_MS,
+        metrics=None,
+    ):
         self.video_mode = video_mode
 
         self.audio_in_queue = None
-        self.out_queue = None
+        self.metrics = metrics or PipelineMetrics()
+        self.uplink = OutboundMux(coalesce_ms=coalesce_ms, metrics=self.metrics)
+        # Made afresh by each run(), since close() stops them for good.
+        self.mic = None
+        self.player = None
 
         self.session = None
+        # When the last message was sent, until the model's audio arrives.
+        self._asked_at = None
 
         self.send_text_task = None
         self.receive_audio_task = None
         self.play_audio_task = None
 
+        self.frame_encoder = FrameEncoder()
+        self.screen_grabber = ScreenGrabber()
+        self.frame_filter = FrameChangeDetector(change_threshold, keyframe_interval)
+        self.frame_scheduler = FrameScheduler(min_frame_interval, max_frame_interval)
+
+    def stats(self):
+        """Per-component counters, printed when the session ends."""
+        return {
+            "camera": self.frame_encoder.stats(),
+            "screen": self.screen_grabber.stats(),
+            "frame_filter": self.frame_filter.stats(),
+            "frame_scheduler": self.frame_scheduler.stats(),
+            "uplink": self.uplink.stats(),
+            "mic": self.mic.stats() if self.mic else None,
+            "player": self.player.stats() if self.player else None,
+            "pipeline": self.metrics.stats(),
+        }
+
     async def send_text(self):
         while True:
             text = await asyncio.to_thread(
@@ -84,28 +123,29 @@ class AudioLoop:
             )
             if text.lower() == "q":
                 break
+            self._asked_at = time.monotonic()
             await self.session.send(input=text or ".", end_of_turn=True)
 
     def _get_frame(self, cap):
-        # Read the frameq
-        ret, frame = cap.read()
-        # Check if the frame was read successfully
-        if not ret:
+        # Read into the encoder's reused buffer and JPEG-encode straight from it.
+        # OpenCV encodes BGR natively, so there is no RGB conversion (and no
+        # blue tint) to worry about.
+        frame = self.frame_encoder.grab(cap)
+        if frame is None:
             return None
-        # Fix: Convert BGR to RGB color space
-        # OpenCV captures in BGR but PIL expects RGB format
-        # This prevents the blue tint in the video feed
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = PIL.Image.fromarray(frame_rgb)  # Now using RGB frame
-        img.thumbnail([1024, 1024])
-
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
-
-        mime_type = "image/jpeg"
-        image_bytes = image_io.read()
-        return {"mime_type": mime_type, "data": base64.b64encode(image_bytes).decode()}
+        # Don't bother encoding frames that look the same as the last one sent.
+        if not self.frame_filter.should_send(frame):
+            return UNCHANGED
+        return self._encoded(self.frame_encoder, frame)
+
+    def _encoded(self, encoder, frame):
+        # A frame that failed to encode is skipped (and not made the change
+        # detector's reference); only a failed grab ends the capture loop.
+        msg = encoder.encode_message(frame)
+        if msg is None:
+            return UNCHANGED
+        self.frame_filter.commit()
+        return msg
 
     async def get_frames(self):
         # This takes about a second, and will block the whole program
@@ -115,100 +155,113 @@ class AudioLoop:
         )  # 0 represents the default camera
 
         while True:
+            self.frame_scheduler.start()
             frame = await asyncio.to_thread(self._get_frame, cap)
             if frame is None:
                 break
 
-            await asyncio.sleep(1.0)
+            if frame is not UNCHANGED:
+                self.uplink.put_video(frame)
 
-            await self.out_queue.put(frame)
+            await self.frame_scheduler.wait(self.uplink.fill())
 
         # Release the VideoCapture object
         cap.release()
 
     def _get_screen(self):
-        sct = mss.mss()
-        monitor = sct.monitors[0]
-
-        i = sct.grab(monitor)
-
-        mime_type = "image/jpeg"
-        image_bytes = mss.tools.to_png(i.rgb, i.size)
-        img = PIL.Image.open(io.BytesIO(image_bytes))
-
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
-
-        image_bytes = image_io.read()
-        return {"mime_type": mime_type, "data": base64.b64encode(image_bytes).decode()}
+        frame = self.screen_grabber.grab()
+        if not self.frame_filter.should_send(frame):
+            return UNCHANGED
+        return self._encoded(self.screen_grabber.encoder, frame)
 
     async def get_screen(self):
+        try:
+            while True:
+                self.frame_scheduler.start()
+                frame = await asyncio.to_thread(self._get_screen)
+                if frame is None:
+                    break
 
-        while True:
-            frame = await asyncio.to_thread(self._get_screen)
-            if frame is None:
-                break
-
-            await asyncio.sleep(1.0)
+                if frame is not UNCHANGED:
+                    self.uplink.put_video(frame)
 
-            await self.out_queue.put(frame)
+                await self.frame_scheduler.wait(self.uplink.fill())
+        finally:
+            self.screen_grabber.close()
 
     async def send_realtime(self):
         while True:
-            msg = await self.out_queue.get()
+            msg = await self.uplink.get()
+            start = time.monotonic()
             await self.session.send(input=msg)
+            elapsed = time.monotonic() - start
+            if is_video(msg):
+                self.frame_scheduler.record_send(elapsed)
+            self.metrics.observe("send_video" if is_video(msg) else "send_audio", elapsed)
 
     async def listen_audio(self):
-        mic_info = pya.get_default_input_device_info()
-        self.audio_stream = await asyncio.to_thread(
-            pya.open,
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=SEND_SAMPLE_RATE,
-            input=True,
-            input_device_index=mic_info["index"],
-            frames_per_buffer=CHUNK_SIZE,
-        )
-        if __debug__:
-            kwargs = {"exception_on_overflow": False}
-        else:
-            kwargs = {}
-        while True:
-            data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **kwargs)
-            await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
+        # PortAudio calls back into the mic's ring buffer on its own thread,
+        # so there's no thread-pool hop per chunk here.
+        await self.mic.open()
+        async for data in self.mic:
+            captured_at = getattr(self.mic, "captured_at", None)
+            if captured_at is not None:
+                self.metrics.since("mic_read", captured_at)
+            self.uplink.put_audio({"data": data, "mime_type": "audio/pcm"})
 
     async def receive_audio(self):
         "Background task to reads from the websocket and write pcm chunks to the output queue"
         while True:
             turn = self.session.receive()
+            speaking = False
+            last_audio_at = None
             async for response in turn:
+                content = response.server_content
+                if content and content.interrupted:
+                    # The user talked over the model. Stop playback now,
+                    # rather than when the rest of the turn has arrived.
+                    self.interrupt_playback()
+                    speaking = False
+                    continue
                 if data := response.data:
-                    self.audio_in_queue.put_nowait(data)
+                    now = time.monotonic()
+                    if not speaking:
+                        self.player.begin_utterance()
+                        speaking = True
+                        if self._asked_at is not None:
+                            self.metrics.observe("question_to_audio", now - self._asked_at)
+                            self._asked_at = None
+                    elif last_audio_at is not None:
+                        self.metrics.observe("receive_audio_gap", now - last_audio_at)
+                    last_audio_at = now
+                    self.audio_in_queue.put_nowait((now, data))
+                    self.metrics.gauge("audio_in_queue", self.audio_in_queue.qsize())
                     continue
                 if text := response.text:
                     print(text, end="")
 
-            # If you interrupt the model, it sends a turn_complete.
-            # For interruptions to work, we need to stop playback.
-            # So empty out the audio queue because it may have loaded
-            # much more audio than has played yet.
-            while not self.audio_in_queue.empty():
-                self.audio_in_queue.get_nowait()
+    def interrupt_playback(self):
+        # audio_in_queue is deliberately unbounded: receive_audio has to keep
+        # reading the websocket eagerly to see an interruption as soon as it's
+        # sent. So it's emptied here along with the player's jitter buffer.
+        while not self.audio_in_queue.empty():
+            self.audio_in_queue.get_nowait()
+        return self.player.flush()
 
     async def play_audio(self):
-        stream = await asyncio.to_thread(
-            pya.open,
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RECEIVE_SAMPLE_RATE,
-            output=True,
-        )
+        await self.player.open()
         while True:
-            bytestream = await self.audio_in_queue.get()
-            await asyncio.to_thread(stream.write, bytestream)
+            received_at, bytestream = await self.audio_in_queue.get()
+            start = time.monotonic()
+            self.metrics.observe("playout_wait", start - received_at)
+            await self.player.write(bytestream)
+            self.metrics.since("player_write", start)
 
     async def run(self):
+        self.mic = CallbackMicrophone(
+            pya, rate=SEND_SAMPLE_RATE, chunk=CHUNK_SIZE, channels=CHANNELS, fmt=FORMAT
+        )
+        self.player = PlaybackEngine(pya, rate=RECEIVE_SAMPLE_RATE, channels=CHANNELS, fmt=FORMAT)
         try:
             async with (
                 client.aio.live.connect(model=MODEL, config=CONFIG) as session,
@@ -217,7 +270,6 @@ class AudioLoop:
                 self.session = session
 
                 self.audio_in_queue = asyncio.Queue()
-                self.out_queue = asyncio.Queue(maxsize=5)
 
                 send_text_task = tg.create_task(self.send_text())
                 tg.create_task(self.send_realtime())
@@ -229,6 +281,8 @@ class AudioLoop:
 
                 tg.create_task(self.receive_audio())
                 tg.create_task(self.play_audio())
+                if self.metrics.path:
+                    tg.create_task(self.metrics.run())
 
                 await send_text_task
                 raise asyncio.CancelledError("User requested exit")
@@ -236,8 +290,13 @@ class AudioLoop:
         except asyncio.CancelledError:
             pass
         except ExceptionGroup as EG:
-            self.audio_stream.close()
             traceback.print_exception(EG)
+        finally:
+            # Stop the PortAudio streams on every exit path; a mic callback
+            # left running would call into the closed event loop.
+            self.mic.close()
+            self.player.close()
+            print(f"Session stats: {self.stats()}")
 
 
 if __name__ == "__main__":
@@ -249,6 +308,55 @@ if __name__ == "__main__":
         help="pixels to stream from",
         choices=["camera", "screen", "none"],
     )
+    parser.add_argument(
+        "--change-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="skip frames whose mean pixel difference from the last sent frame is below this",
+    )
+    parser.add_argument(
+        "--keyframe-interval",
+        type=float,
+        default=KEYFRAME_INTERVAL,
+        help="always send a frame at least this often, in seconds",
+    )
+    parser.add_argument(
+        "--min-frame-interval",
+        type=float,
+        default=MIN_INTERVAL,
+        help="fastest video capture interval, in seconds",
+    )
+    parser.add_argument(
+        "--max-frame-interval",
+        type=float,
+        default=MAX_INTERVAL,
+        help="slowest video capture interval when the uplink is busy, in seconds",
+    )
+    parser.add_argument(
+        "--coalesce-ms",
+        type=int,
+        default=COALESCE_MS,
+        help="join mic audio into sends of about this many ms (20-200, 0 to disable)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="write per-stage latency histograms and queue depths to PATH as JSON",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=DUMP_INTERVAL_S,
+        help="seconds between metrics dumps",
+    )
     args = parser.parse_args()
-    main = AudioLoop(video_mode=args.mode)
+    main = AudioLoop(
+        video_mode=args.mode,
+        change_threshold=args.change_threshold,
+        keyframe_interval=args.keyframe_interval,
+        min_frame_interval=args.min_frame_interval,
+        max_frame_interval=args.max_frame_interval,
+        coalesce_ms=args.coalesce_ms,
+        metrics=PipelineMetrics(args.metrics, args.metrics_interval),
+    )
     asyncio.run(main.run())
@@ -0,0 +1,17 @@
+"""
+Shared by the benchmarks that run LiveInterviewAgent sessions against fake_live.
+"""
+
+import asyncio
+import contextlib
+import io
+
+
+def run_quietly(coro):
+    """asyncio.run(coro) with stdout discarded.
+
+    The agents print every question and answer, which would bury the
+    benchmark's own table.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(coro)
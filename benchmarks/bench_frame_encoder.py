@@ -0,0 +1,102 @@
+"""
+Micro-benchmark: per-frame encode time and bytes allocated for camera frames.
+
+Compares the original PIL/base64 path against frame_encoder.FrameEncoder on
+synthetic 1280x720 BGR frames (or real ones with --camera).
+
+    python benchmarks/bench_frame_encoder.py --frames 200
+"""
+
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+import PIL.Image
+
+from frame_encoder import FrameEncoder
+
+
+def legacy_encode(frame):
+    """The original _get_frame body, minus the camera read."""
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    img = PIL.Image.fromarray(frame_rgb)
+    img.thumbnail([1024, 1024])
+    image_io = io.BytesIO()
+    img.save(image_io, format="jpeg")
+    image_io.seek(0)
+    image_bytes = image_io.read()
+    return {"mime_type": "image/jpeg", "data": base64.b64encode(image_bytes).decode()}
+
+
+def synthetic_frames(count, width, height):
+    # A moving gradient with noise, so the JPEG encoder has real work to do.
+    rng = np.random.default_rng(0)
+    base = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    base = np.broadcast_to(base, (height, width, 3))
+    noise = rng.integers(0, 32, size=(height, width, 3), dtype=np.uint8)
+    for i in range(count):
+        yield (np.roll(base, i * 7, axis=1).astype(np.uint8) + noise)
+
+
+def measure(name, encode, frames):
+    tracemalloc.start()
+    allocated = 0
+    elapsed = 0.0
+    for frame in frames:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        msg = encode(frame)
+        elapsed += time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+        del msg
+    tracemalloc.stop()
+    n = len(frames)
+    print(f"{name:>8}: {1000 * elapsed / n:7.2f} ms/frame, "
+          f"{allocated / n / 1024:9.1f} KiB peak allocated/frame")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--camera", action="store_true", help="use camera 0 instead of synthetic frames")
+    args = parser.parse_args()
+
+    if args.camera:
+        cap = cv2.VideoCapture(0)
+        frames = []
+        for _ in range(args.frames):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    else:
+        frames = list(synthetic_frames(args.frames, args.width, args.height))
+    if not frames:
+        sys.exit("No frames captured.")
+
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}")
+    encoder = FrameEncoder()
+    # Warm up both paths so one-off buffer allocations don't skew the numbers.
+    legacy_encode(frames[0])
+    encoder.encode_message(frames[0])
+
+    measure("legacy", legacy_encode, frames)
+    measure("encoder", encoder.encode_message, frames)
+    print("encoder stats:", encoder.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Inter-turn gap with and without speculative follow-up generation.
+
+Runs an InterviewPlan of generated follow-up questions against fake_live.
+The candidate's answers stream in as a word every --word-interval seconds
+over --answer seconds of audio, and every follow-up takes FakeQuestionGenerator
+--latency seconds to phrase. Sequentially, each gap is about the generator's
+latency. Speculatively, the follow-up is ready (or nearly) when the answer
+ends. Reports the gap percentiles, where each question came from, and how
+many generations were started and cancelled.
+
+    python benchmarks/bench_interview_plan.py --latency 1.5 --answer 4 --questions 4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _quiet import run_quietly
+from fake_live import FakeLiveClient, FakeMicrophone, FakeQuestionGenerator, NullSpeaker
+from interview_plan import InterviewPlan, Question
+from session_host import SessionHost
+
+
+def make_questions(n):
+    questions = [Question("q0", "Tell me about a project you're proud of.", next="q1")]
+    for i in range(1, n + 1):
+        questions.append(Question(f"q{i}", follow_up=f"Follow-up {i}.",
+                                  next=f"q{i + 1}" if i < n else "closing"))
+    questions.append(Question("closing", "Thank you. That concludes our interview.", listen=False))
+    return questions
+
+
+async def run(args, speculate):
+    client = FakeLiveClient(question_audio_s=1.0, answer_after_s=args.answer,
+                            words_every_s=args.word_interval)
+    generator = FakeQuestionGenerator(args.latency)
+    plan = InterviewPlan(make_questions(args.questions), generator=generator,
+                         refine_chars=args.refine_chars, speculate=speculate, linger_s=0.5)
+    host = SessionHost(genai_client=client)
+    agent = host.create_agent(audio_source=FakeMicrophone(), audio_sink=NullSpeaker(), video_mode="none")
+    report = await host.run_session(agent, plan)
+    stats = plan.stats()
+    stats["calls"] = generator.calls
+    stats["error"] = report.error
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=1.5, help="seconds per generated follow-up")
+    parser.add_argument("--answer", type=float, default=4.0, help="seconds of audio per answer")
+    parser.add_argument("--word-interval", type=float, default=0.3, help="seconds between transcript words")
+    parser.add_argument("--questions", type=int, default=4, help="generated follow-ups per interview")
+    parser.add_argument("--refine-chars", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'':>12} {'gap p50 ms':>11} {'gap max ms':>11} {'calls':>6} {'cancelled':>10}  sources")
+    for speculate in (False, True):
+        r = run_quietly(run(args, speculate))
+        print(f"{'speculative' if speculate else 'sequential':>12} {r['gap']['p50_ms']:11.1f} "
+              f"{r['gap']['max_ms']:11.1f} {r['calls']:6d} {r['cancelled']:10d}  {r['sources']}"
+              + (f"  error: {r['error']}" if r["error"] else ""))
+
+
+if __name__ == "__main__":
+    main()
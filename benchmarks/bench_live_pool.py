@@ -0,0 +1,109 @@
+"""
+Time-to-first-question with and without a pre-warmed Live session pool.
+
+Candidates arrive every --interval seconds and each runs a short interview
+against fake_live, whose connect() takes --connect-latency seconds (the
+websocket and setup handshake). Time-to-first-question is measured from
+run_interview_session() being called to the first byte of the greeting
+reaching the speaker. With the pool, the handshake is paid in the
+background, so the interview only waits for the hand-off.
+
+The fake server drops sessions idle for --idle-timeout seconds. The pool
+replaces warm sessions after --max-idle seconds, so set that below the
+timeout. "replaced" counts those. An interview that never heard its
+greeting, e.g. because it was handed a session the server had dropped,
+counts as "failed".
+
+    python benchmarks/bench_live_pool.py --connect-latency 0.8 --interviews 8 --interval 3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _quiet import run_quietly
+from fake_live import FakeLiveClient, FakeMicrophone, NullSpeaker
+from live_pool import LiveSessionPool
+from session_host import SessionHost
+
+
+class TimedSpeaker(NullSpeaker):
+    """NullSpeaker that remembers when the first audio arrived."""
+
+    def __init__(self):
+        super().__init__()
+        self.first_audio = None
+
+    async def write(self, data):
+        if self.first_audio is None:
+            self.first_audio = time.monotonic()
+        await super().write(data)
+
+
+async def script(agent):
+    await agent.ask_question("Hello, and welcome. Could you introduce yourself?")
+    await agent.listen_for_answer(timeout=30)
+
+
+async def interview(host, i, speaker):
+    agent = host.create_agent(audio_source=FakeMicrophone(seed=i), audio_sink=speaker, video_mode="none")
+    start = time.monotonic()
+    report = await host.run_session(agent, script)
+    ttfq = speaker.first_audio - start if speaker.first_audio is not None else None
+    return ttfq, report
+
+
+async def run(args, pooled):
+    client = FakeLiveClient(connect_latency_s=args.connect_latency, question_audio_s=1.0,
+                            answer_after_s=1.0, idle_timeout_s=args.idle_timeout)
+    pool = None
+    if pooled:
+        pool = LiveSessionPool(lambda: client.aio.live.connect(), size=args.size, max_idle_s=args.max_idle)
+        await pool.start()
+        await asyncio.sleep(args.connect_latency + 0.1)  # the pool warms up before the first candidate
+    host = SessionHost(genai_client=client, session_pool=pool)
+
+    tasks = []
+    for i in range(args.interviews):
+        tasks.append(asyncio.create_task(interview(host, i, TimedSpeaker())))
+        await asyncio.sleep(args.interval)
+    results = await asyncio.gather(*tasks)
+    if pool is not None:
+        await pool.close()
+
+    ttfq = sorted(t for t, _ in results if t is not None)
+    return {
+        "ttfq_p50_ms": 1000 * ttfq[len(ttfq) // 2] if ttfq else float("nan"),
+        "ttfq_max_ms": 1000 * ttfq[-1] if ttfq else float("nan"),
+        "failed": sum(1 for t, report in results if t is None or report.error),
+        "pool": pool.stats() if pool is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connect-latency", type=float, default=0.8, help="seconds per connect handshake")
+    parser.add_argument("--interviews", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=3.0, help="seconds between candidates")
+    parser.add_argument("--size", type=int, default=2, help="warm sessions to keep")
+    parser.add_argument("--idle-timeout", type=float, default=10.0, help="fake server's idle limit, seconds")
+    parser.add_argument("--max-idle", type=float, default=6.0, help="pool's replacement age, seconds")
+    args = parser.parse_args()
+
+    print(f"{'':>8} {'TTFQ p50 ms':>12} {'TTFQ max ms':>12} {'failed':>7}")
+    for pooled in (False, True):
+        r = run_quietly(run(args, pooled))
+        print(f"{'pool' if pooled else 'connect':>8} {r['ttfq_p50_ms']:12.1f} {r['ttfq_max_ms']:12.1f} {r['failed']:7d}")
+        if r["pool"]:
+            p = r["pool"]
+            print(f"  connect p50 {p['connect']['p50_ms']} ms, hand-off p50 {p['handoff']['p50_ms']} ms / "
+                  f"p99 {p['handoff']['p99_ms']} ms, hits {p['hits']}, misses {p['misses']}, "
+                  f"replaced {p['replaced']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+End-of-speech-to-text latency with and without incremental log-mel extraction.
+
+Replays a 16 kHz mono 16-bit WAV through the same VAD + SpeechSegmenter path
+as openai-whisper.py. For every utterance it times what's left to do once
+end of speech is detected:
+
+- baseline: transcribe() on the utterance (log-mel + decode)
+- incremental: IncrementalLogMel.finish() + decode_features(), with the
+  per-frame feed() cost (paid while the speaker talks) reported separately
+
+It also checks the incremental log-mel against whisper.log_mel_spectrogram.
+
+    python benchmarks/bench_logmel.py answer.wav --model small.en
+"""
+
+import argparse
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+from whisper import load_model, log_mel_spectrogram, pad_or_trim, transcribe
+from whisper.audio import HOP_LENGTH, N_SAMPLES
+
+from vad import SpeechClassifier, SpeechSegmenter
+from whisper_features import IncrementalLogMel, decode_features
+
+RATE = 16000
+FRAME_DURATION_MS = 30
+CHUNK_SIZE = RATE * FRAME_DURATION_MS // 1000
+WINDOW = 700 // FRAME_DURATION_MS
+
+
+def read_wav(path):
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            sys.exit("Expected a 16 kHz mono 16-bit WAV.")
+        return wav.readframes(wav.getnframes())
+
+
+def frames(pcm):
+    size = CHUNK_SIZE * 2
+    for offset in range(0, len(pcm) - size + 1, size):
+        yield pcm[offset:offset + size]
+
+
+def utterances(pcm, n_mels):
+    """Yields (utterance, incremental mel, seconds spent in feed()) per utterance."""
+    vad = SpeechClassifier(RATE)
+    segmenter = SpeechSegmenter(CHUNK_SIZE, WINDOW, rate=RATE)
+    features = IncrementalLogMel(n_mels)
+    for frame in frames(pcm):
+        utterance = segmenter.push(frame, vad.is_speech(frame))
+        start = time.perf_counter()
+        if segmenter.speech_started:
+            features.reset()
+            feed_s = 0.0
+            features.feed(segmenter.current())
+        elif segmenter.triggered or utterance is not None:
+            features.feed(frame)
+        if segmenter.triggered or utterance is not None:
+            feed_s += time.perf_counter() - start
+        if utterance is not None:
+            yield utterance, features, feed_s
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wav")
+    parser.add_argument("--model", default="small.en")
+    args = parser.parse_args()
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = load_model(args.model, device=device)
+    fp16 = torch.cuda.is_available()
+    pcm = read_wav(args.wav)
+
+    # Warm up both paths so the first utterance doesn't pay for lazy init.
+    silence = np.zeros(RATE, dtype=np.float32)
+    transcribe(model, silence, language="en", fp16=fp16)
+    decode_features(model, pad_or_trim(log_mel_spectrogram(silence, model.dims.n_mels)).numpy(), fp16)
+
+    rows = []
+    for utterance, features, feed_s in utterances(pcm, model.dims.n_mels):
+        audio = utterance.astype(np.float32) / 32768.0
+
+        start = time.perf_counter()
+        baseline = transcribe(model, audio, language="en", fp16=fp16)["text"].strip()
+        baseline_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mel = features.finish()
+        finish_s = time.perf_counter() - start
+        if mel is None:
+            print(f"  skipping {len(audio) / RATE:.1f}s utterance (over 30 s)")
+            continue
+        start = time.perf_counter()
+        text = decode_features(model, mel, fp16)
+        decode_s = time.perf_counter() - start
+
+        content = len(audio) // HOP_LENGTH
+        reference = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)[:, :content]
+        error = np.abs(mel[:, :content] - reference.numpy()).max() if content else 0.0
+
+        rows.append((len(audio) / RATE, baseline_s, finish_s + decode_s, finish_s, feed_s))
+        print(f"{len(audio) / RATE:5.1f}s  baseline {baseline_s * 1000:7.1f} ms  "
+              f"incremental {(finish_s + decode_s) * 1000:7.1f} ms "
+              f"(finish {finish_s * 1000:.2f} ms, feed during speech {feed_s * 1000:.1f} ms)  "
+              f"max mel error {error:.1e}")
+        if text != baseline:
+            print(f"  baseline:    {baseline!r}\n  incremental: {text!r}")
+
+    if rows:
+        rows = np.array(rows)
+        print(f"\n{len(rows)} utterances, mean end-of-speech-to-text: "
+              f"baseline {rows[:, 1].mean() * 1000:.1f} ms, "
+              f"incremental {rows[:, 2].mean() * 1000:.1f} ms "
+              f"(mean finish {rows[:, 3].mean() * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
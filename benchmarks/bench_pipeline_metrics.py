@@ -0,0 +1,85 @@
+"""
+Cost of PipelineMetrics, and what it reports for a fake session.
+
+First times observe(), since() and gauge() in a tight loop. An agent makes
+a few dozen of these calls per second of audio (plus a few per video frame),
+so the per-call cost puts the overhead of leaving metrics on in context.
+Then runs one LiveInterviewAgent session against fake_live, with synthetic
+video, dumping to a temporary JSON file, and prints each stage's summary
+from that file.
+
+    python benchmarks/bench_pipeline_metrics.py --duration 10 --video
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _quiet import run_quietly
+from fake_live import FakeLiveClient, FakeMicrophone, NullSpeaker, SyntheticVideoSource
+from pipeline_metrics import PipelineMetrics
+from session_host import SessionHost
+
+CALLS = 200_000
+
+
+def per_call_ns(stmt, metrics):
+    seconds = min(timeit.repeat(stmt, globals={"m": metrics, "time": time}, number=CALLS, repeat=3))
+    return 1e9 * seconds / CALLS
+
+
+async def session(path, duration, video):
+    client = FakeLiveClient(question_audio_s=2.0, answer_after_s=3.0, response_latency_s=0.3)
+    metrics = PipelineMetrics(path, interval_s=1.0)
+    host = SessionHost(genai_client=client)
+    agent = host.create_agent(audio_source=FakeMicrophone(), audio_sink=NullSpeaker(),
+                              video_mode="camera" if video else "none",
+                              video_source=SyntheticVideoSource() if video else None,
+                              metrics=metrics)
+
+    async def script(agent):
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            await agent.ask_question("Tell me about a project you're proud of.")
+            await agent.listen_for_answer(timeout=30)
+
+    report = await host.run_session(agent, script)
+    return report, metrics.dumps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of fake session")
+    parser.add_argument("--video", action="store_true", help="stream synthetic video too")
+    args = parser.parse_args()
+
+    m = PipelineMetrics()
+    for name, stmt in [("observe()", "m.observe('stage', 0.0123)"),
+                       ("since()", "m.since('stage', 0.0)"),
+                       ("gauge()", "m.gauge('depth', 3)")]:
+        print(f"{name:<10} {per_call_ns(stmt, m):7.0f} ns/call")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "metrics.json")
+        report, dumps = run_quietly(session(path, args.duration, args.video))
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+
+    print(f"\nsession error: {report.error}, dumps written: {dumps}")
+    print(f"{'stage':>20} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, s in snapshot["stages"].items():
+        print(f"{name:>20} {s['count']:7d} {s['p50_ms']:9.3f} {s['p99_ms']:9.3f} {s['max_ms']:9.3f}")
+    print(f"{'gauge':>20} {'last':>7} {'max':>9} {'mean':>9}")
+    for name, g in snapshot["gauges"].items():
+        print(f"{name:>20} {g['last']:7d} {g['max']:9d} {g['mean']:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Time to the greeting's first audio, with and without the prompt audio cache.
+
+Runs back-to-back interviews against fake_live, whose sessions start speaking
+--response-latency seconds after a question is sent (the round trip to the
+model). The first interview records the greeting and closing lines into a
+fresh PromptAudioCache. Later ones play them from the cache, so the greeting
+should start with no round trip. The fake session should also have been told
+what was said, once per cached line.
+
+    python benchmarks/bench_prompt_cache.py --response-latency 0.6 --interviews 3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _quiet import run_quietly
+from fake_live import FakeLiveClient, FakeMicrophone, NullSpeaker
+from prompt_cache import PromptAudioCache
+from session_host import SessionHost
+
+GREETING = "Hello, thank you for joining. To start, could you please tell me about yourself?"
+CLOSING = "Thank you. That concludes our interview."
+
+
+class TimedSpeaker(NullSpeaker):
+    """NullSpeaker that remembers when the first audio arrived."""
+
+    def __init__(self):
+        super().__init__()
+        self.first_audio = None
+
+    async def write(self, data):
+        if self.first_audio is None:
+            self.first_audio = time.monotonic()
+        await super().write(data)
+
+
+def make_script(speaker, latencies):
+    async def script(agent):
+        start = time.monotonic()
+        await agent.ask_question(GREETING, cache=True)
+        await agent.listen_for_answer(timeout=30)
+        latencies.append(speaker.first_audio - start)
+        await agent.ask_question(CLOSING, cache=True)
+        await asyncio.sleep(2.0)  # let the closing line play (and be recorded)
+    return script
+
+
+async def interview(args, cache, i):
+    # The candidate answers only after the greeting has finished.
+    client = FakeLiveClient(question_audio_s=1.0, answer_after_s=2.0,
+                            response_latency_s=args.response_latency)
+    host = SessionHost(genai_client=client)
+    speaker, latencies = TimedSpeaker(), []
+    agent = host.create_agent(audio_source=FakeMicrophone(seed=i), audio_sink=speaker,
+                              video_mode="none", prompt_cache=cache)
+    before = dict(cache.stats())
+    report = await host.run_session(agent, make_script(speaker, latencies))
+    after = cache.stats()
+    return {
+        "greeting_ms": 1000 * latencies[0] if latencies else float("nan"),
+        "hits": after["hits"] - before["hits"],
+        "stores": after["stores"] - before["stores"],
+        "told": len(client.sessions[0].client_turns),
+        "error": report.error,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--response-latency", type=float, default=0.6, help="model round trip, seconds")
+    parser.add_argument("--interviews", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'run':>4} {'greeting ms':>12} {'hits':>5} {'stores':>7} {'told':>5}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PromptAudioCache(directory)
+        for i in range(args.interviews):
+            r = run_quietly(interview(args, cache, i))
+            print(f"{i + 1:4d} {r['greeting_ms']:12.1f} {r['hits']:5d} {r['stores']:7d} {r['told']:5d}"
+                  + (f"  error: {r['error']}" if r["error"] else ""))
+        print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Stream rotation check for googleAPI.ResumableRecognizer, against fake_speech.
+
+Simulates a long interview (45 minutes by default), sped up, through the
+fake recognizer. Streams age by the audio sent to them, so the real limits
+apply at any speed. It reports:
+
+- rotations and the most audio any stream carried (must stay under the limit)
+- audio replayed into new streams, and audio that aged out of the replay
+  buffer (MAX_REPLAY_S) before a final result covered it; that audio is
+  only lost if a rotation happens before its final arrives
+- whether the stitched transcript has every chunk exactly once, in order
+- the worst offset error of stitched result end times
+
+    python benchmarks/bench_rollover.py --minutes 45 --speed 300
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_speech import FakeAudioSource, FakeSpeechAsyncClient
+from googleAPI import PREWARM_S, STREAM_LIMIT_S, ResumableRecognizer
+
+SERVER_LIMIT_S = 305
+CHUNK_MS = 100
+
+
+async def run(minutes, speed, final_every):
+    chunks = int(minutes * 60 * 1000 / CHUNK_MS)
+    source = FakeAudioSource(chunks, chunk_ms=CHUNK_MS, speed=speed)
+    client = FakeSpeechAsyncClient(max_stream_s=SERVER_LIMIT_S, final_every=final_every)
+    recognizer = ResumableRecognizer(source, client=client,
+                                     stream_limit_s=STREAM_LIMIT_S, prewarm_s=PREWARM_S)
+    await recognizer.run()
+
+    words = " ".join(r.transcript for r in recognizer.results).split()
+    expected = [f"w{i}" for i in range(chunks)]
+    # Each final ends on a chunk boundary; the stitched time should be that
+    # chunk's end in audio time.
+    offset_error = max(
+        (abs(r.end_ms - (int(r.transcript.split()[-1][1:]) + 1) * CHUNK_MS) for r in recognizer.results),
+        default=0.0,
+    )
+    longest_s = max(s["audio_ms"] for s in client.streams) / 1000
+    stats = recognizer.stats()
+    print(f"{minutes} min of audio at {speed}x: {stats['streams']} streams, {stats['rotations']} rotations, "
+          f"{stats['replayed_ms'] / 1000:.1f}s replayed, {stats['truncated_ms'] / 1000:.1f}s aged out of the replay buffer")
+    print(f"longest stream: {longest_s:.0f}s of audio, {SERVER_LIMIT_S}s allowed")
+    print(f"transcript: {len(words)} words, {'complete and in order' if words == expected else 'MISMATCH'}")
+    if words != expected:
+        missing = sorted(set(expected) - set(words), key=lambda w: int(w[1:]))
+        print(f"  missing {len(missing)} (first: {missing[:5]}), duplicates {len(words) - len(set(words))}")
+    print(f"worst stitched offset error: {offset_error:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=45)
+    parser.add_argument("--speed", type=float, default=300,
+                        help="how much faster than real time to play the audio")
+    parser.add_argument("--final-every", type=int, default=37,
+                        help="chunks per final result from the fake recognizer")
+    args = parser.parse_args()
+    asyncio.run(run(args.minutes, args.speed, args.final_every))
+
+
+if __name__ == "__main__":
+    main()
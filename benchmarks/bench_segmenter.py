@@ -0,0 +1,106 @@
+"""
+Replays hours of synthetic VAD-labelled audio through the endpointing logic.
+
+Compares the original loop from openai-whisper.py main() (deque of
+(bytes, bool), recounted with a list comprehension every frame) against
+vad.SpeechSegmenter, and checks that both cut the same utterances.
+
+    python benchmarks/bench_segmenter.py --hours 2
+"""
+
+import argparse
+import collections
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from vad import SILENCE_THRESHOLD_MS, SpeechSegmenter
+
+RATE = 16000
+FRAME_DURATION_MS = 30
+CHUNK_SIZE = RATE * FRAME_DURATION_MS // 1000
+WINDOW = SILENCE_THRESHOLD_MS // FRAME_DURATION_MS
+
+
+def labelled_frames(hours, seed=0):
+    """Alternating talk/pause runs, like an interview answer, with VAD noise."""
+    rng = np.random.default_rng(seed)
+    n_frames = int(hours * 3600 * 1000 / FRAME_DURATION_MS)
+    labels = np.empty(n_frames, dtype=bool)
+    i = 0
+    speech = False
+    while i < n_frames:
+        run = int(rng.exponential(60 if speech else 40)) + 1
+        labels[i:i + run] = speech
+        speech = not speech
+        i += run
+    labels ^= rng.random(n_frames) < 0.05  # occasional misclassified frames
+    # A handful of distinct frames is enough; the content doesn't matter here.
+    frames = [rng.integers(-3000, 3000, CHUNK_SIZE, dtype=np.int16).tobytes() for _ in range(16)]
+    return [(frames[j % 16], bool(labels[j])) for j in range(n_frames)]
+
+
+def legacy(stream):
+    ring_buffer = collections.deque(maxlen=WINDOW)
+    triggered = False
+    speech_buffer = []
+    lengths = []
+    for frame, is_speech in stream:
+        if not triggered:
+            ring_buffer.append((frame, is_speech))
+            num_voiced = len([f for f, speech in ring_buffer if speech])
+            if num_voiced > 0.8 * ring_buffer.maxlen:
+                triggered = True
+                speech_buffer.extend([f for f, _ in ring_buffer])
+                ring_buffer.clear()
+        else:
+            speech_buffer.append(frame)
+            ring_buffer.append((frame, is_speech))
+            num_unvoiced = len([f for f, speech in ring_buffer if not speech])
+            if num_unvoiced > 0.9 * ring_buffer.maxlen:
+                audio = np.frombuffer(b"".join(speech_buffer), dtype=np.int16)
+                lengths.append(len(audio))
+                triggered = False
+                speech_buffer.clear()
+                ring_buffer.clear()
+    return lengths
+
+
+def segmenter(stream):
+    seg = SpeechSegmenter(CHUNK_SIZE, WINDOW, rate=RATE)
+    lengths = []
+    for frame, is_speech in stream:
+        utterance = seg.push(frame, is_speech)
+        if utterance is not None:
+            lengths.append(len(utterance))
+    return lengths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stream = labelled_frames(args.hours)
+    audio_seconds = len(stream) * FRAME_DURATION_MS / 1000
+    print(f"{args.hours:g} h of audio, {len(stream)} frames")
+
+    results = {}
+    for name, run in [("legacy", legacy), ("segmenter", segmenter)]:
+        start = time.perf_counter()
+        results[name] = run(stream)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {elapsed:6.2f} s, {1e6 * elapsed / len(stream):6.2f} us/frame, "
+              f"{audio_seconds / elapsed:8.0f}x real time, {len(results[name])} utterances")
+
+    if results["legacy"] != results["segmenter"]:
+        sys.exit("Mismatch: the segmenter cut different utterances than the legacy loop.")
+    print("Utterances match.")
+
+
+if __name__ == "__main__":
+    main()
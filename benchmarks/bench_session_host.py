@@ -0,0 +1,104 @@
+"""
+Load test: how many LiveInterviewAgent sessions one core can host.
+
+Runs N concurrent sessions in one SessionHost against fake_live (no network,
+no audio devices): real-time paced mic audio, the model's audio consumed at
+real-time rate, and optionally synthetic 1280x720 video through the real
+change detector and JPEG encoder. Each session asks questions and waits for
+answers for --duration seconds. For each N it reports:
+
+- CPU seconds used per session-second, and the sessions one core could
+  sustain at that rate,
+- event loop lag (how late a 10 ms ticker wakes up), which is where an
+  overloaded host shows first,
+- answers completed, as a sanity check that sessions made progress.
+
+    python benchmarks/bench_session_host.py --sessions 1 4 16 32 --duration 20 --video
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _quiet import run_quietly
+from fake_live import FakeLiveClient, FakeMicrophone, NullSpeaker, SyntheticVideoSource
+from session_host import SessionHost
+
+TICK_S = 0.010
+
+
+async def measure_lag(samples, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK_S)
+        samples.append(loop.time() - start - TICK_S)
+
+
+def make_script(duration, answers):
+    async def script(agent):
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            await agent.ask_question("Tell me about a project you're proud of.")
+            await agent.listen_for_answer(timeout=30)
+            answers.append(1)
+    return script
+
+
+async def run(n, duration, video):
+    client = FakeLiveClient(question_audio_s=2.0, answer_after_s=3.0)
+    host = SessionHost(genai_client=client)
+    answers = []
+    script = make_script(duration, answers)
+    sessions = [
+        (host.create_agent(
+            audio_source=FakeMicrophone(seed=i),
+            audio_sink=NullSpeaker(),
+            video_mode="camera" if video else "none",
+            video_source=SyntheticVideoSource() if video else None,
+        ), script)
+        for i in range(n)
+    ]
+
+    lag, stop = [], asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(lag, stop))
+    wall, cpu = time.perf_counter(), time.process_time()
+    await host.run(sessions)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    stop.set()
+    await ticker
+
+    lag.sort()
+    per_session = cpu / (wall * n)
+    return {
+        "sessions": n,
+        "cpu_per_session_s": per_session,
+        "sessions_per_core": 1 / per_session if per_session else float("inf"),
+        "lag_p50_ms": 1000 * lag[len(lag) // 2],
+        "lag_p99_ms": 1000 * lag[int(0.99 * (len(lag) - 1))],
+        "answers": len(answers),
+        "failed": host.stats()["failed"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per run")
+    parser.add_argument("--video", action="store_true", help="stream synthetic video from every session")
+    args = parser.parse_args()
+
+    print(f"{'sessions':>8} {'CPU s/session-s':>16} {'sessions/core':>14} "
+          f"{'lag p50 ms':>11} {'lag p99 ms':>11} {'answers':>8} {'failed':>7}")
+    for n in args.sessions:
+        r = run_quietly(run(n, args.duration, args.video))
+        print(f"{r['sessions']:8d} {r['cpu_per_session_s']:16.4f} {r['sessions_per_core']:14.1f} "
+              f"{r['lag_p50_ms']:11.2f} {r['lag_p99_ms']:11.2f} {r['answers']:8d} {r['failed']:7d}")
+
+
+if __name__ == "__main__":
+    main()
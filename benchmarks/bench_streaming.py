@@ -0,0 +1,110 @@
+"""
+Time-to-first-word and final latency: batch vs streaming Whisper transcription.
+
+Replays a 16 kHz mono 16-bit WAV through the same VAD + SpeechSegmenter path
+as openai-whisper.py, on a simulated clock: audio arrives in real time, and
+each decode occupies the (single) decoder for as long as it actually took.
+
+- batch: one transcribe() per utterance after end of speech (current default)
+- stream: whisper_stream.StreamingTranscriber partials while speech is ongoing
+
+    python benchmarks/bench_streaming.py answer.wav --model small.en
+"""
+
+import argparse
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+from whisper import load_model, transcribe
+
+from vad import SpeechClassifier, SpeechSegmenter
+from whisper_stream import StreamingTranscriber
+
+RATE = 16000
+FRAME_DURATION_MS = 30
+CHUNK_SIZE = RATE * FRAME_DURATION_MS // 1000
+WINDOW = 700 // FRAME_DURATION_MS
+
+
+def read_wav(path):
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            sys.exit("Expected a 16 kHz mono 16-bit WAV.")
+        return wav.readframes(wav.getnframes())
+
+
+def frames(pcm):
+    size = CHUNK_SIZE * 2
+    for offset in range(0, len(pcm) - size + 1, size):
+        yield offset // 2 / RATE + FRAME_DURATION_MS / 1000, pcm[offset:offset + size]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(pcm, model, fp16, streaming):
+    vad = SpeechClassifier(RATE)
+    segmenter = SpeechSegmenter(CHUNK_SIZE, WINDOW, rate=RATE)
+    streamer = StreamingTranscriber(model, rate=RATE, fp16=fp16) if streaming else None
+    busy_until = 0.0  # simulated time the decoder is free again
+    results = []
+    for now, frame in frames(pcm):
+        utterance = segmenter.push(frame, vad.is_speech(frame))
+        if segmenter.speech_started:
+            speech_start = now - len(segmenter.current()) / RATE
+            first_text = None
+        if utterance is None:
+            if streamer and segmenter.triggered and now >= busy_until:
+                partial, took = timed(streamer.update, segmenter.current())
+                if partial is not None:
+                    busy_until = now + took
+                    if first_text is None and (partial.committed or partial.tentative):
+                        first_text = busy_until
+            continue
+
+        if streamer:
+            text, took = timed(streamer.finish, utterance)
+        else:
+            audio = utterance.astype(np.float32) / 32768.0
+            result, took = timed(lambda: transcribe(model, audio, language="en", fp16=fp16))
+            text = result["text"].strip()
+        done = max(now, busy_until) + took
+        busy_until = done
+        if first_text is None:
+            first_text = done
+        results.append((first_text - speech_start, done - now, text))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wav")
+    parser.add_argument("--model", default="small.en")
+    args = parser.parse_args()
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = load_model(args.model, device=device)
+    pcm = read_wav(args.wav)
+    fp16 = torch.cuda.is_available()
+
+    for name, streaming in [("batch", False), ("stream", True)]:
+        results = run(pcm, model, fp16, streaming)
+        print(f"\n{name}: {len(results)} utterances")
+        for first, final, text in results:
+            print(f"  first text {first:6.2f}s  final {final:6.2f}s  {text[:60]!r}")
+        if results:
+            print(f"  mean first text {np.mean([r[0] for r in results]):.2f}s, "
+                  f"mean final {np.mean([r[1] for r in results]):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Whisper on CPU: real-time factor, memory and word error rate per size/precision.
+
+Runs every combination of --models and --precisions over a sample set, each
+in a fresh process so memory figures don't bleed into each other:
+
+- RTF: transcription time / audio duration (below 1.0 keeps up with speech)
+- model MB: serialized weights; peak RSS MB: the whole worker process
+- WER: word error rate against the reference transcripts, after Whisper's
+  English text normalizer
+
+The sample set is a directory of 16 kHz mono 16-bit WAVs, each with a
+same-named .txt reference (see benchmarks/samples/README.md). Without one
+(or with --synthetic) it runs on a generated, deterministic set of
+speech-like audio instead. That has the sizes and shape of interview
+answers but no words, so it gives RTF and memory only: WER is n/a, and RTF
+is optimistic, since Whisper decodes few tokens from it.
+
+    python benchmarks/bench_whisper_cpu.py --models base.en small.en --threads 4
+"""
+
+import argparse
+import concurrent.futures
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+from whisper import transcribe
+from whisper.normalizers import EnglishTextNormalizer
+
+from whisper_runtime import PRECISIONS, load_whisper
+
+RATE = 16000
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+SYNTHETIC_SECONDS = (5, 15, 30, 60)  # answers of a few seconds to a minute
+
+
+def load_samples(directory):
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".wav"):
+            continue
+        base = os.path.join(directory, name[:-4])
+        if not os.path.exists(base + ".txt"):
+            print(f"skipping {name}: no {name[:-4]}.txt reference")
+            continue
+        with wave.open(base + ".wav", "rb") as wav:
+            if wav.getframerate() != RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                sys.exit(f"{name}: expected a 16 kHz mono 16-bit WAV.")
+            pcm = wav.readframes(wav.getnframes())
+        with open(base + ".txt", encoding="utf-8") as f:
+            reference = f.read().strip()
+        samples.append((name, np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0, reference))
+    return samples
+
+
+def synthetic_samples(seed=0):
+    """Voiced "syllables" in phrases separated by pauses, with no reference text."""
+    rng = np.random.default_rng(seed)
+    samples = []
+    for seconds in SYNTHETIC_SECONDS:
+        audio = rng.normal(0, 0.003, seconds * RATE).astype(np.float32)
+        t = int(rng.uniform(0.2, 0.5) * RATE)
+        while t < len(audio):
+            for _ in range(rng.integers(3, 12)):
+                n = min(int(rng.uniform(0.12, 0.3) * RATE), len(audio) - t)
+                # A gliding pitch with a few harmonics, under a smooth envelope.
+                f0 = rng.uniform(100, 220) * np.linspace(1.0, rng.uniform(0.85, 1.15), n)
+                phase = 2 * np.pi * np.cumsum(f0) / RATE
+                voiced = sum(np.sin(h * phase) / h for h in range(1, 6))
+                audio[t:t + n] += 0.1 * np.hanning(n) * voiced
+                t += n
+            t += int(rng.uniform(0.2, 0.8) * RATE)
+        samples.append((f"synthetic-{seconds}s", audio, ""))
+    return samples
+
+
+def word_errors(reference, hypothesis):
+    """Word-level Levenshtein distance."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+
+def model_megabytes(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2**20
+
+
+def run_config(model_size, precision, threads, samples):
+    """Worker-process body: one size/precision over the whole sample set."""
+    start = time.perf_counter()
+    model = load_whisper(model_size, "cpu", precision, threads)
+    load_s = time.perf_counter() - start
+    transcribe(model, np.zeros(RATE, dtype=np.float32), language="en", fp16=False)  # warm-up
+
+    normalize = EnglishTextNormalizer()
+    audio_s = decode_s = 0.0
+    errors = words = 0
+    for _, audio, reference in samples:
+        start = time.perf_counter()
+        text = transcribe(model, audio, language="en", fp16=False)["text"]
+        decode_s += time.perf_counter() - start
+        audio_s += len(audio) / RATE
+        ref_words = normalize(reference).split()
+        errors += word_errors(ref_words, normalize(text).split())
+        words += len(ref_words)
+
+    return {
+        "model": model_size,
+        "precision": precision,
+        "load_s": load_s,
+        "rtf": decode_s / audio_s if audio_s else None,
+        "model_mb": model_megabytes(model),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # KiB on Linux
+        "wer": errors / words if words else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("samples", nargs="?", default=SAMPLES_DIR)
+    parser.add_argument("--models", nargs="+", default=["base.en", "small.en"])
+    parser.add_argument("--precisions", nargs="+", choices=PRECISIONS, default=list(PRECISIONS))
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--synthetic", action="store_true", help="use the generated sample set")
+    args = parser.parse_args()
+
+    samples = [] if args.synthetic else load_samples(args.samples)
+    if not samples:
+        if not args.synthetic:
+            print(f"No samples in {args.samples} (see benchmarks/samples/README.md); "
+                  f"using the synthetic set: RTF and memory only, no WER.")
+        samples = synthetic_samples()
+    total = sum(len(audio) for _, audio, _ in samples) / RATE
+    print(f"{len(samples)} samples, {total:.1f}s of audio, threads={args.threads or torch.get_num_threads()}\n")
+
+    print(f"{'model':<10} {'precision':<9} {'load s':>7} {'RTF':>6} {'model MB':>9} {'peak RSS MB':>12} {'WER':>6}")
+    context = multiprocessing.get_context("spawn")
+    for model_size in args.models:
+        for precision in args.precisions:
+            with concurrent.futures.ProcessPoolExecutor(1, mp_context=context) as pool:
+                r = pool.submit(run_config, model_size, precision, args.threads, samples).result()
+            wer = f"{100 * r['wer']:5.1f}%" if r["wer"] is not None else "   n/a"
+            print(f"{r['model']:<10} {r['precision']:<9} {r['load_s']:7.1f} {r['rtf']:6.3f} "
+                  f"{r['model_mb']:9.0f} {r['peak_rss_mb']:12.0f} {wer}")
+
+
+if __name__ == "__main__":
+    main()
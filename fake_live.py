@@ -0,0 +1,273 @@
+"""
+## Fake Live API
+In-process stand-ins for the Live API and the local media devices, so
+LiveInterviewAgent sessions can be run (and load-tested) without a network,
+API key, microphone, speaker or camera.
+
+- FakeLiveClient mimics client.aio.live.connect(). Each FakeLiveSession
+  "speaks" every question as a few seconds of 24 kHz audio followed by
+  turn_complete, starting response_latency_s after the question was sent.
+  It "answers" once answer_after_s of the candidate's audio has arrived,
+  with a text fragment and turn_complete. With words_every_s, the answer's
+  transcript also streams in as a word per that many seconds of audio,
+  once the question has been spoken, before the final fragment. With
+  idle_timeout_s, a session that has received nothing for that long is
+  dropped by the "server", and sending on it raises ConnectionError.
+- FakeMicrophone is a real-time paced source of 16 kHz PCM chunks
+  (CallbackMicrophone's interface).
+- NullSpeaker consumes the model's audio at real-time rate, with a bounded
+  buffer like PlaybackEngine, and discards it.
+- FakeQuestionGenerator stands in for the agent that phrases follow-up
+  questions for an InterviewPlan, with a fixed latency per call.
+- SyntheticVideoSource produces frames with a moving box, so the change
+  detector and JPEG encoder do real work.
+"""
+
+import asyncio
+import contextlib
+import types
+
+import numpy as np
+
+SEND_RATE = 16000
+RECEIVE_RATE = 24000
+
+
+def _response(data=None, text=None, turn_complete=False, interrupted=False):
+    content = None
+    if turn_complete or interrupted:
+        content = types.SimpleNamespace(turn_complete=turn_complete, interrupted=interrupted)
+    return types.SimpleNamespace(data=data, text=text, server_content=content)
+
+
+class FakeLiveSession:
+    """The subset of AsyncSession that LiveInterviewAgent uses."""
+
+    def __init__(self, question_audio_s=2.0, answer_after_s=3.0, chunk_ms=40, idle_timeout_s=None,
+                 response_latency_s=0.0, words_every_s=None):
+        self.question_audio_s = question_audio_s
+        self.response_latency_s = response_latency_s
+        self.words_every_s = words_every_s
+        self._words = 0
+        self.answer_after_s = answer_after_s
+        self.chunk_ms = chunk_ms
+        self.idle_timeout_s = idle_timeout_s
+        self._last_activity = asyncio.get_running_loop().time()
+        self._responses = asyncio.Queue()
+        self._speaker = None
+        self._heard_s = 0.0
+        self._awaiting_answer = False
+
+        self.questions = 0
+        self.answers = 0
+        self.audio_in_s = 0.0
+        self.frames_in = 0
+        self.stream_ends = 0
+        self.client_turns = []
+        self.closed = False
+
+    def _touch(self):
+        now = asyncio.get_running_loop().time()
+        if self.closed or (self.idle_timeout_s is not None
+                           and now - self._last_activity > self.idle_timeout_s):
+            self.closed = True
+            raise ConnectionError("session closed by server")
+        self._last_activity = now
+
+    async def send(self, input=None, end_of_turn=False):
+        self._touch()
+        if isinstance(input, str):
+            self._asked()
+            if self._speaker is not None:
+                self._speaker.cancel()
+            self._speaker = asyncio.create_task(self._speak())
+            return
+        mime_type = input.get("mime_type", "")
+        if mime_type.startswith("image/"):
+            self.frames_in += 1
+        elif mime_type.startswith("audio/"):
+            seconds = len(input["data"]) / (2 * SEND_RATE)
+            self.audio_in_s += seconds
+            self._heard_s += seconds
+            speaking = self._speaker is not None and not self._speaker.done()
+            while (self._awaiting_answer and self.words_every_s and not speaking
+                   and self._heard_s >= (self._words + 1) * self.words_every_s):
+                self._words += 1
+                self._responses.put_nowait(_response(text=f"word{self._words} "))
+            if self._awaiting_answer and self._heard_s >= self.answer_after_s:
+                self._awaiting_answer = False
+                self.answers += 1
+                self._responses.put_nowait(_response(text=f"Answer to question {self.questions}."))
+                self._responses.put_nowait(_response(turn_complete=True))
+
+    async def send_realtime_input(self, audio_stream_end=False, **kwargs):
+        self._touch()
+        if audio_stream_end:
+            self.stream_ends += 1
+
+    async def send_client_content(self, turns=None, turn_complete=True):
+        self._touch()
+        self.client_turns.append(turns)
+        if getattr(turns, "role", None) == "model":
+            # A line the agent played itself; the candidate answers it as usual.
+            self._asked()
+
+    def _asked(self):
+        self.questions += 1
+        self._heard_s = 0.0
+        self._words = 0
+        self._awaiting_answer = True
+
+    async def _speak(self):
+        await asyncio.sleep(self.response_latency_s)
+        chunk = bytes(RECEIVE_RATE * self.chunk_ms // 1000 * 2)
+        for _ in range(int(self.question_audio_s * 1000 / self.chunk_ms)):
+            self._responses.put_nowait(_response(data=chunk))
+            await asyncio.sleep(self.chunk_ms / 1000)
+        self._responses.put_nowait(_response(turn_complete=True))
+
+    async def receive(self):
+        """Yields one turn's responses, ending after turn_complete."""
+        while True:
+            response = await self._responses.get()
+            yield response
+            if response.server_content is not None and response.server_content.turn_complete:
+                return
+
+    def close(self):
+        self.closed = True
+        if self._speaker is not None:
+            self._speaker.cancel()
+
+
+class FakeLiveClient:
+    """Stand-in for genai.Client: only client.aio.live.connect() is provided."""
+
+    def __init__(self, connect_latency_s=0.0, **session_kwargs):
+        self.connect_latency_s = connect_latency_s
+        self.session_kwargs = session_kwargs
+        self.sessions = []
+        self.aio = types.SimpleNamespace(live=types.SimpleNamespace(connect=self.connect))
+
+    @contextlib.asynccontextmanager
+    async def connect(self, model=None, config=None):
+        # Stands in for the websocket and setup handshake.
+        await asyncio.sleep(self.connect_latency_s)
+        session = FakeLiveSession(**self.session_kwargs)
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            session.close()
+
+
+class FakeQuestionGenerator:
+    """Follow-up generator for InterviewPlan that takes latency_s per call."""
+
+    def __init__(self, latency_s=1.0):
+        self.latency_s = latency_s
+        self.calls = 0
+        self.completed = 0
+
+    async def __call__(self, question, answer, history):
+        self.calls += 1
+        await asyncio.sleep(self.latency_s)
+        self.completed += 1
+        return f"{question.follow_up} (You said: {answer[-40:]})"
+
+
+class FakeMicrophone:
+    """Real-time paced 16 kHz PCM source with CallbackMicrophone's interface."""
+
+    def __init__(self, rate=SEND_RATE, chunk=1024, amplitude=2000, seed=0):
+        self._interval = chunk / rate
+        noise = np.random.default_rng(seed).normal(0, amplitude, chunk)
+        self._data = noise.astype(np.int16).tobytes()
+        self._next = None
+        self.closed = True
+        self.chunks = 0
+
+    async def open(self):
+        self._next = asyncio.get_running_loop().time()
+        self.closed = False
+        return self
+
+    def close(self):
+        self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed:
+            raise StopAsyncIteration
+        delay = self._next - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._next += self._interval
+        self.chunks += 1
+        return self._data
+
+    def stats(self):
+        return {"chunks": self.chunks}
+
+
+class NullSpeaker:
+    """Discards the model's audio at real-time rate (PlaybackEngine's interface)."""
+
+    def __init__(self, rate=RECEIVE_RATE, max_buffer_ms=300):
+        self._bytes_per_second = rate * 2
+        self._max_buffer_s = max_buffer_ms / 1000
+        self._until = 0.0  # loop time the buffered audio finishes playing
+        self._utterance_start = 0.0
+        self.bytes_in = 0
+        self.flushes = 0
+        self.last_interruption = None
+
+    async def open(self):
+        return self
+
+    def close(self):
+        pass
+
+    async def write(self, data):
+        now = asyncio.get_running_loop().time()
+        self.bytes_in += len(data)
+        self._until = max(self._until, now) + len(data) / self._bytes_per_second
+        ahead = self._until - now - self._max_buffer_s
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+
+    def begin_utterance(self):
+        self._utterance_start = max(self._until, asyncio.get_running_loop().time())
+
+    def flush(self):
+        now = asyncio.get_running_loop().time()
+        heard = max(0.0, min(now, self._until) - self._utterance_start)
+        self._until = now
+        self.flushes += 1
+        self.last_interruption = {"heard_s": round(heard, 2)}
+        return heard
+
+    def stats(self):
+        return {"played_s": round(self.bytes_in / self._bytes_per_second, 1), "flushes": self.flushes}
+
+
+class SyntheticVideoSource:
+    """Video source (grab()/close()) drawing a box that moves every frame."""
+
+    def __init__(self, width=1280, height=720, box=200, step=16):
+        self._frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self._box = box
+        self._step = step
+        self._x = 0
+
+    def grab(self):
+        self._frame[:] = 40
+        x = self._x
+        self._frame[100:100 + self._box, x:x + self._box] = 200
+        self._x = (x + self._step) % (self._frame.shape[1] - self._box)
+        return self._frame
+
+    def close(self):
+        pass
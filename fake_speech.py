@@ -0,0 +1,114 @@
+"""
+## Fake Google STT
+A local stand-in for speech.SpeechAsyncClient, for exercising
+googleAPI.ResumableRecognizer's stream rotation without network access.
+
+FakeSpeechAsyncClient.streaming_recognize behaves like the real streaming
+call, at the level the recognizer depends on:
+
+- the first request must carry the streaming config, the rest audio,
+- every audio chunk produces an interim result, and every final_every chunks
+  (and on half-close) a final result covering the chunks since the last one,
+  with result_end_time relative to the stream's first audio,
+- a stream that is still receiving audio max_stream_s after it was opened,
+  or that is sent more than max_stream_s of audio, fails with
+  StreamLimitExceeded, like the real ~305 s limit. Audio time is what a
+  sped-up FakeAudioSource keeps realistic, so simulations can use the real
+  limits.
+
+"Recognition" is exact: FakeAudioSource stamps each chunk with its index, and
+the fake transcribes chunk i as the word "w<i>". A stitched transcript can
+therefore be checked word by word for gaps and duplicates.
+"""
+
+import asyncio
+import datetime
+import struct
+import types
+
+INDEX = struct.Struct("!I")
+
+
+class StreamLimitExceeded(Exception):
+    """The fake's version of the OUT_OF_RANGE error at the stream limit."""
+
+
+def _response(transcript, is_final, end_ms):
+    alternative = types.SimpleNamespace(transcript=transcript)
+    result = types.SimpleNamespace(
+        alternatives=[alternative],
+        is_final=is_final,
+        result_end_time=datetime.timedelta(milliseconds=end_ms),
+    )
+    return types.SimpleNamespace(results=[result])
+
+
+class FakeSpeechAsyncClient:
+    """In-process fake of SpeechAsyncClient.streaming_recognize."""
+
+    def __init__(self, rate=16000, max_stream_s=305.0, final_every=10, latency_s=0.0):
+        self.rate = rate
+        self.max_stream_s = max_stream_s
+        self.final_every = final_every
+        self.latency_s = latency_s
+        self.streams = []  # one dict per call, for checking rotation timing
+
+    async def streaming_recognize(self, requests):
+        loop = asyncio.get_running_loop()
+        info = {"opened_at": loop.time(), "first_audio_at": None, "closed_at": None, "audio_ms": 0.0}
+        self.streams.append(info)
+        return self._recognize(requests, info)
+
+    async def _recognize(self, requests, info):
+        loop = asyncio.get_running_loop()
+        requests = aiter(requests)
+        first = await anext(requests)
+        if not first.streaming_config or first.audio_content:
+            raise ValueError("the first request must carry only the streaming config")
+
+        pending = []
+        async for request in requests:
+            now = loop.time()
+            chunk_ms = len(request.audio_content) * 1000 / (2 * self.rate)
+            if (now - info["opened_at"] > self.max_stream_s
+                    or info["audio_ms"] + chunk_ms > self.max_stream_s * 1000):
+                info["closed_at"] = now
+                raise StreamLimitExceeded(f"stream exceeded {self.max_stream_s}s")
+            if info["first_audio_at"] is None:
+                info["first_audio_at"] = now
+            info["audio_ms"] += chunk_ms
+            pending.append(f"w{INDEX.unpack_from(request.audio_content)[0]}")
+            if self.latency_s:
+                await asyncio.sleep(self.latency_s)
+            is_final = len(pending) >= self.final_every
+            yield _response(" ".join(pending), is_final, info["audio_ms"])
+            if is_final:
+                pending = []
+        info["closed_at"] = loop.time()
+        if pending:
+            yield _response(" ".join(pending), True, info["audio_ms"])
+
+
+class FakeAudioSource:
+    """Async iterable of index-stamped PCM chunks, paced like a microphone.
+
+    speed > 1 plays faster than real time, so long interviews can be
+    simulated in seconds (scale the stream limits by the same factor).
+    """
+
+    def __init__(self, chunks, rate=16000, chunk_ms=100, speed=1.0):
+        self.rate = rate
+        self.chunks = chunks
+        self.chunk_bytes = rate * chunk_ms // 1000 * 2
+        self.interval = chunk_ms / 1000 / speed
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i in range(self.chunks):
+            delay = start + i * self.interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            chunk = bytearray(self.chunk_bytes)
+            INDEX.pack_into(chunk, 0, i)
+            yield bytes(chunk)
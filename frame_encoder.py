@@ -0,0 +1,144 @@
+"""
+## Frame encoding
+Shared JPEG encoder for the camera/screen frames that LiveAPI2.AudioLoop and
+live_interview_agent.LiveInterviewAgent send to the Live API.
+
+The original path was
+BGR ndarray -> cv2.cvtColor -> PIL.Image.fromarray -> thumbnail -> JPEG into a
+BytesIO -> read() -> base64 -> str, which is about five full-frame copies per
+frame. FrameEncoder instead:
+
+- reads the camera into a reused capture buffer,
+- resizes straight into a reused ndarray (same fit-inside rule as
+  PIL's Image.thumbnail),
+- JPEG-encodes with OpenCV, which takes BGR natively, so no colour conversion,
+- returns raw JPEG bytes. The SDK base64-encodes Blob data itself, so the
+  Live session gets {"mime_type": "image/jpeg", "data": <bytes>}, exactly like
+  the audio chunks.
+
+Benchmark: python benchmarks/bench_frame_encoder.py
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+MIME_TYPE = "image/jpeg"
+MAX_SIZE = 1024
+JPEG_QUALITY = 75  # PIL's default, so output size matches the old path
+
+
+class FrameEncoder:
+    """Resizes and JPEG-encodes frames, reusing its scratch buffers between calls.
+
+    One encoder per capture loop: the buffers are not safe to share between
+    threads running at the same time.
+    """
+
+    def __init__(self, max_size=MAX_SIZE, quality=JPEG_QUALITY):
+        self.max_size = max_size
+        self._params = [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)]
+
+        self._capture = None  # reused by cv2.VideoCapture.read
+        self._src_shape = None
+        self._dsize = None
+        self._resized = None
+        self._bgr = None
+
+        self.frames = 0
+        self.encode_seconds = 0.0
+        self.bytes_out = 0
+
+    def grab(self, cap):
+        """Reads one frame from a cv2.VideoCapture into the reused buffer.
+
+        Returns the BGR frame (valid until the next grab) or None on failure.
+        """
+        ret, frame = cap.read(self._capture)
+        if not ret:
+            return None
+        self._capture = frame
+        return frame
+
+    def _target_size(self, width, height):
+        # Same as Image.thumbnail: fit inside max_size x max_size, keep the
+        # aspect ratio and never upscale.
+        scale = min(self.max_size / width, self.max_size / height, 1.0)
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    def encode(self, frame):
+        """JPEG-encodes a BGR or BGRA frame, downscaling it first if needed.
+
+        Returns the JPEG as bytes, or None if OpenCV failed to encode it.
+        """
+        start = time.perf_counter()
+
+        if frame.shape != self._src_shape:
+            height, width = frame.shape[:2]
+            self._src_shape = frame.shape
+            self._dsize = self._target_size(width, height)
+            self._resized = None
+            self._bgr = None
+
+        image = frame
+        if self._dsize != (frame.shape[1], frame.shape[0]):
+            if self._resized is None:
+                out_w, out_h = self._dsize
+                self._resized = np.empty((out_h, out_w) + frame.shape[2:], dtype=frame.dtype)
+            image = cv2.resize(frame, self._dsize, dst=self._resized, interpolation=cv2.INTER_AREA)
+
+        # Screen grabs come in as BGRA; the JPEG encoder wants 1 or 3 channels.
+        # Converting after the resize keeps this on the small image.
+        if image.ndim == 3 and image.shape[2] == 4:
+            if self._bgr is None:
+                self._bgr = np.empty(image.shape[:2] + (3,), dtype=np.uint8)
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR, dst=self._bgr)
+
+        ok, encoded = cv2.imencode(".jpg", image, self._params)
+        if not ok:
+            return None
+        data = encoded.tobytes()
+
+        self.frames += 1
+        self.encode_seconds += time.perf_counter() - start
+        self.bytes_out += len(data)
+        return data
+
+    def encode_message(self, frame):
+        """Encodes a frame into a message ready for session.send(input=...)."""
+        data = self.encode(frame)
+        if data is None:
+            return None
+        return {"mime_type": MIME_TYPE, "data": data}
+
+    def stats(self):
+        frames = self.frames or 1
+        return {
+            "frames": self.frames,
+            "avg_encode_ms": round(1000 * self.encode_seconds / frames, 2),
+            "avg_jpeg_bytes": self.bytes_out // frames,
+        }
+
+
+class CameraSource:
+    """A cv2.VideoCapture as a video source (grab()/close(), like ScreenGrabber).
+
+    The device is opened on the first grab(), which runs in the caller's
+    executor, and frames are read into the encoder's reused capture buffer.
+    """
+
+    def __init__(self, encoder, device=0):
+        self.encoder = encoder
+        self.device = device
+        self._cap = None
+
+    def grab(self):
+        if self._cap is None:
+            self._cap = cv2.VideoCapture(self.device)
+        return self.encoder.grab(self._cap)
+
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
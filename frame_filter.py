@@ -0,0 +1,101 @@
+"""
+## Frame change detection
+Skips camera/screen frames that are practically identical to the last frame we
+sent, so a candidate sitting still (or a static slide) doesn't cost uplink
+bandwidth and context-window tokens every second.
+
+Each frame is downsampled to a tiny thumbnail and compared with the thumbnail
+of the last frame sent, using the mean absolute difference (0-255 scale).
+Frames under the threshold are dropped, but a keyframe is always sent every
+keyframe_interval seconds so the model's view never goes too stale. The check
+runs before JPEG encoding, so skipped frames are never encoded either.
+
+should_send() only decides; the caller calls commit() once the frame has
+actually been encoded, so a frame that fails to encode doesn't become the
+reference (or count as sent):
+
+    if filter.should_send(frame):
+        msg = encoder.encode_message(frame)
+        if msg is not None:
+            filter.commit()
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_THRESHOLD = 3.0  # mean absolute difference per pixel channel
+KEYFRAME_INTERVAL = 10.0  # seconds
+THUMB_SIZE = 32
+
+# Returned by the capture helpers in place of a message when a frame is skipped.
+UNCHANGED = object()
+
+
+class FrameChangeDetector:
+    """Decides whether a frame differs enough from the last one sent."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, keyframe_interval=KEYFRAME_INTERVAL,
+                 thumb_size=THUMB_SIZE):
+        self.threshold = threshold
+        self.keyframe_interval = keyframe_interval
+        self.thumb_size = thumb_size
+
+        self._thumb = None
+        self._reference = None
+        self._diff = None
+        self._last_sent = None
+        self._pending = None  # (now, is_keyframe) of the frame should_send() passed
+
+        self.sent = 0
+        self.skipped = 0
+        self.keyframes = 0
+
+    def should_send(self, frame, now=None):
+        """Returns True if the frame should go out; commit() it once it's encoded."""
+        if now is None:
+            now = time.monotonic()
+        size = (self.thumb_size, self.thumb_size)
+        if self._thumb is None or self._thumb.shape[2:] != frame.shape[2:]:
+            self._thumb = np.empty((self.thumb_size, self.thumb_size) + frame.shape[2:], dtype=np.uint8)
+            self._diff = np.empty(self._thumb.shape, dtype=np.int16)
+            self._reference = None
+        thumb = cv2.resize(frame, size, dst=self._thumb, interpolation=cv2.INTER_AREA)
+
+        self._pending = None
+        if self._reference is None or now - self._last_sent >= self.keyframe_interval:
+            self._pending = (now, True)
+            return True
+
+        np.subtract(thumb, self._reference, out=self._diff, dtype=np.int16)
+        np.abs(self._diff, out=self._diff)
+        if self._diff.mean() < self.threshold:
+            self.skipped += 1
+            return False
+        self._pending = (now, False)
+        return True
+
+    def commit(self):
+        """Makes the frame should_send() last passed the new reference."""
+        if self._pending is None:
+            return
+        now, keyframe = self._pending
+        self._pending = None
+        if self._reference is None:
+            self._reference = self._thumb.copy()
+        else:
+            self._reference[...] = self._thumb
+        self._last_sent = now
+        self.sent += 1
+        if keyframe:
+            self.keyframes += 1
+
+    def stats(self):
+        total = self.sent + self.skipped
+        return {
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "keyframes": self.keyframes,
+            "skipped_pct": round(100 * self.skipped / total, 1) if total else 0.0,
+        }
@@ -0,0 +1,108 @@
+"""
+## Frame scheduling
+Adaptive replacement for the fixed asyncio.sleep(1.0) in the frame loops.
+
+The capture interval moves between min_interval and max_interval:
+- it backs off when the uplink is falling behind (outbound queue backed up, or
+  session.send taking a large share of the interval),
+- it speeds up again when the link is idle,
+- and the time spent capturing/encoding is taken out of the sleep, so the
+  cadence is measured from the start of one capture to the start of the next
+  instead of drifting by the encode time each round.
+
+send latency is an EWMA of video sends. A round in which no frame was sent
+(an unchanged scene) counts as an instant send, so one slow send decays
+away instead of holding the interval at max_interval until the scene
+changes.
+"""
+
+import asyncio
+import time
+
+MIN_INTERVAL = 0.5
+MAX_INTERVAL = 4.0
+INITIAL_INTERVAL = 1.0
+
+BACKOFF = 1.5
+SPEEDUP = 0.9
+BUSY_QUEUE_FILL = 0.8  # see OutboundMux.fill()
+BUSY_SEND_SHARE = 0.5  # send latency as a fraction of the interval
+IDLE_SEND_SHARE = 0.1
+EWMA_ALPHA = 0.2
+
+
+class FrameScheduler:
+    """Paces a capture loop: call start() before capturing, then await wait()."""
+
+    def __init__(self, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 initial_interval=INITIAL_INTERVAL):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("need 0 < min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(initial_interval, min_interval), max_interval)
+
+        self._started = None
+        self.send_latency = 0.0  # EWMA, seconds
+        self._sends = 0  # since the last wait()
+
+        self.frames = 0
+        self.backoffs = 0
+        self.speedups = 0
+        self.overruns = 0  # capture took longer than the whole interval
+        self.busy_seconds = 0.0
+
+    def record_send(self, seconds):
+        """Feeds in how long one frame's session.send took (called from send_realtime).
+
+        Only video sends belong here: the much more frequent, small audio
+        sends would otherwise dilute a slow frame send out of the average.
+        """
+        self.send_latency += EWMA_ALPHA * (seconds - self.send_latency)
+        self._sends += 1
+
+    def start(self):
+        self._started = time.monotonic()
+
+    def _adjust(self, queue_fill):
+        if not self._sends:
+            self.send_latency -= EWMA_ALPHA * self.send_latency  # an idle round: nothing to send
+        self._sends = 0
+        if queue_fill >= BUSY_QUEUE_FILL or self.send_latency > BUSY_SEND_SHARE * self.interval:
+            new = min(self.max_interval, self.interval * BACKOFF)
+            if new > self.interval:
+                self.backoffs += 1
+            self.interval = new
+        elif queue_fill == 0 and self.send_latency < IDLE_SEND_SHARE * self.interval:
+            new = max(self.min_interval, self.interval * SPEEDUP)
+            if new < self.interval:
+                self.speedups += 1
+            self.interval = new
+
+    async def wait(self, queue_fill=0.0):
+        """Sleeps for the rest of the current interval.
+
+        queue_fill is how full the outbound queue is, from 0.0 to 1.0.
+        """
+        self._adjust(queue_fill)
+        now = time.monotonic()
+        busy = now - self._started if self._started is not None else 0.0
+        self.frames += 1
+        self.busy_seconds += busy
+        remaining = self.interval - busy
+        if remaining <= 0:
+            self.overruns += 1
+            # Still yield so a slow capture can't starve the event loop.
+            remaining = 0
+        await asyncio.sleep(remaining)
+
+    def stats(self):
+        frames = self.frames or 1
+        return {
+            "interval_s": round(self.interval, 3),
+            "send_latency_ms": round(1000 * self.send_latency, 2),
+            "avg_capture_ms": round(1000 * self.busy_seconds / frames, 2),
+            "backoffs": self.backoffs,
+            "speedups": self.speedups,
+            "overruns": self.overruns,
+        }
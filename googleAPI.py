@@ -1,4 +1,7 @@
 
+import argparse
+import asyncio
+import collections
 import queue
 import re
 import sys
@@ -7,9 +10,18 @@ from google.cloud import speech
 
 import pyaudio
 
+from mic_capture import CallbackMicrophone
+
 # Audio recording parameters
 RATE = 16000
 CHUNK = int(RATE / 10)  # 100ms
+MAX_BUFFERED_CHUNKS = 50  # 5 s of audio before the oldest chunks are dropped
+MAX_REQUEST_BYTES = 25600  # streaming_recognize's limit per audio request
+STREAM_LIMIT_S = 290  # streams are cut off at ~305 s, so rotate a little before
+PREWARM_S = 5  # open the next stream this long before switching to it
+MAX_REPLAY_S = 60  # un-finalized audio kept for replay into the next stream
+
+StreamResult = collections.namedtuple("StreamResult", ["transcript", "is_final", "end_ms", "stream_index"])
 
 
 class MicrophoneStream:
@@ -111,6 +123,89 @@ class MicrophoneStream:
             yield b"".join(data)
 
 
+class AsyncMicrophoneStream:
+    """Async-iterable microphone for use inside an asyncio event loop.
+
+    The async counterpart of MicrophoneStream, so Google STT can run as one
+    more TaskGroup task next to a Live session instead of in its own process.
+    Audio is captured by mic_capture.CallbackMicrophone into a bounded ring of
+    max_chunks chunks. If the recognizer falls behind, the oldest chunks are
+    overwritten and counted in dropped_chunks instead of piling up in an
+    unbounded queue.
+    """
+
+    def __init__(
+        self: object,
+        rate: int = RATE,
+        chunk: int = CHUNK,
+        pya: object = None,
+        max_chunks: int = MAX_BUFFERED_CHUNKS,
+    ) -> None:
+        """Pass the agent's PyAudio instance as pya to share it; otherwise
+        the stream creates (and terminates) its own."""
+        self._rate = rate
+        self._chunk = chunk
+        self._owns_pya = pya is None
+        self._pya = pya
+        self._max_chunks = max_chunks
+        self._mic = None
+        self.closed = True
+
+    async def __aenter__(self: object) -> object:
+        if self._pya is None:
+            self._pya = pyaudio.PyAudio()
+        self._mic = CallbackMicrophone(self._pya, self._rate, self._chunk, slots=self._max_chunks)
+        await self._mic.open()
+        self.closed = False
+        return self
+
+    async def __aexit__(
+        self: object,
+        type: object,
+        value: object,
+        traceback: object,
+    ) -> None:
+        """Closes the stream; the iterator finishes once buffered audio is read."""
+        self._mic.close()
+        self.closed = True
+        if self._owns_pya and self._pya is not None:
+            self._pya.terminate()
+            self._pya = None
+
+    def __aiter__(self: object) -> object:
+        return self
+
+    async def __anext__(self: object) -> bytes:
+        """Waits for at least one chunk, then joins whatever else is buffered.
+
+        Returns:
+            Up to MAX_REQUEST_BYTES of audio.
+        """
+        chunk = await self._mic.read()
+        if chunk is None:
+            raise StopAsyncIteration
+        data = [chunk]
+        size = len(chunk)
+        while self._mic.pending() and size + self._chunk * 2 <= MAX_REQUEST_BYTES:
+            chunk = await self._mic.read()
+            data.append(chunk)
+            size += len(chunk)
+        return b"".join(data)
+
+    @property
+    def rate(self: object) -> int:
+        return self._rate
+
+    @property
+    def dropped_chunks(self: object) -> int:
+        return self._mic.ring_overruns if self._mic else 0
+
+    def stats(self: object) -> dict:
+        stats = self._mic.stats() if self._mic else {}
+        stats["dropped_ms"] = self.dropped_chunks * self._chunk * 1000 // self._rate
+        return stats
+
+
 def listen_print_loop(responses: object) -> str:
     """Iterates through server responses and prints them.
 
@@ -174,6 +269,230 @@ def listen_print_loop(responses: object) -> str:
     return transcript
 
 
+async def streaming_requests(
+    stream: object,
+    streaming_config: object,
+) -> object:
+    """Yields the requests for SpeechAsyncClient.streaming_recognize.
+
+    stream is any async iterable of audio chunks, e.g. AsyncMicrophoneStream.
+
+    Unlike SpeechClient's helper, the async client takes the config as the
+    first request on the stream.
+    """
+    yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)
+    async for content in stream:
+        yield speech.StreamingRecognizeRequest(audio_content=content)
+
+
+async def recognize_async(
+    stream: AsyncMicrophoneStream,
+    client: object = None,
+    language_code: str = "en-US",
+    on_result: object = None,
+) -> list:
+    """Streams microphone audio to Google STT until the stream ends.
+
+    Runs a ResumableRecognizer, so it isn't cut off after five minutes.
+    Meant to run as a TaskGroup task in the same loop as a Live session:
+
+        async with AsyncMicrophoneStream(pya=pya) as mic:
+            tg.create_task(recognize_async(mic, on_result=handle))
+
+    Args:
+        stream: An open AsyncMicrophoneStream
+        client: A speech.SpeechAsyncClient (one is created if omitted)
+        language_code: A BCP-47 language tag
+        on_result: Called with (transcript, is_final) for every top result
+
+    Returns:
+        The final transcripts, in order.
+    """
+    recognizer = ResumableRecognizer(stream, client, language_code, on_result=on_result)
+    return await recognizer.run()
+
+
+class _RecognizeStream:
+    """One streaming_recognize call of a ResumableRecognizer."""
+
+    def __init__(self: object, index: int, opened_at: float) -> None:
+        self.index = index
+        self.opened_at = opened_at
+        self.queue = asyncio.Queue()  # audio to send; None half-closes the stream
+        self.base_ms = 0.0  # audio time of the first chunk this stream received
+        self.sent_ms = 0.0  # audio sent to it, replay included
+        self.retired = False
+
+
+class ResumableRecognizer:
+    """Streams microphone audio to Google STT across any number of streams.
+
+    A single streaming_recognize call is cut off after about five minutes.
+    This rotates to a new call every stream_limit_s seconds:
+
+    - the next stream is opened prewarm_s early, so its connection and
+      config are in place by the time it's needed,
+    - at the switch, the current stream is half-closed and retired (anything
+      it still returns is ignored), and the audio it hadn't finalized yet is
+      replayed into the new one from a retained buffer,
+    - result_end_time is relative to each stream's own start, so results are
+      shifted by the audio time of the stream's first chunk, which keeps the
+      offsets continuous across streams,
+    - a stream's age is the longer of the time since it was opened and the
+      audio sent to it, replay included, so neither one can reach the
+      server's limit.
+
+    Audio older than the last final result is dropped from the buffer (the
+    chunk it ends in is cut at the final's end offset, so the next stream
+    doesn't hear those words twice), and at most MAX_REPLAY_S of it is kept. Audio that ages out before a final
+    covers it is counted in truncated_ms, and is lost only if a rotation
+    comes before its final result.
+    """
+
+    def __init__(
+        self: object,
+        stream: object,
+        client: object = None,
+        language_code: str = "en-US",
+        stream_limit_s: float = STREAM_LIMIT_S,
+        prewarm_s: float = PREWARM_S,
+        on_result: object = None,
+    ) -> None:
+        """stream is any async iterable of 16-bit mono PCM with a rate
+        attribute, such as AsyncMicrophoneStream."""
+        self._stream = stream
+        self._client = client or speech.SpeechAsyncClient()
+        self._stream_limit_s = stream_limit_s
+        self._prewarm_s = prewarm_s
+        self._on_result = on_result
+        self._bytes_per_ms = stream.rate * 2 / 1000
+        self._streaming_config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=stream.rate,
+                language_code=language_code,
+            ),
+            interim_results=True,
+        )
+
+        self._retained = collections.deque()  # (start_ms, end_ms, chunk)
+        self._audio_ms = 0.0
+        self._current = None
+        self._tg = None
+        self._stopping = False
+
+        self.results = []  # final StreamResults, in order
+        self.streams_opened = 0
+        self.rotations = 0
+        self.replayed_ms = 0.0
+        self.truncated_ms = 0.0
+
+    async def _audio(self: object, rs: _RecognizeStream) -> object:
+        while True:
+            content = await rs.queue.get()
+            if content is None:
+                return
+            yield content
+
+    async def _open(self: object) -> _RecognizeStream:
+        rs = _RecognizeStream(self.streams_opened, asyncio.get_running_loop().time())
+        self.streams_opened += 1
+        responses = await self._client.streaming_recognize(
+            requests=streaming_requests(self._audio(rs), self._streaming_config)
+        )
+        self._tg.create_task(self._consume(rs, responses))
+        return rs
+
+    async def _consume(self: object, rs: _RecognizeStream, responses: object) -> None:
+        try:
+            async for response in responses:
+                if rs.retired or not response.results or not response.results[0].alternatives:
+                    continue
+                result = response.results[0]
+                transcript = result.alternatives[0].transcript
+                if result.is_final:
+                    end_ms = rs.base_ms + result.result_end_time.total_seconds() * 1000
+                    self.results.append(StreamResult(transcript, True, end_ms, rs.index))
+                    self._finalized(end_ms)
+                if self._on_result is not None:
+                    self._on_result(transcript, result.is_final)
+        except Exception:
+            # A retired stream failing (e.g. hitting the limit while draining)
+            # doesn't matter; its audio has been replayed elsewhere.
+            if not rs.retired:
+                raise
+
+    def _finalized(self: object, end_ms: float) -> None:
+        """Drops retained audio up to end_ms; it never needs replaying."""
+        while self._retained and self._retained[0][1] <= end_ms:
+            self._retained.popleft()
+        if self._retained and self._retained[0][0] < end_ms:
+            start_ms, chunk_end_ms, chunk = self._retained[0]
+            skip = int((end_ms - start_ms) * self._bytes_per_ms) & ~1  # whole samples
+            self._retained[0] = (start_ms + skip / self._bytes_per_ms, chunk_end_ms, chunk[skip:])
+
+    def _retire(self: object, rs: _RecognizeStream) -> None:
+        rs.retired = True
+        rs.queue.put_nowait(None)
+
+    def _switch(self: object, new: _RecognizeStream) -> None:
+        self._retire(self._current)
+        new.base_ms = self._retained[0][0] if self._retained else self._audio_ms
+        for start_ms, end_ms, chunk in self._retained:
+            new.queue.put_nowait(chunk)
+            new.sent_ms += end_ms - start_ms
+        self.replayed_ms += new.sent_ms
+        self._current = new
+        self.rotations += 1
+
+    def _age(self: object, rs: _RecognizeStream) -> float:
+        return max(asyncio.get_running_loop().time() - rs.opened_at, rs.sent_ms / 1000)
+
+    def _retain(self: object, chunk: bytes) -> None:
+        end_ms = self._audio_ms + len(chunk) / self._bytes_per_ms
+        self._retained.append((self._audio_ms, end_ms, chunk))
+        self._audio_ms = end_ms
+        while self._retained[0][1] < end_ms - MAX_REPLAY_S * 1000:
+            start_ms, dropped_end_ms, _ = self._retained.popleft()
+            self.truncated_ms += dropped_end_ms - start_ms
+
+    async def run(self: object) -> list:
+        """Recognizes until the audio stream ends. Returns the final transcripts."""
+        async with asyncio.TaskGroup() as tg:
+            self._tg = tg
+            self._current = await self._open()
+            upcoming = None
+            async for chunk in self._stream:
+                if self._stopping:
+                    break
+                age = self._age(self._current)
+                if upcoming is None and age >= self._stream_limit_s - self._prewarm_s:
+                    upcoming = await self._open()
+                if age >= self._stream_limit_s:
+                    self._switch(upcoming)
+                    upcoming = None
+                self._retain(chunk)
+                self._current.queue.put_nowait(chunk)
+                self._current.sent_ms += len(chunk) / self._bytes_per_ms
+            self._current.queue.put_nowait(None)
+            if upcoming is not None:
+                self._retire(upcoming)
+        return [result.transcript for result in self.results]
+
+    def stop(self: object) -> None:
+        """Ends run() at the next chunk; results still in flight are delivered."""
+        self._stopping = True
+
+    def stats(self: object) -> dict:
+        return {
+            "streams": self.streams_opened,
+            "rotations": self.rotations,
+            "replayed_ms": round(self.replayed_ms),
+            "truncated_ms": round(self.truncated_ms),
+            "finals": len(self.results),
+        }
+
+
 def main() -> None:
     """Transcribe speech from audio file."""
     # See http://g.co/cloud/speech/docs/languages
@@ -204,6 +523,43 @@ def main() -> None:
         listen_print_loop(responses)
 
 
+async def async_main() -> None:
+    """Same as main(), on the async client, rotating streams as needed."""
+    num_chars_printed = 0
+
+    def print_result(transcript: str, is_final: bool) -> None:
+        nonlocal num_chars_printed
+        overwrite_chars = " " * (num_chars_printed - len(transcript))
+        if is_final:
+            print(transcript + overwrite_chars)
+            # Exit recognition if any of the transcribed phrases could be
+            # one of our keywords.
+            if re.search(r"\b(exit|quit)\b", transcript, re.I):
+                print("Exiting..")
+                recognizer.stop()
+            num_chars_printed = 0
+        else:
+            sys.stdout.write(transcript + overwrite_chars + "\r")
+            sys.stdout.flush()
+            num_chars_printed = len(transcript)
+
+    async with AsyncMicrophoneStream(RATE, CHUNK) as stream:
+        recognizer = ResumableRecognizer(stream, on_result=print_result)
+        try:
+            await recognizer.run()
+        finally:
+            print("Microphone stats:", stream.stats())
+            print("Recognizer stats:", recognizer.stats())
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="use SpeechAsyncClient and the async microphone stream, "
+                             "rotating streams so it isn't cut off after ~5 minutes")
+    args = parser.parse_args()
+    if args.use_async:
+        asyncio.run(async_main())
+    else:
+        main()
     
\ No newline at end of file
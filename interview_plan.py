@@ -0,0 +1,223 @@
+"""
+## Interview plan
+Drives LiveInterviewAgent through a graph of questions, preparing each
+follow-up while the candidate is still answering.
+
+The scripted flow used to ask a question, wait for listen_for_answer() to
+return and only then work out the next question, so whatever produced it
+(another agent, an LLM call) added its whole latency to the silence between
+turns. InterviewPlan instead:
+
+- follows the answer's partial transcript (Transcript.stream()) and routes it
+  through the graph as it grows,
+- starts generating the follow-up as soon as the route is known, and starts
+  a refined generation once the answer has grown by refine_chars since the
+  last one finished, keeping one generation in flight at a time,
+- cancels a pending generation when the route changes, or when it isn't
+  needed at end-of-turn,
+- at end-of-turn uses the latest prepared question that was based on at
+  least min_coverage of the final answer, waiting for it if it's still
+  being generated, and otherwise generates from the final answer.
+
+The inter-turn gap is the time from the answer's turn_complete until
+ask_question() has sent the next question. Each turn's gap and where its question came from are
+recorded in turns, and summarized by stats().
+
+    plan = InterviewPlan([
+        Question("intro", "Tell me about yourself.", next="deep_dive", cache=True),
+        Question("deep_dive", follow_up="Ask about the hardest part of what they described.",
+                 next="closing"),
+        Question("closing", "Thank you, that's all.", listen=False, cache=True),
+    ], generator=my_generator)
+    await agent.run_interview_session(plan)
+"""
+
+import asyncio
+import collections
+import time
+
+from pipeline_metrics import LogLinearHistogram
+
+REFINE_CHARS = 40  # answer growth that's worth a refined follow-up
+MIN_COVERAGE = 0.5  # share of the final answer a prepared follow-up must have seen
+FINAL_LINGER_S = 5.0  # let the closing line play before the session ends
+
+TurnRecord = collections.namedtuple("TurnRecord", ["question", "text", "source", "gap_s"])
+
+
+class Question:
+    """A node in the interview graph.
+
+    A question has either fixed wording (text) or a follow_up instruction for
+    the generator to phrase it from the previous answer. next is the name of
+    the question that follows, a callable taking the answer text (partial
+    while speculating) and returning that name, or None to end the interview.
+    listen=False asks without waiting for an answer, e.g. a closing line.
+    """
+
+    def __init__(self, name, text=None, follow_up=None, next=None, listen=True, cache=False, timeout=None):
+        if text is None and follow_up is None:
+            raise ValueError(f"question {name!r} needs text or follow_up")
+        self.name = name
+        self.text = text
+        self.follow_up = follow_up
+        self.next = next
+        self.listen = listen
+        self.cache = cache
+        self.timeout = timeout
+
+    def route(self, answer):
+        return self.next(answer) if callable(self.next) else self.next
+
+
+class _Speculation:
+    """One in-flight or finished generation of a follow-up."""
+
+    def __init__(self, question, basis, task):
+        self.question = question
+        self.basis = basis
+        self.task = task
+
+
+class InterviewPlan:
+    """Runs a question graph on an agent, generating follow-ups speculatively.
+
+    generator is an async callable (question, answer, history) -> str, where
+    history is a list of (question text, answer) pairs so far. It's only
+    needed for questions without fixed text. With speculate=False follow-ups
+    are generated only after the answer is complete, as the old flow did.
+    An InterviewPlan can be passed straight to run_interview_session().
+    """
+
+    def __init__(self, questions, start=None, generator=None, refine_chars=REFINE_CHARS,
+                 min_coverage=MIN_COVERAGE, speculate=True, linger_s=FINAL_LINGER_S):
+        self.questions = {question.name: question for question in questions}
+        self.start = start or questions[0].name
+        self.generator = generator
+        self.refine_chars = refine_chars
+        self.min_coverage = min_coverage
+        self.speculate = speculate
+        self.linger_s = linger_s
+        self._speculation = None  # the latest generation, pending or finished
+        self._ready = None  # the latest finished one, while a refinement runs
+
+        self.history = []
+        self.turns = []
+        self.speculations = 0
+        self.cancelled = 0
+
+    async def __call__(self, agent):
+        await self.run(agent)
+
+    def _lookup(self, name):
+        if name is None:
+            return None
+        try:
+            return self.questions[name]
+        except KeyError:
+            raise KeyError(f"interview plan has no question {name!r}") from None
+
+    async def _generate(self, question, answer):
+        if self.generator is None:
+            raise ValueError(f"question {question.name!r} has no text and the plan has no generator")
+        return await self.generator(question, answer, list(self.history))
+
+    async def run(self, agent):
+        """Asks questions until the graph ends; returns the (question, answer) history."""
+        question = self._lookup(self.start)
+        text = question.text or await self._generate(question, "")
+        source, ended = "fixed" if question.text else "fresh", None
+        while True:
+            await agent.ask_question(text, cache=question.cache)
+            gap = time.monotonic() - ended if ended is not None else None
+            self.turns.append(TurnRecord(question.name, text, source, gap))
+            if not question.listen:
+                await asyncio.sleep(self.linger_s)
+                break
+
+            answer = await self._listen(agent, question)
+            ended = time.monotonic()
+            print(f"📋 Orchestrator received answer {len(self.history) + 1}: {answer}")
+            self.history.append((text, answer))
+
+            question = self._lookup(question.route(answer))
+            if question is None:
+                self._cancel()
+                break
+            text, source = await self._next_text(question, answer)
+        print(f"Interview plan stats: {self.stats()}")
+        return self.history
+
+    async def _listen(self, agent, question):
+        follower = asyncio.create_task(self._follow(agent, question)) if self.speculate else None
+        try:
+            return await agent.listen_for_answer(question.timeout)
+        finally:
+            if follower is not None:
+                follower.cancel()
+                await asyncio.gather(follower, return_exceptions=True)
+
+    async def _follow(self, agent, question):
+        """Speculates on the answer's partial transcript as it streams in."""
+        await agent.is_listening.wait()  # listen_for_answer() has begun the turn
+        async for _ in agent.transcript.stream():
+            self._speculate(question, agent.transcript.turn_text().strip())
+
+    def _speculate(self, question, partial):
+        target = self._lookup(question.route(partial))
+        spec = self._speculation
+        if spec is not None and spec.question is not target:
+            self._cancel()  # the answer went another way
+            spec = None
+        if target is None or target.text is not None:
+            return
+        if spec is not None and not (spec.task.done()
+                                     and len(partial) - len(spec.basis) >= self.refine_chars):
+            return
+        if spec is not None and not spec.task.cancelled() and spec.task.exception() is None:
+            self._ready = spec
+        self.speculations += 1
+        task = asyncio.create_task(self._generate(target, partial))
+        self._speculation = _Speculation(target, partial, task)
+
+    def _cancel(self):
+        spec, self._speculation, self._ready = self._speculation, None, None
+        if spec is not None and not spec.task.done():
+            spec.task.cancel()
+            self.cancelled += 1
+
+    def _covers(self, spec, question, answer):
+        return (spec is not None and spec.question is question
+                and len(spec.basis) >= self.min_coverage * len(answer))
+
+    async def _next_text(self, question, answer):
+        """The next question's wording and where it came from."""
+        spec, ready = self._speculation, self._ready
+        if question.text is None and self._covers(spec, question, answer):
+            if not spec.task.done() and self._covers(ready, question, answer):
+                spec = ready  # good enough already; don't wait for the refinement
+            else:
+                self._speculation = None
+            self._cancel()
+            source = "speculative" if spec.task.done() else "awaited"
+            try:
+                return await spec.task, source
+            except Exception:
+                pass  # fall back to generating from the final answer
+        self._cancel()
+        if question.text is not None:
+            return question.text, "fixed"
+        return await self._generate(question, answer), "fresh"
+
+    def stats(self):
+        gaps = LogLinearHistogram()
+        for turn in self.turns:
+            if turn.gap_s is not None:
+                gaps.record(turn.gap_s)
+        return {
+            "turns": len(self.turns),
+            "gap": gaps.snapshot(),
+            "sources": dict(collections.Counter(turn.source for turn in self.turns)),
+            "speculations": self.speculations,
+            "cancelled": self.cancelled,
+        }
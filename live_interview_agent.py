@@ -13,18 +13,28 @@ pip install google-genai opencv-python pyaudio pillow mss python-dotenv exceptio
 
 import os
 import asyncio
-import base64
-import io
+import time
 import traceback
 
-import cv2
 from exceptiongroup import ExceptionGroup
 import pyaudio
-import PIL.Image
-import mss
 
 import argparse
 
+from frame_encoder import CameraSource, FrameEncoder
+from frame_filter import DEFAULT_THRESHOLD, KEYFRAME_INTERVAL, UNCHANGED, FrameChangeDetector
+from frame_scheduler import MAX_INTERVAL, MIN_INTERVAL, FrameScheduler
+from interview_plan import InterviewPlan, Question
+from mic_capture import CallbackMicrophone
+from pipeline_metrics import DUMP_INTERVAL_S, PipelineMetrics
+from playback import PlaybackEngine
+from prompt_cache import MAX_BYTES as PROMPT_CACHE_BYTES, PromptAudioCache
+from screen_capture import ScreenGrabber
+from shared_resource import SharedResource
+from transcript import Transcript
+from uplink import AUDIO_STREAM_END, COALESCE_MS, OutboundMux, is_video
+from vad import VoiceActivityGate
+
 from google import genai
 from google.genai import types
 
@@ -67,199 +77,453 @@ CONFIG = types.LiveConnectConfig(
     ),
 )
 
-pya = pyaudio.PyAudio()
+# Created by the first agent that needs a real device and terminated when the
+# last one closes, so sessions can share a process.
+shared_pyaudio = SharedResource(pyaudio.PyAudio, pyaudio.PyAudio.terminate)
+
+
+DEFAULT_QUESTIONS = [
+    Question("intro", "Hello, thank you for joining. To start, could you please tell me about yourself?",
+             next="project", cache=True),
+    Question("project", "That's insightful. Can you describe a challenging project you've worked on and how you handled it?",
+             next="closing"),
+    Question("closing", "Thank you. That concludes our interview.", listen=False, cache=True),
+]
+
+
+def _voice_name(config):
+    """The prebuilt voice a LiveConnectConfig speaks with, for cache keys."""
+    try:
+        return config.speech_config.voice_config.prebuilt_voice_config.voice_name or "default"
+    except AttributeError:
+        return "default"
 
 
 # --- Main Agent Class ---
 class LiveInterviewAgent:
     """
     A controllable agent for conducting a live, multimodal interview.
+
+    By default it talks to the local microphone, speaker and camera/screen.
+    A session host can plug in its own media instead:
+
+    - audio_source: async-iterable of 16 kHz PCM chunks with open()/close()/
+      stats() (default: CallbackMicrophone),
+    - audio_sink: PlaybackEngine-like player for the model's 24 kHz audio
+      (the defaults, and the shared PyAudio they need, are only created when
+      run_interview_session() starts),
+    - video_source: object with grab() -> BGR/BGRA frame or None, and close()
+      (default: the camera or screen, per video_mode),
+    - executor: where blocking capture/encode work runs (default: the loop's
+      default executor),
+    - genai_client/config: the genai client and LiveConnectConfig to connect with,
+    - session_pool: a LiveSessionPool to take an already-connected session
+      from instead of connecting when the interview starts,
+    - prompt_cache: a PromptAudioCache for ask_question(..., cache=True) lines,
+    - metrics: a PipelineMetrics for per-stage latencies and queue depths
+      (default: one without a dump file, summarized in stats()).
     """
-    def __init__(self, video_mode=DEFAULT_MODE):
+    def __init__(self, video_mode=DEFAULT_MODE, change_threshold=DEFAULT_THRESHOLD,
+                 keyframe_interval=KEYFRAME_INTERVAL, min_frame_interval=MIN_INTERVAL,
+                 max_frame_interval=MAX_INTERVAL, coalesce_ms=COALESCE_MS, vad_gate=False,
+                 audio_source=None, audio_sink=None, video_source=None, executor=None,
+                 genai_client=None, config=None, session_pool=None, prompt_cache=None, metrics=None):
         self.video_mode = video_mode
         self.audio_in_queue = None
-        self.out_queue = None
+        self.metrics = metrics or PipelineMetrics()
+        self.uplink = OutboundMux(coalesce_ms=coalesce_ms, metrics=self.metrics)
+        self.executor = executor
+        self.client = genai_client or client
+        self.config = config or CONFIG
+        self.session_pool = session_pool
+        self.session_wait_s = None  # how long the interview waited for its session
+        self.prompt_cache = prompt_cache
+        self.voice_name = _voice_name(self.config)
+        # (text, bytearray) while the model speaks a prompt we want to cache.
+        self._recording = None
+        # When the last question went to the model, until its audio arrives.
+        self._asked_at = None
+        self._pya = None
+        self._audio_source = audio_source
+        self._audio_sink = audio_sink
+        self.mic = audio_source
+        self.player = audio_sink
+        # Optional: only stream the candidate's speech, not their thinking pauses.
+        self.vad_gate = (
+            VoiceActivityGate(SEND_SAMPLE_RATE, chunk_ms=1000 * CHUNK_SIZE / SEND_SAMPLE_RATE)
+            if vad_gate else None
+        )
         self.session = None
-        self.audio_stream = None
 
         # NEW: Event to control when the agent is listening for a user response.
         self.is_listening = asyncio.Event()
-        # NEW: Buffer to store the complete transcribed text of an answer.
-        self.transcribed_response = ""
-
-    # --- Original Helper Functions (Unchanged) ---
-    def _get_frame(self, cap):
-        ret, frame = cap.read()
-        if not ret: return None
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = PIL.Image.fromarray(frame_rgb)
-        img.thumbnail([1024, 1024])
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
-        mime_type = "image/jpeg"
-        image_bytes = image_io.read()
-        return {"mime_type": mime_type, "data": base64.b64encode(image_bytes).decode()}
+        # Timestamped text fragments of every answer, grouped by turn.
+        self.transcript = Transcript()
+        # Future for the answer listen_for_answer() is waiting on, if any.
+        self._answer = None
+
+        self.frame_encoder = FrameEncoder()
+        self.screen_grabber = ScreenGrabber()
+        self.frame_filter = FrameChangeDetector(change_threshold, keyframe_interval)
+        self.frame_scheduler = FrameScheduler(min_frame_interval, max_frame_interval)
+
+        # Screen frames go through the grabber's own encoder, everything else
+        # through frame_encoder.
+        self._video_encoder = self.frame_encoder
+        if video_source is None and video_mode == "camera":
+            video_source = CameraSource(self.frame_encoder)
+        elif video_source is None and video_mode == "screen":
+            video_source = self.screen_grabber
+            self._video_encoder = self.screen_grabber.encoder
+        self.video_source = video_source
+
+    def stats(self):
+        """Per-component counters, printed when the session closes."""
+        return {
+            "camera": self.frame_encoder.stats(),
+            "screen": self.screen_grabber.stats(),
+            "frame_filter": self.frame_filter.stats(),
+            "frame_scheduler": self.frame_scheduler.stats(),
+            "uplink": self.uplink.stats(),
+            "mic": self.mic.stats() if self.mic else None,
+            "player": self.player.stats() if self.player else None,
+            "vad_gate": self.vad_gate.stats() if self.vad_gate else None,
+            "session_wait_ms": round(1000 * self.session_wait_s, 1) if self.session_wait_s is not None else None,
+            "prompt_cache": self.prompt_cache.stats() if self.prompt_cache else None,
+            "pipeline": self.metrics.stats(),
+        }
+
+    # --- Original Helper Functions ---
+    def _run_blocking(self, fn, *args):
+        """Runs blocking work on this session's executor."""
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _get_frame(self):
+        frame = self.video_source.grab()
+        if frame is None: return None
+        if not self.frame_filter.should_send(frame): return UNCHANGED
+        msg = self._video_encoder.encode_message(frame)
+        # A frame that failed to encode is skipped; only a failed grab ends the loop.
+        if msg is None: return UNCHANGED
+        self.frame_filter.commit()
+        return msg
 
     async def get_frames(self):
-        cap = await asyncio.to_thread(cv2.VideoCapture, 0)
-        while True:
-            frame = await asyncio.to_thread(self._get_frame, cap)
-            if frame is None: break
-            await asyncio.sleep(1.0)
-            await self.out_queue.put(frame)
-        cap.release()
-
-    def _get_screen(self):
-        sct = mss.mss()
-        monitor = sct.monitors[0]
-        i = sct.grab(monitor)
-        image_bytes = mss.tools.to_png(i.rgb, i.size)
-        img = PIL.Image.open(io.BytesIO(image_bytes))
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
-        image_bytes = image_io.read()
-        return {"mime_type": "image/jpeg", "data": base64.b64encode(image_bytes).decode()}
-
-    async def get_screen(self):
-        while True:
-            frame = await asyncio.to_thread(self._get_screen)
-            if frame is None: break
-            await asyncio.sleep(1.0)
-            await self.out_queue.put(frame)
+        """Captures from video_source (camera, screen or plugged in) at the scheduler's pace."""
+        try:
+            while True:
+                self.frame_scheduler.start()
+                start = time.monotonic()
+                frame = await self._run_blocking(self._get_frame)
+                if frame is None: break
+                self.metrics.since("video_capture", start)
+                if frame is not UNCHANGED:
+                    self.uplink.put_video(frame)
+                await self.frame_scheduler.wait(self.uplink.fill())
+        finally:
+            self.video_source.close()
 
     async def play_audio(self):
-        stream = await asyncio.to_thread(
-            pya.open, format=FORMAT, channels=CHANNELS,
-            rate=RECEIVE_SAMPLE_RATE, output=True)
+        await self.player.open()
         while True:
-            bytestream = await self.audio_in_queue.get()
-            await asyncio.to_thread(stream.write, bytestream)
+            received_at, bytestream = await self.audio_in_queue.get()
+            start = time.monotonic()
+            self.metrics.observe("playout_wait", start - received_at)
+            await self.player.write(bytestream)
+            self.metrics.since("player_write", start)
+
+    def interrupt_playback(self):
+        """Stops the AI's speech within one playback buffer period."""
+        # audio_in_queue stays unbounded so the receive loop keeps reading
+        # eagerly and sees interruptions as soon as they're sent.
+        while not self.audio_in_queue.empty():
+            self.audio_in_queue.get_nowait()
+        heard = self.player.flush()
+        print(f"\nAI interrupted after {heard:.1f}s of speech.")
+        return heard
 
     # --- Refactored & New Methods ---
 
     async def send_realtime(self):
-        """Continuously sends audio/video from the out_queue."""
+        """Continuously sends audio/video from the uplink, audio first."""
         while True:
-            msg = await self.out_queue.get()
+            msg = await self.uplink.get()
             # The session is guaranteed to exist inside the 'run' context
-            await self.session.send(input=msg)
+            start = time.monotonic()
+            if msg is AUDIO_STREAM_END:
+                # The VAD gate stopped sending silence; tell the server so its
+                # own activity detection can still close the turn.
+                await self.session.send_realtime_input(audio_stream_end=True)
+                stage = "send_audio_end"
+            else:
+                await self.session.send(input=msg)
+                stage = "send_video" if is_video(msg) else "send_audio"
+            elapsed = time.monotonic() - start
+            if stage == "send_video":
+                self.frame_scheduler.record_send(elapsed)
+            self.metrics.observe(stage, elapsed)
 
     async def listen_audio(self):
         """Records audio from mic, controlled by the is_listening event."""
-        mic_info = pya.get_default_input_device_info()
-        self.audio_stream = await asyncio.to_thread(
-            pya.open, format=FORMAT, channels=CHANNELS, rate=SEND_SAMPLE_RATE,
-            input=True, input_device_index=mic_info["index"], frames_per_buffer=CHUNK_SIZE)
-        
-        kwargs = {"exception_on_overflow": False} if __debug__ else {}
-
-        while True:
-            # Block here until listen_for_answer() sets the event
-            await self.is_listening.wait()
-            data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **kwargs)
-            await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
+        await self.mic.open()
+        async for data in self.mic:
+            captured_at = getattr(self.mic, "captured_at", None)
+            if captured_at is not None:
+                self.metrics.since("mic_read", captured_at)
+            # The callback stream runs all the time; keep draining it so stale
+            # audio doesn't pile up, but only send while listen_for_answer()
+            # has set the event.
+            if not self.is_listening.is_set():
+                continue
+            if self.vad_gate is None:
+                self.uplink.put_audio({"data": data, "mime_type": "audio/pcm"})
+                continue
+            decision = self.vad_gate.process(data)
+            for chunk in decision.chunks:
+                self.uplink.put_audio({"data": chunk, "mime_type": "audio/pcm"})
+            if decision.activity_end:
+                self.uplink.put_audio_end()
 
     async def receive_and_process_responses(self):
         """Processes incoming data, populates queues, and manages state."""
         while True:
-            turn = await self.session.receive()
+            turn = self.session.receive()
+            speaking = False
+            last_audio_at = None
             async for response in turn:
+                content = response.server_content
+                if content and content.interrupted:
+                    # Barge-in: flush now instead of after the turn ends.
+                    self.interrupt_playback()
+                    speaking = False
+                    self._recording = None  # don't cache a cut-off prompt
+                    continue
                 if data := response.data:
-                    self.audio_in_queue.put_nowait(data)
+                    now = time.monotonic()
+                    if not speaking:
+                        self.player.begin_utterance()
+                        speaking = True
+                        if self._asked_at is not None:
+                            self.metrics.observe("question_to_audio", now - self._asked_at)
+                            self._asked_at = None
+                    elif last_audio_at is not None:
+                        self.metrics.observe("receive_audio_gap", now - last_audio_at)
+                    last_audio_at = now
+                    self.audio_in_queue.put_nowait((now, data))
+                    self.metrics.gauge("audio_in_queue", self.audio_in_queue.qsize())
+                    if self._recording is not None:
+                        self._recording[1].extend(data)
                 if text := response.text:
-                    self.transcribed_response += text
+                    self.transcript.append(text)
                     print(f"User Said (live): {text.strip()}", end="\r")
-            
-            # This logic runs after a "turn" is complete (e.g., user stops talking).
-            if self.transcribed_response:
-                print(f"\nFinal Transcript: {self.transcribed_response.strip()}")
-                # Signal that listening is complete.
-                self.is_listening.clear()
+                if content and content.turn_complete and speaking:
+                    self._store_recording()
+                    self._complete_answer()
+            # receive() ends the iterator at turn_complete; this covers turns
+            # that end without the flag (e.g. a generation_complete-only turn).
+            self._complete_answer()
+            if speaking:
+                # The turn had audio but never completed; it may not be the
+                # whole prompt, so don't cache it.
+                self._recording = None
+
+    def _store_recording(self):
+        """Caches the audio of the prompt the model just finished speaking.
+
+        Only called for a turn that completed without an interruption. The
+        file write runs on the session's executor, off the receive loop.
+        """
+        if self._recording is None:
+            return
+        text, pcm = self._recording
+        self._recording = None
+        self._run_blocking(self.prompt_cache.put, text, self.voice_name, RECEIVE_SAMPLE_RATE, pcm)
+
+    def _complete_answer(self):
+        """Resolves the pending listen_for_answer() with the turn's transcript."""
+        answer = self._answer
+        if answer is None or answer.done() or not self.transcript.turn_length():
+            return
+        text = self.transcript.turn_text().strip()
+        print(f"\nFinal Transcript: {text}")
+        self.transcript.end_turn()
+        answer.set_result(text)
+
+    @property
+    def transcribed_response(self):
+        """Text of the current answer so far."""
+        return self.transcript.turn_text()
+
+    def partial_answer(self):
+        """Async iterator over the current answer's fragments as they arrive."""
+        return self.transcript.stream()
 
     # NEW: Orchestrator-callable method to ask a question.
-    async def ask_question(self, text: str):
-        """Sends a text question to be spoken aloud by the AI."""
-        if self.session:
-            print(f"\nAI Asks: {text}")
-            await self.session.send(input=text, end_of_turn=False)
+    async def ask_question(self, text: str, cache=False):
+        """Sends a text question to be spoken aloud by the AI.
+
+        With cache=True and a prompt_cache, a fixed line is played from local
+        audio when it has been spoken before (and recorded the first time),
+        and the session is only told what was said.
+        """
+        if not self.session:
+            return
+        print(f"\nAI Asks: {text}")
+        if cache and self.prompt_cache is not None:
+            pcm = self.prompt_cache.get(text, self.voice_name, RECEIVE_SAMPLE_RATE)
+            if pcm is not None:
+                self.player.begin_utterance()
+                self.audio_in_queue.put_nowait((time.monotonic(), pcm))
+                await self.session.send_client_content(
+                    turns=types.Content(role="model", parts=[types.Part(text=text)]),
+                    turn_complete=False,
+                )
+                return
+            self._recording = (text, bytearray())
+        self._asked_at = time.monotonic()
+        await self.session.send(input=text, end_of_turn=False)
 
     # NEW: Orchestrator-callable method to listen for an answer.
-    async def listen_for_answer(self) -> str:
-        """Listens for and returns the final transcribed text of a user's answer."""
-        self.transcribed_response = ""
+    async def listen_for_answer(self, timeout=None) -> str:
+        """Listens for and returns the final transcribed text of a user's answer.
+
+        Resolves as soon as the answer's turn_complete arrives. Raises
+        TimeoutError if timeout seconds pass first; cancelling the call stops
+        listening too.
+        """
+        self.transcript.begin_turn()
+        if self.vad_gate:
+            self.vad_gate.reset()
+        self._answer = asyncio.get_running_loop().create_future()
         self.is_listening.set()  # Start the listen_audio loop
-
-        # Wait here until receive_and_process_responses clears the event
-        while self.is_listening.is_set():
-            await asyncio.sleep(0.1)
-        
-        return self.transcribed_response.strip()
+        try:
+            return await asyncio.wait_for(self._answer, timeout)
+        finally:
+            self.is_listening.clear()
+            self.transcript.end_turn()
+            self._answer = None
+
+    async def conduct_interview(self):
+        """The default interview script, run once the session is up."""
+        # Your other agents would plug in here as the plan's generator, with
+        # follow_up questions in place of the fixed ones.
+        await InterviewPlan(DEFAULT_QUESTIONS).run(self)
+
+    def _open_local_audio(self):
+        """Creates the default microphone and speaker, on the shared PyAudio.
+
+        They're made afresh for every session, since close() may have
+        terminated the PyAudio the last ones were opened on.
+        """
+        if self._pya is not None or (self._audio_source is not None and self._audio_sink is not None):
+            return
+        self._pya = shared_pyaudio.acquire()
+        if self._audio_source is None:
+            self.mic = CallbackMicrophone(self._pya, rate=SEND_SAMPLE_RATE, chunk=CHUNK_SIZE,
+                                          channels=CHANNELS, fmt=FORMAT, executor=self.executor)
+        if self._audio_sink is None:
+            self.player = PlaybackEngine(self._pya, rate=RECEIVE_SAMPLE_RATE,
+                                         channels=CHANNELS, fmt=FORMAT, executor=self.executor)
 
     # MODIFIED: Main execution loop, demonstrating programmatic control.
-    async def run_interview_session(self):
-        """Main loop managed by the orchestrator."""
+    async def run_interview_session(self, script=None):
+        """Main loop managed by the orchestrator.
+
+        script is an async callable taking the agent, e.g. an InterviewPlan
+        (default: conduct_interview). The session's I/O tasks are stopped once
+        it returns. Cancellation and the TaskGroup's ExceptionGroup propagate
+        to the caller; the session is closed either way.
+        """
+        script = script or LiveInterviewAgent.conduct_interview
+        self._open_local_audio()
+        if self.session_pool is not None:
+            connect = self.session_pool.session()
+        else:
+            connect = self.client.aio.live.connect(model=MODEL, config=self.config)
+        start = time.monotonic()
         try:
             async with (
-                client.aio.live.connect(model=MODEL, config=CONFIG) as session,
+                connect as session,
                 asyncio.TaskGroup() as tg,
             ):
+                self.session_wait_s = time.monotonic() - start
                 self.session = session
                 self.audio_in_queue = asyncio.Queue()
-                self.out_queue = asyncio.Queue(maxsize=10)
 
                 # Start all the background I/O tasks
-                tg.create_task(self.send_realtime())
-                tg.create_task(self.listen_audio())
-                tg.create_task(self.receive_and_process_responses())
-                tg.create_task(self.play_audio())
-                if self.video_mode in ["camera", "screen"]:
-                    tg.create_task(self.get_frames() if self.video_mode == "camera" else self.get_screen())
+                tasks = [
+                    tg.create_task(self.send_realtime()),
+                    tg.create_task(self.listen_audio()),
+                    tg.create_task(self.receive_and_process_responses()),
+                    tg.create_task(self.play_audio()),
+                ]
+                if self.video_source is not None:
+                    tasks.append(tg.create_task(self.get_frames()))
+                if self.metrics.path:
+                    tasks.append(tg.create_task(self.metrics.run()))
 
                 # --- This is where your Orchestrator takes control ---
                 print("✅ Interview session started. Waiting for orchestrator...")
-
-                # 1. Ask the first question
-                await self.ask_question("Hello, thank you for joining. To start, could you please tell me about yourself?")
-
-                # 2. Listen for the user's answer
-                answer1 = await self.listen_for_answer()
-                print(f"📋 Orchestrator received answer 1: {answer1}")
-
-                # 3. Your other agents would now process this answer...
-                # ...and generate the next question.
-                next_question = "That's insightful. Can you describe a challenging project you've worked on and how you handled it?"
-
-                # 4. Ask the next question
-                await self.ask_question(next_question)
-
-                # 5. Listen for the next answer
-                answer2 = await self.listen_for_answer()
-                print(f"📋 Orchestrator received answer 2: {answer2}")
-                
-                await self.ask_question("Thank you. That concludes our interview.")
-                await asyncio.sleep(5) # Give time for the final audio to play
+                await script(self)
+                for task in tasks:
+                    task.cancel()
 
         except asyncio.CancelledError:
-            print("Session cancelled by user.")
-        except ExceptionGroup as eg:
-            print(f"An error occurred: {eg}")
-            traceback.print_exception(eg)
+            print("Session cancelled.")
+            raise
         finally:
-            if self.audio_stream:
-                self.audio_stream.close()
-            pya.terminate()
-            print("Session closed cleanly.")
+            self.close()
+            print(f"Session stats: {self.stats()}")
+            print("Session closed.")
+
+    def close(self):
+        """Closes the session's media and releases its share of PyAudio."""
+        if self.mic is not None:
+            self.mic.close()
+        if self.player is not None:
+            self.player.close()
+        if self._pya is not None:
+            self._pya = None
+            shared_pyaudio.release()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--mode", type=str, default=DEFAULT_MODE,
         help="Pixels to stream from", choices=["camera", "screen", "none"])
+    parser.add_argument("--change-threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Skip frames whose mean pixel difference from the last sent frame is below this")
+    parser.add_argument("--keyframe-interval", type=float, default=KEYFRAME_INTERVAL,
+        help="Always send a frame at least this often, in seconds")
+    parser.add_argument("--min-frame-interval", type=float, default=MIN_INTERVAL,
+        help="Fastest video capture interval, in seconds")
+    parser.add_argument("--max-frame-interval", type=float, default=MAX_INTERVAL,
+        help="Slowest video capture interval when the uplink is busy, in seconds")
+    parser.add_argument("--coalesce-ms", type=int, default=COALESCE_MS,
+        help="Join mic audio into sends of about this many ms (20-200, 0 to disable)")
+    parser.add_argument("--vad", action="store_true",
+        help="Only stream the candidate's speech (plus padding), not silence")
+    parser.add_argument("--prompt-cache", metavar="DIR",
+        help="Play the fixed greeting/closing lines from audio cached in DIR")
+    parser.add_argument("--prompt-cache-mb", type=int, default=PROMPT_CACHE_BYTES // (1024 * 1024),
+        help="Size limit of the prompt cache, in MB")
+    parser.add_argument("--metrics", metavar="PATH",
+        help="Write per-stage latency histograms and queue depths to PATH as JSON")
+    parser.add_argument("--metrics-interval", type=float, default=DUMP_INTERVAL_S,
+        help="Seconds between metrics dumps")
     args = parser.parse_args()
     
-    agent = LiveInterviewAgent(video_mode=args.mode)
+    agent = LiveInterviewAgent(video_mode=args.mode, change_threshold=args.change_threshold,
+                               keyframe_interval=args.keyframe_interval,
+                               min_frame_interval=args.min_frame_interval,
+                               max_frame_interval=args.max_frame_interval,
+                               coalesce_ms=args.coalesce_ms, vad_gate=args.vad,
+                               prompt_cache=PromptAudioCache(args.prompt_cache, args.prompt_cache_mb * 1024 * 1024)
+                               if args.prompt_cache else None,
+                               metrics=PipelineMetrics(args.metrics, args.metrics_interval))
     try:
         asyncio.run(agent.run_interview_session())
     except KeyboardInterrupt:
-        print("\nExiting application.")
\ No newline at end of file
+        print("\nExiting application.")
+    except ExceptionGroup as eg:
+        print(f"An error occurred: {eg}")
+        traceback.print_exception(eg)
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+## Live session pool
+Keeps Live API sessions connected ahead of time, so an interview starts on an
+already-open session instead of waiting for the TLS/websocket handshake and
+session setup.
+
+LiveSessionPool holds `size` connected, configured sessions. session() hands
+one over straight away and starts connecting its replacement in the
+background. It only falls back to connecting on the spot (a "miss") when
+none are ready. Warm sessions that have sat unused for max_idle_s are closed
+and replaced before the server's idle/connection limits can close them under
+us. A handed-over session belongs to its interview and is closed when the
+interview ends; sessions carry conversation state, so they're never reused.
+
+    pool = LiveSessionPool(lambda: client.aio.live.connect(model=MODEL, config=CONFIG), size=2)
+    async with pool:
+        agent = LiveInterviewAgent(session_pool=pool)
+        await agent.run_interview_session()
+
+stats() reports connect latency (paid in the background) against hand-off
+latency (what the interview actually waits for).
+"""
+
+import asyncio
+import collections
+import contextlib
+import time
+
+from pipeline_metrics import LogLinearHistogram
+
+POOL_SIZE = 2
+MAX_IDLE_S = 300  # replace warm sessions well before the server's limits
+REFRESH_INTERVAL_S = 1.0
+RETRY_DELAY_S = 2.0
+
+_WarmSession = collections.namedtuple("_WarmSession", ["context", "session", "connected_at"])
+
+
+class LiveSessionPool:
+    """Pre-connected Live sessions, handed out one per interview.
+
+    connect is a zero-argument callable returning the async context manager
+    that opens a session, e.g. client.aio.live.connect(model=..., config=...).
+    """
+
+    def __init__(self, connect, size=POOL_SIZE, max_idle_s=MAX_IDLE_S,
+                 refresh_interval_s=REFRESH_INTERVAL_S):
+        self._connect = connect
+        self.size = size
+        self.max_idle_s = max_idle_s
+        self.refresh_interval_s = refresh_interval_s
+        self._warm = collections.deque()
+        self._connecting = 0
+        self._connects = set()
+        self._discards = set()
+        self._maintainer = None
+
+        self.connect_latency = LogLinearHistogram()
+        self.handoff_latency = LogLinearHistogram()
+        self.hits = 0
+        self.misses = 0
+        self.replaced = 0
+        self.connect_errors = 0
+
+    async def start(self):
+        self._maintainer = asyncio.create_task(self._maintain())
+        return self
+
+    async def close(self):
+        """Stops refilling and closes every session that wasn't handed out."""
+        tasks = list(self._connects)
+        if self._maintainer is not None:
+            tasks.append(self._maintainer)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        warm, self._warm = list(self._warm), collections.deque()
+        await asyncio.gather(*self._discards, *(self._discard(w) for w in warm))
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _open(self):
+        context = self._connect()
+        start = time.monotonic()
+        session = await context.__aenter__()
+        now = time.monotonic()
+        self.connect_latency.record(now - start)
+        return _WarmSession(context, session, now)
+
+    async def _discard(self, warm):
+        try:
+            await warm.context.__aexit__(None, None, None)
+        except Exception:
+            pass
+
+    async def _connect_one(self):
+        try:
+            warm = await self._open()
+        except Exception:
+            self.connect_errors += 1
+            await asyncio.sleep(RETRY_DELAY_S)
+        else:
+            # Not self._warm.append(await ...): _evict_stale() may have
+            # replaced the deque while this was connecting.
+            self._warm.append(warm)
+        finally:
+            self._connecting -= 1
+
+    def _refill(self):
+        while len(self._warm) + self._connecting < self.size:
+            self._connecting += 1
+            task = asyncio.create_task(self._connect_one())
+            self._connects.add(task)
+            task.add_done_callback(self._connects.discard)
+
+    def _evict_stale(self):
+        now = time.monotonic()
+        fresh = collections.deque()
+        for warm in self._warm:
+            if now - warm.connected_at < self.max_idle_s:
+                fresh.append(warm)
+            else:
+                self.replaced += 1
+                task = asyncio.create_task(self._discard(warm))
+                self._discards.add(task)
+                task.add_done_callback(self._discards.discard)
+        self._warm = fresh
+
+    async def _maintain(self):
+        while True:
+            self._evict_stale()
+            self._refill()
+            await asyncio.sleep(self.refresh_interval_s)
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        """Hands over a connected session for one interview, closing it afterwards."""
+        start = time.monotonic()
+        self._evict_stale()
+        if self._warm:
+            self.hits += 1
+            warm = self._warm.popleft()
+        else:
+            self.misses += 1
+            warm = await self._open()
+        self.handoff_latency.record(time.monotonic() - start)
+        self._refill()
+        try:
+            yield warm.session
+        except BaseException as e:
+            if not await warm.context.__aexit__(type(e), e, e.__traceback__):
+                raise
+        else:
+            await warm.context.__aexit__(None, None, None)
+
+    def stats(self):
+        return {
+            "warm": len(self._warm),
+            "hits": self.hits,
+            "misses": self.misses,
+            "replaced": self.replaced,
+            "connect_errors": self.connect_errors,
+            "connect": self.connect_latency.snapshot(),
+            "handoff": self.handoff_latency.snapshot(),
+        }
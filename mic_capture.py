@@ -0,0 +1,176 @@
+"""
+## Microphone capture
+Callback-driven microphone source for the asyncio agents.
+
+listen_audio used to call asyncio.to_thread(stream.read, CHUNK_SIZE) for every
+chunk. That is one thread-pool hop every 64 ms, on the same default executor
+as frame capture and playback, and overruns were silently swallowed by
+exception_on_overflow=False.
+
+CallbackMicrophone opens the PyAudio stream with a stream_callback (as
+googleAPI.MicrophoneStream does). PortAudio's thread copies each chunk into a
+preallocated ring of fixed-size slots and wakes the event loop with
+call_soon_threadsafe. Consumers read it as an async iterator:
+
+    async with CallbackMicrophone(pya, rate=16000, chunk=1024) as mic:
+        async for data in mic:
+            ...
+
+Overflow events are counted: both the device's own paInputOverflow flags and
+ring overruns, where the consumer fell behind and the oldest chunk was
+overwritten. paInputUnderflow flags are counted as underruns.
+
+Each slot is stamped with time.monotonic() when the callback fills it;
+captured_at holds the stamp of the chunk read last, so consumers can time
+how long audio waited in the ring.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+
+import pyaudio
+
+RING_SLOTS = 32
+
+
+class CallbackMicrophone:
+    """Async-iterable microphone backed by a preallocated ring buffer."""
+
+    def __init__(self, pya, rate, chunk, channels=1, fmt=pyaudio.paInt16,
+                 device_index=None, slots=RING_SLOTS, executor=None):
+        self._pya = pya
+        self._executor = executor  # where open() runs (default: the loop's default executor)
+        self._rate = rate
+        self._chunk = chunk
+        self._channels = channels
+        self._format = fmt
+        self._device_index = device_index
+
+        self._slot_bytes = chunk * channels * pyaudio.get_sample_size(fmt)
+        self._slots = slots
+        self._ring = bytearray(self._slot_bytes * slots)
+        self._lengths = [0] * slots
+        self._stamps = [0.0] * slots
+        self._read = 0  # total slots consumed
+        self._write = 0  # total slots produced
+        self._lock = threading.Lock()
+
+        self._loop = None
+        self._readable = None
+        self._stream = None
+        self.closed = True
+        self.captured_at = None
+
+        self.chunks = 0
+        self.device_overflows = 0
+        self.device_underflows = 0
+        self.ring_overruns = 0
+
+    async def open(self):
+        self._loop = asyncio.get_running_loop()
+        self._readable = asyncio.Event()
+        if self._device_index is None:
+            self._device_index = self._pya.get_default_input_device_info()["index"]
+        # Opening the device can take a while, so keep it off the event loop.
+        self._stream = await self._loop.run_in_executor(self._executor, functools.partial(
+            self._pya.open,
+            format=self._format,
+            channels=self._channels,
+            rate=self._rate,
+            input=True,
+            input_device_index=self._device_index,
+            frames_per_buffer=self._chunk,
+            stream_callback=self._fill_buffer,
+        ))
+        self.closed = False
+        return self
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        self.closed = True
+        if self._readable is not None:
+            # Wake a pending read() so the iterator can finish.
+            self._loop.call_soon_threadsafe(self._readable.set)
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def _fill_buffer(self, in_data, frame_count, time_info, status_flags):
+        """PortAudio callback: copy the chunk into the next ring slot."""
+        if status_flags & pyaudio.paInputOverflow:
+            self.device_overflows += 1
+        if status_flags & pyaudio.paInputUnderflow:
+            self.device_underflows += 1
+
+        size = min(len(in_data), self._slot_bytes)
+        with self._lock:
+            if self._write - self._read >= self._slots:
+                # Consumer is a whole ring behind: overwrite the oldest chunk.
+                self._read += 1
+                self.ring_overruns += 1
+            slot = self._write % self._slots
+            offset = slot * self._slot_bytes
+            self._ring[offset:offset + size] = in_data[:size]
+            self._lengths[slot] = size
+            self._stamps[slot] = time.monotonic()
+            self._write += 1
+        self.chunks += 1
+        self._loop.call_soon_threadsafe(self._readable.set)
+        return None, pyaudio.paContinue
+
+    def _pop(self):
+        with self._lock:
+            if self._read == self._write:
+                return None
+            slot = self._read % self._slots
+            offset = slot * self._slot_bytes
+            data = bytes(self._ring[offset:offset + self._lengths[slot]])
+            self.captured_at = self._stamps[slot]
+            self._read += 1
+            return data
+
+    def pending(self):
+        """Number of chunks captured but not yet read."""
+        with self._lock:
+            return self._write - self._read
+
+    async def read(self):
+        """Waits for the next chunk. Returns None once the stream is closed."""
+        while True:
+            data = self._pop()
+            if data is not None:
+                return data
+            if self.closed:
+                return None
+            self._readable.clear()
+            # Re-check after clearing, so a chunk that landed in between
+            # isn't left waiting for the next callback.
+            data = self._pop()
+            if data is not None:
+                return data
+            await self._readable.wait()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        data = await self.read()
+        if data is None:
+            raise StopAsyncIteration
+        return data
+
+    def stats(self):
+        return {
+            "chunks": self.chunks,
+            "device_overflows": self.device_overflows,
+            "device_underflows": self.device_underflows,
+            "ring_overruns": self.ring_overruns,
+        }
@@ -1,17 +1,30 @@
 # main_whisper.py
 
+import argparse
 import collections
+import concurrent.futures
+import queue
+import threading
+import time
+
 import numpy as np
 import pyaudio
 import torch
-import webrtcvad
-from whisper import load_model, transcribe
+from whisper import transcribe
+
+from vad import SILENCE_THRESHOLD_MS, AdaptiveEndpointer, SpeechClassifier, SpeechSegmenter
+from whisper_features import IncrementalLogMel, decode_features
+from whisper_runtime import PRECISIONS, load_whisper, model_device
+from whisper_service import WhisperServiceClient
+from whisper_stream import StreamingTranscriber
 
 # --- Configuration ---
 MODEL_SIZE = "small.en"  # "base.en" for English-only, "base" for multilingual.
 # Other sizes: "tiny.en", "small.en", "medium.en"
 # GPU is highly recommended.
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+PRECISION = "fp32"  # "int8" quantizes the model for CPU-only boxes (see whisper_runtime.py)
+TORCH_THREADS = None  # None lets torch use every core
 
 # Audio parameters  
 FORMAT = pyaudio.paInt16
@@ -22,14 +35,12 @@ CHUNK_SIZE = int(RATE * FRAME_DURATION_MS / 1000)  # Chunks for VAD
 
 # VAD and Transcription Logic
 VAD_AGGRESSIVENESS = 0  # 0 (least aggressive) to 3 (most aggressive)
-SILENCE_THRESHOLD_MS = 700  # How long a pause triggers transcription
-SPEECH_PAD_MS = 200 # Add padding before/after speech to avoid cutting words off
 
 class VADAudio:
     """A class to handle audio recording and Voice Activity Detection."""
 
     def __init__(self, aggressiveness=VAD_AGGRESSIVENESS, device=None):
-        self.vad = webrtcvad.Vad(aggressiveness)
+        self.vad = SpeechClassifier(RATE, aggressiveness, FRAME_DURATION_MS)
         self._p = pyaudio.PyAudio()
         self.stream = self._p.open(
             format=FORMAT,
@@ -44,7 +55,7 @@ class VADAudio:
 
     def __next__(self):
         frame = self.stream.read(CHUNK_SIZE)
-        is_speech = self.vad.is_speech(frame, RATE)
+        is_speech = self.vad.is_speech(frame)
         return frame, is_speech
 
     def close(self):
@@ -52,64 +63,324 @@ class VADAudio:
         self.stream.close()
         self._p.terminate()
 
-def main():
-    """Continuously listens, detects speech, and transcribes it using Whisper."""
-    print(f"Loading Whisper model '{MODEL_SIZE}' on device '{DEVICE}'...")
-    model = load_model(MODEL_SIZE, device=DEVICE)
-    print("Model loaded. Ready to listen.")
+# Capture/transcription decoupling
+QUEUE_SIZE = 4  # finished utterances waiting for a worker
+DROP_POLICIES = ("oldest", "newest")  # which utterance to drop when the queue is full
 
-    vad_audio = VADAudio()
-    
-    # Ring buffer to hold a bit of audio before speech is detected
-    padding_frames_count = SILENCE_THRESHOLD_MS // FRAME_DURATION_MS
-    speech_frames_count = SPEECH_PAD_MS // FRAME_DURATION_MS
+# mel is the utterance's precomputed log-mel (see whisper_features), or None.
+Job = collections.namedtuple("Job", ["kind", "utterance_id", "audio", "speech_start", "speech_end", "queued_at", "mel"],
+                             defaults=(None,))
 
-    ring_buffer = collections.deque(maxlen=padding_frames_count)
-    triggered = False
-    speech_buffer = []
+# Model loaded once per worker process when running with --processes.
+_process_model = None
 
-    print("\nListening... (press Ctrl+C to exit)")
-    try:
-        for frame, is_speech in vad_audio:
-            if not triggered:
-                ring_buffer.append((frame, is_speech))
-                # Check if enough consecutive frames are speech to trigger
-                num_voiced = len([f for f, speech in ring_buffer if speech])
-                if num_voiced > 0.8 * ring_buffer.maxlen:
+
+def _init_process_worker(model_size, device, precision, threads):
+    global _process_model
+    _process_model = load_whisper(model_size, device, precision, threads)
+
+
+def _process_transcribe(audio, fp16):
+    return transcribe(_process_model, audio, language="en", fp16=fp16)["text"].strip()
+
+
+def _process_decode(mel, fp16):
+    return decode_features(_process_model, mel, fp16)
+
+
+def _process_n_mels():
+    return _process_model.dims.n_mels
+
+
+class TranscriptionPipeline:
+    """Producer/consumer runner: capture never waits for Whisper.
+
+    A capture thread reads the mic and feeds the SpeechSegmenter. Finished
+    utterances go onto a bounded queue, and worker threads transcribe them,
+    in-thread, in a process pool, or on a transcription service. When the
+    queue is full, drop_policy decides whether the oldest queued utterance or
+    the new one is dropped.
+
+    More than one worker needs processes or a service: every decode installs
+    kv-cache forward hooks on the model's decoder, so two threads decoding on
+    one model would mix each other's caches.
+
+    In streaming mode a single worker handles both partial and final jobs in
+    order. Partial jobs are only queued while the queue is empty, so a busy
+    decoder skips partials rather than falling behind.
+
+    Otherwise, with incremental_mel the capture thread also computes the
+    utterance's log-mel frames as they arrive, so at end of speech the worker
+    only runs the decoder (utterances over 30 s still go through transcribe).
+
+    With service set to a whisper_service.py socket path, no model is loaded
+    here and workers send utterances to the shared service instead.
+
+    adaptive_endpoint ends utterances before the fixed silence threshold when
+    vad.AdaptiveEndpointer is confident the answer is over. In streaming mode,
+    the partial transcripts feed its punctuation cue.
+    """
+
+    def __init__(self, model, workers=1, processes=False, queue_size=QUEUE_SIZE,
+                 drop_policy="oldest", stream=False, incremental_mel=True,
+                 precision=PRECISION, threads=TORCH_THREADS, service=None,
+                 adaptive_endpoint=False):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {DROP_POLICIES}")
+        if stream and (processes or workers != 1):
+            raise ValueError("streaming mode needs a single in-process worker")
+        if service and (stream or processes):
+            raise ValueError("the transcription service can't be combined with streaming or processes")
+        if workers != 1 and not (processes or service):
+            raise ValueError("more than one worker needs --processes or --service (a model can't decode on two threads)")
+        self.model = model
+        self.workers = workers
+        self.drop_policy = drop_policy
+        self.fp16 = model_device(DEVICE, precision) == "cuda"
+        self.streamer = StreamingTranscriber(model, rate=RATE, fp16=self.fp16) if stream else None
+        self.service = WhisperServiceClient(service) if service else None
+        self.endpointer = (
+            AdaptiveEndpointer(FRAME_DURATION_MS, max_silence_ms=SILENCE_THRESHOLD_MS)
+            if adaptive_endpoint else None
+        )
+        self.pool = (
+            concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=_init_process_worker, initargs=(MODEL_SIZE, DEVICE, precision, threads))
+            if processes else None
+        )
+        self.features = None
+        if incremental_mel and not stream and not service:
+            # large-v3 models take 128 mel bins, the rest 80; ask the model.
+            n_mels = model.dims.n_mels if model is not None else self.pool.submit(_process_n_mels).result()
+            self.features = IncrementalLogMel(n_mels)
+
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+        self._first_text = {}  # utterance_id -> time the first partial text appeared
+        self._streaming_id = None  # utterance the streamer's state belongs to
+        self._lock = threading.Lock()
+
+        self.utterances = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.latencies = []  # end of speech -> final text, seconds
+
+    def _put(self, job):
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full:
+            # A partial is only a preview; never evict a final to make room for one.
+            if self.drop_policy == "newest" or job.kind == "partial":
+                self._count_drop(job)
+                return
+            try:
+                self._count_drop(self.jobs.get_nowait())
+            except queue.Empty:
+                pass
+            self.jobs.put_nowait(job)
+        with self._lock:
+            self.max_depth = max(self.max_depth, self.jobs.qsize())
+
+    def _count_drop(self, job):
+        if job.kind == "final":
+            with self._lock:
+                self.dropped += 1
+                self._first_text.pop(job.utterance_id, None)
+            print(f"\n[dropped utterance {job.utterance_id}: transcription queue full]")
+
+    def capture(self, vad_audio):
+        """Capture-thread body: mic -> segmenter -> job queue."""
+        padding_frames_count = SILENCE_THRESHOLD_MS // FRAME_DURATION_MS
+        segmenter = SpeechSegmenter(CHUNK_SIZE, padding_frames_count, rate=RATE)
+        utterance_id = 0
+        try:
+            for frame, is_speech in vad_audio:
+                if self._stop.is_set():
+                    break
+                utterance = segmenter.push(frame, is_speech)
+                if segmenter.speech_started:
                     print("Speech detected...")
-                    triggered = True
-                    # Add preceding audio frames from buffer to catch start of utterance
-                    speech_buffer.extend([f for f, _ in ring_buffer])
-                    ring_buffer.clear()
+                    utterance_id += 1
+                    # The lead-in means speech actually began a bit before now.
+                    speech_start = time.monotonic() - len(segmenter.current()) / RATE
+                    partial_len = 0
+                    if self.features:
+                        self.features.reset()
+                        self.features.feed(segmenter.current())
+                elif self.features and (segmenter.triggered or utterance is not None):
+                    self.features.feed(frame)
+                if self.endpointer:
+                    if segmenter.speech_started:
+                        self.endpointer.start()
+                    elif utterance is not None:
+                        self.endpointer.end()
+                    elif self.endpointer.push(frame, is_speech) and segmenter.triggered:
+                        saved = segmenter.frames_to_end()
+                        utterance = segmenter.finish()
+                        endpoint = self.endpointer.end(saved)
+                        print(f"\nEndpoint after {endpoint['silence_ms']} ms of silence, "
+                              f"{endpoint['saved_ms']} ms earlier than the fixed rule "
+                              f"(cues: {', '.join(endpoint['cues']) or 'pause length'})")
+                if utterance is None:
+                    if self.streamer and segmenter.triggered:
+                        current = segmenter.current()
+                        # Only snapshot once a whole step of new audio is in,
+                        # and only if the worker has nothing else to do.
+                        if len(current) - partial_len >= self.streamer.step_samples and self.jobs.empty():
+                            partial_len = len(current)
+                            self._put(Job("partial", utterance_id, current.copy(),
+                                          speech_start, None, time.monotonic()))
+                    continue
+                print("\nSilence detected, transcribing...")
+                now = time.monotonic()
+                mel = self.features.finish() if self.features else None
+                self._put(Job("final", utterance_id, utterance, speech_start, now, now, mel))
+        finally:
+            vad_audio.close()
+
+    def _transcribe(self, audio, mel=None):
+        if self.service:
+            return self.service.transcribe(audio)
+        if mel is not None:
+            if self.pool:
+                return self.pool.submit(_process_decode, mel, self.fp16).result()
+            return decode_features(self.model, mel, self.fp16)
+        audio = audio.astype(np.float32) / 32768.0
+        if self.pool:
+            return self.pool.submit(_process_transcribe, audio, self.fp16).result()
+        return transcribe(self.model, audio, language="en", fp16=self.fp16)["text"].strip()
+
+    def _worker(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            if self.streamer and job.utterance_id != self._streaming_id:
+                # The previous utterance's final was dropped, so finish() never
+                # reset the streamer; don't carry its words or offsets over.
+                if self._streaming_id is not None:
+                    self.streamer.reset()
+                    with self._lock:
+                        self._first_text.pop(self._streaming_id, None)
+                self._streaming_id = job.utterance_id
+            if job.kind == "partial":
+                partial = self.streamer.update(job.audio)
+                if partial and (partial.committed or partial.tentative):
+                    with self._lock:
+                        self._first_text.setdefault(job.utterance_id, time.monotonic())
+                    print(f"... {partial.committed} [{partial.tentative}]", end="\r")
+                    if self.endpointer:
+                        self.endpointer.set_partial(f"{partial.committed} {partial.tentative}".strip())
+                continue
+
+            started = time.monotonic()
+            if self.streamer:
+                text = self.streamer.finish(job.audio)
+                self._streaming_id = None
             else:
-                speech_buffer.append(frame)
-                ring_buffer.append((frame, is_speech))
-                # Check if there's enough silence to consider the utterance ended
-                num_unvoiced = len([f for f, speech in ring_buffer if not speech])
-                if num_unvoiced > 0.9 * ring_buffer.maxlen:
-                    print("Silence detected, transcribing...")
-                    
-                    # 1. Prepare audio data
-                    audio_data_bytes = b"".join(speech_buffer)
-                    audio_data_np = np.frombuffer(audio_data_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-
-                    # 2. Transcribe
-                    result = transcribe(model, audio_data_np, language="en", fp16=torch.cuda.is_available())
-                    text = result['text'].strip()
-
-                    print("Transcription:", text)
-                    print("\nListening...")
-
-                    # Reset for next utterance
-                    triggered = False
-                    speech_buffer.clear()
-                    ring_buffer.clear()
+                text = self._transcribe(job.audio, job.mel)
+            done = time.monotonic()
+            with self._lock:
+                first_text = self._first_text.pop(job.utterance_id, done)
+                self.utterances += 1
+                self.latencies.append(done - job.speech_end)
+            print("Transcription:", text)
+            print(f"Latency: first text {first_text - job.speech_start:.2f}s after speech began, "
+                  f"final {done - job.speech_end:.2f}s after it ended "
+                  f"(queued {started - job.queued_at:.2f}s, decode {done - started:.2f}s, "
+                  f"queue depth {self.jobs.qsize()})")
+            print("\nListening...")
+
+    def start(self, vad_audio):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"transcriber-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        capture = threading.Thread(target=self.capture, args=(vad_audio,), name="capture", daemon=True)
+        capture.start()
+        return capture
 
+    def close(self):
+        self._stop.set()
+        for _ in self._threads:
+            self.jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self.pool:
+            self.pool.shutdown()
+        if self.service:
+            self.service.close()
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "utterances": self.utterances,
+            "dropped": self.dropped,
+            "max_queue_depth": self.max_depth,
+            "median_latency_s": round(latencies[len(latencies) // 2], 2) if latencies else None,
+            "max_latency_s": round(latencies[-1], 2) if latencies else None,
+            "endpointing": self.endpointer.stats() if self.endpointer else None,
+        }
+
+
+def main(stream=False, workers=1, processes=False, queue_size=QUEUE_SIZE, drop_policy="oldest",
+         incremental_mel=True, precision=PRECISION, threads=TORCH_THREADS, service=None,
+         adaptive_endpoint=False):
+    """Continuously listens, detects speech, and transcribes it using Whisper.
+
+    With stream=True, partial transcripts are printed while the speaker is
+    still talking (see whisper_stream.StreamingTranscriber).
+    """
+    model = None
+    if not processes and not service:
+        print(f"Loading Whisper model '{MODEL_SIZE}' ({precision}) on device '{model_device(DEVICE, precision)}'...")
+        model = load_whisper(MODEL_SIZE, DEVICE, precision, threads)
+        print("Model loaded. Ready to listen.")
+    pipeline = TranscriptionPipeline(model, workers=workers, processes=processes,
+                                     queue_size=queue_size, drop_policy=drop_policy, stream=stream,
+                                     incremental_mel=incremental_mel, precision=precision, threads=threads,
+                                     service=service, adaptive_endpoint=adaptive_endpoint)
+
+    vad_audio = VADAudio()
+
+    print("\nListening... (press Ctrl+C to exit)")
+    capture = pipeline.start(vad_audio)
+    try:
+        while capture.is_alive():
+            capture.join(timeout=0.5)
     except KeyboardInterrupt:
         print("\nExiting.")
     finally:
-        vad_audio.close()
+        pipeline.close()
+        capture.join()
+        print("Pipeline stats:", pipeline.stats())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", action="store_true",
+                        help="print partial transcripts while the speaker is still talking")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of transcription workers (more than 1 needs --processes or --service)")
+    parser.add_argument("--processes", action="store_true",
+                        help="run workers in a process pool (each loads its own model)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="finished utterances that can wait for a worker")
+    parser.add_argument("--drop-policy", choices=DROP_POLICIES, default="oldest",
+                        help="which utterance to drop when the queue is full")
+    parser.add_argument("--no-incremental-mel", dest="incremental_mel", action="store_false",
+                        help="compute the log-mel after end of speech, inside transcribe()")
+    parser.add_argument("--precision", choices=PRECISIONS, default=PRECISION,
+                        help="int8 applies dynamic quantization (CPU only)")
+    parser.add_argument("--threads", type=int, default=TORCH_THREADS,
+                        help="torch intra-op threads per worker")
+    parser.add_argument("--service", metavar="SOCKET",
+                        help="send utterances to a running whisper_service.py instead of loading a model")
+    parser.add_argument("--adaptive-endpoint", action="store_true",
+                        help="end utterances early when the pause looks final (never later than before)")
+    args = parser.parse_args()
+    main(stream=args.stream, workers=args.workers, processes=args.processes,
+         queue_size=args.queue_size, drop_policy=args.drop_policy,
+         incremental_mel=args.incremental_mel, precision=args.precision, threads=args.threads,
+         service=args.service, adaptive_endpoint=args.adaptive_endpoint)
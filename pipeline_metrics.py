@@ -0,0 +1,205 @@
+"""
+## Pipeline metrics
+Per-stage latency histograms and queue-depth gauges for the Live audio/video
+pipeline (microphone -> uplink -> session.send, session.receive ->
+audio_in_queue -> speaker).
+
+The only signal used to be print(). PipelineMetrics is cheap enough to leave
+on for every session:
+
+- stages are timed from time.monotonic() stamps taken as a chunk or frame
+  passes each point, and recorded with observe(stage, seconds) or
+  since(stage, stamp),
+- each stage goes into a LogLinearHistogram: HDR-style buckets, linear within
+  each power of two, so any value from microseconds to hours is kept within
+  about 3% with a fixed, small list of counters and O(1) recording,
+- gauge(name, value) tracks queue depths (last, max and mean of samples),
+- snapshot() is plain JSON. With a path, run() rewrites the file every
+  interval_s and dump() writes a final one on exit.
+
+    metrics = PipelineMetrics("metrics.json", interval_s=10)
+    metrics.since("playout_wait", received_at)
+    metrics.gauge("audio_in_queue", queue.qsize())
+
+benchmarks/bench_pipeline_metrics.py measures the cost per call.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+SUB_BUCKET_BITS = 5  # 32 linear buckets per power of two: ~3% relative error
+MAX_VALUE_US = 1 << 36  # ~19 hours; larger values land in the last bucket
+DUMP_INTERVAL_S = 10.0
+
+
+class LogLinearHistogram:
+    """HDR-style histogram of durations, kept in integer microseconds.
+
+    Values below 2 * sub_buckets are counted exactly. Above that, each power
+    of two is split into sub_buckets equal buckets.
+    """
+
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS, max_value_us=MAX_VALUE_US):
+        self._bits = sub_bucket_bits
+        self._sub = 1 << sub_bucket_bits
+        self._max = max_value_us
+        self.counts = [0] * (self._index(max_value_us) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _index(self, value):
+        shift = value.bit_length() - self._bits - 1
+        if shift <= 0:
+            return value
+        return shift * self._sub + (value >> shift)
+
+    def _upper(self, index):
+        """Largest value counted in bucket index."""
+        shift = max(0, index // self._sub - 1)
+        return ((index - shift * self._sub + 1) << shift) - 1
+
+    def record(self, seconds):
+        value = min(max(int(seconds * 1_000_000), 0), self._max)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total_us += value
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other):
+        """Adds other's counts into this histogram; both need the same buckets."""
+        if (other._bits, other._max) != (self._bits, self._max):
+            raise ValueError("can only merge histograms with the same sub_bucket_bits and max_value_us")
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def quantile_us(self, q):
+        """Upper bound of the bucket holding the q-quantile, or None if empty."""
+        if not self.count:
+            return None
+        rank = max(1, q * self.count)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper(index), self.max_us)
+        return self.max_us
+
+    def snapshot(self, buckets=False):
+        def ms(us):
+            return None if us is None else round(us / 1000, 3)
+
+        snap = {
+            "count": self.count,
+            "min_ms": ms(self.min_us),
+            "mean_ms": ms(self.total_us / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile_us(0.5)),
+            "p90_ms": ms(self.quantile_us(0.9)),
+            "p99_ms": ms(self.quantile_us(0.99)),
+            "p999_ms": ms(self.quantile_us(0.999)),
+            "max_ms": ms(self.max_us) if self.count else None,
+        }
+        if buckets:
+            # Only non-empty buckets, keyed by their upper bound in microseconds.
+            snap["buckets_us"] = {str(self._upper(i)): c for i, c in enumerate(self.counts) if c}
+        return snap
+
+
+class Gauge:
+    """Last, max and mean of a sampled level, e.g. a queue's depth."""
+
+    def __init__(self):
+        self.last = 0
+        self.max = 0
+        self.samples = 0
+        self.total = 0
+
+    def set(self, value):
+        self.last = value
+        if value > self.max:
+            self.max = value
+        self.samples += 1
+        self.total += value
+
+    def snapshot(self):
+        return {
+            "last": self.last,
+            "max": self.max,
+            "mean": round(self.total / self.samples, 2) if self.samples else None,
+        }
+
+
+class PipelineMetrics:
+    """Named stage histograms and gauges, optionally dumped to a JSON file."""
+
+    def __init__(self, path=None, interval_s=DUMP_INTERVAL_S):
+        self.path = path
+        self.interval_s = interval_s
+        self.started = time.monotonic()
+        self.stages = {}
+        self.gauges = {}
+        self.dumps = 0
+
+    def observe(self, stage, seconds):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LogLinearHistogram()
+        histogram.record(seconds)
+
+    def since(self, stage, stamp):
+        """Records the time from a time.monotonic() stamp until now."""
+        self.observe(stage, time.monotonic() - stamp)
+
+    def gauge(self, name, value):
+        gauge = self.gauges.get(name)
+        if gauge is None:
+            gauge = self.gauges[name] = Gauge()
+        gauge.set(value)
+
+    def snapshot(self, buckets=True):
+        return {
+            "time": time.time(),
+            "uptime_s": round(time.monotonic() - self.started, 3),
+            "stages": {name: h.snapshot(buckets) for name, h in sorted(self.stages.items())},
+            "gauges": {name: g.snapshot() for name, g in sorted(self.gauges.items())},
+        }
+
+    def stats(self):
+        """Compact per-stage p50/p99 in ms and gauge maxima, for session stats."""
+        stages = {}
+        for name, histogram in sorted(self.stages.items()):
+            snap = histogram.snapshot()
+            stages[name] = {"n": snap["count"], "p50_ms": snap["p50_ms"], "p99_ms": snap["p99_ms"]}
+        return {"stages": stages, "gauges_max": {name: g.max for name, g in sorted(self.gauges.items())}}
+
+    def dump(self, path=None):
+        """Writes snapshot() to path (default: self.path) atomically."""
+        path = path or self.path
+        if path is None:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=1)
+        os.replace(tmp, path)
+        self.dumps += 1
+
+    async def run(self):
+        """Dumps every interval_s until cancelled, then once more."""
+        try:
+            while True:
+                await asyncio.sleep(self.interval_s)
+                self.dump()
+        finally:
+            self.dump()
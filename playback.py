@@ -0,0 +1,172 @@
+"""
+## Playback
+Jitter-buffered speaker output for the model's audio.
+
+play_audio used to await to_thread(stream.write, ...) per received chunk, and
+the only way to stop speech on barge-in was to empty audio_in_queue after the
+whole turn had been received. Everything already handed to stream.write kept
+playing.
+
+PlaybackEngine plays from a bounded ring buffer through a callback-mode
+output stream:
+
+- write() copies PCM into the ring and waits while it's full, so at most
+  max_buffer_ms of speech is ever committed to the device side,
+- the PortAudio callback pulls one buffer period at a time and pads with
+  silence on underrun,
+- flush() empties the ring immediately, so playback stops within one buffer
+  period (plus the device's own output latency),
+- the playback position is tracked per utterance, so after an interruption we
+  know how much of the model's utterance was actually played.
+"""
+
+import asyncio
+import functools
+import threading
+
+import pyaudio
+
+FRAMES_PER_BUFFER = 480  # 20 ms at 24 kHz
+MAX_BUFFER_MS = 300
+
+
+class PlaybackEngine:
+    """Callback-driven PCM player with a bounded jitter buffer."""
+
+    def __init__(self, pya, rate, channels=1, fmt=pyaudio.paInt16,
+                 frames_per_buffer=FRAMES_PER_BUFFER, max_buffer_ms=MAX_BUFFER_MS, executor=None):
+        self._pya = pya
+        self._executor = executor  # where open() runs (default: the loop's default executor)
+        self._rate = rate
+        self._channels = channels
+        self._format = fmt
+        self._frames_per_buffer = frames_per_buffer
+
+        self._frame_bytes = channels * pyaudio.get_sample_size(fmt)
+        self._bytes_per_second = rate * self._frame_bytes
+        capacity = self._bytes_per_second * max_buffer_ms // 1000
+        self._capacity = max(capacity - capacity % self._frame_bytes,
+                             frames_per_buffer * self._frame_bytes)
+        self._ring = bytearray(self._capacity)
+        self._out = bytearray(frames_per_buffer * self._frame_bytes)
+        # Absolute byte positions: everything in [_head, _tail) is waiting to play.
+        self._head = 0
+        self._tail = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self._loop = None
+        self._space = None
+        self._stream = None
+        self._latency_bytes = 0
+
+        self._utterance_start = 0
+        self.last_interruption = None
+
+        self.underruns = 0
+        self.flushes = 0
+        self.flushed_bytes = 0
+
+    async def open(self):
+        self._loop = asyncio.get_running_loop()
+        self._space = asyncio.Event()
+        self._stream = await self._loop.run_in_executor(self._executor, functools.partial(
+            self._pya.open,
+            format=self._format,
+            channels=self._channels,
+            rate=self._rate,
+            output=True,
+            frames_per_buffer=self._frames_per_buffer,
+            stream_callback=self._pull,
+        ))
+        latency = self._stream.get_output_latency()
+        self._latency_bytes = int(latency * self._rate) * self._frame_bytes
+        return self
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+
+    def _pull(self, in_data, frame_count, time_info, status_flags):
+        """PortAudio callback: hand the device the next buffer period."""
+        need = frame_count * self._frame_bytes
+        if need > len(self._out):
+            self._out = bytearray(need)
+        out = memoryview(self._out)[:need]
+        with self._lock:
+            n = min(need, self._tail - self._head)
+            start = self._head % self._capacity
+            first = min(n, self._capacity - start)
+            out[:first] = self._ring[start:start + first]
+            out[first:n] = self._ring[:n - first]
+            self._head += n
+        if 0 < n < need:
+            # Ran dry in the middle of speech.
+            self.underruns += 1
+        out[n:] = bytes(need - n)
+        self._loop.call_soon_threadsafe(self._space.set)
+        return bytes(out), pyaudio.paContinue
+
+    async def write(self, data):
+        """Queues PCM for playback, waiting while the jitter buffer is full.
+
+        If flush() is called while we're waiting, the rest of data is dropped.
+        """
+        generation = self._generation
+        view = memoryview(data)
+        while len(view) >= self._frame_bytes and generation == self._generation:
+            with self._lock:
+                free = self._capacity - (self._tail - self._head)
+                n = min(free, len(view))
+                n -= n % self._frame_bytes
+                start = self._tail % self._capacity
+                first = min(n, self._capacity - start)
+                self._ring[start:start + first] = view[:first]
+                self._ring[:n - first] = view[first:n]
+                self._tail += n
+            view = view[n:]
+            if view:
+                self._space.clear()
+                await self._space.wait()
+
+    def begin_utterance(self):
+        """Marks the start of a new model utterance for position tracking."""
+        with self._lock:
+            self._utterance_start = self._tail
+
+    def _played(self, head):
+        # Bytes handed to the device that have made it out of its own buffer.
+        return max(0, head - self._utterance_start - self._latency_bytes)
+
+    def position(self):
+        """Seconds of the current utterance that have been played so far."""
+        return self._played(self._head) / self._bytes_per_second
+
+    def flush(self):
+        """Drops everything not yet played. Returns seconds of the utterance heard."""
+        with self._lock:
+            dropped = self._tail - self._head
+            heard = self._played(self._head)
+            buffered = self._tail - self._utterance_start
+            self._head = self._tail
+            self._generation += 1
+        self.flushes += 1
+        self.flushed_bytes += dropped
+        if self._space is not None:
+            self._space.set()
+        self.last_interruption = {
+            "heard_s": round(heard / self._bytes_per_second, 2),
+            "buffered_s": round(buffered / self._bytes_per_second, 2),
+        }
+        return heard / self._bytes_per_second
+
+    def stats(self):
+        return {
+            "buffered_ms": 1000 * (self._tail - self._head) // self._bytes_per_second,
+            "underruns": self.underruns,
+            "flushes": self.flushes,
+            "flushed_ms": 1000 * self.flushed_bytes // self._bytes_per_second,
+            "last_interruption": self.last_interruption,
+        }
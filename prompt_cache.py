@@ -0,0 +1,143 @@
+"""
+## Prompt audio cache
+Local audio for the interviewer's fixed lines (greeting, closing).
+
+Every scripted prompt used to be sent to the model as text and spoken back,
+so the candidate waited a full round trip before hearing anything, and paid
+for the same synthesis in every interview. PromptAudioCache stores the
+model's audio for a prompt the first time it is spoken:
+
+- entries are keyed by text, voice name and sample rate, one raw 16-bit PCM
+  file each (24 kHz, as received) under the cache directory,
+- get() memory-maps the file and returns a memoryview of it, so playback
+  reads straight from the page cache without copying the clip into memory,
+- the directory is capped at max_bytes, evicting least recently used
+  entries first; file mtimes carry the LRU order across restarts,
+- put() can run on a worker thread (the agent stores recordings off the
+  event loop) while get() runs on the loop; the index is guarded by a lock,
+  and the file itself is written outside it.
+
+The agent plays a hit through play_audio as usual and tells the session
+what was said with a model turn, so the conversation context still has it.
+"""
+
+import collections
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+
+MAX_BYTES = 64 * 1024 * 1024
+SUFFIX = ".pcm"
+
+
+def prompt_key(text, voice, rate):
+    """File name stem for a prompt; the same text, voice and rate share an entry."""
+    digest = hashlib.sha256(f"{voice}\0{rate}\0{text}".encode("utf-8")).hexdigest()
+    return digest[:32]
+
+
+class PromptAudioCache:
+    """Size-capped LRU directory of raw PCM clips, read through mmap."""
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # key -> size in bytes, least recently used first.
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._scan()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def _scan(self):
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SUFFIX) and entry.is_file():
+                st = entry.stat()
+                found.append((st.st_mtime, entry.name[:-len(SUFFIX)], st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+
+    def get(self, text, voice, rate):
+        """Returns the prompt's PCM as a memoryview over an mmap, or None.
+
+        The mapping is released once the view (and any slices of it) are
+        garbage, so callers just drop it when playback is done.
+        """
+        key = prompt_key(text, voice, rate)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                os.utime(path)
+            except (OSError, ValueError):
+                # Removed by another process, or empty.
+                self._forget(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return memoryview(mapped)
+
+    def put(self, text, voice, rate, pcm):
+        """Stores a prompt's PCM and evicts old entries past max_bytes."""
+        if not pcm or len(pcm) > self.max_bytes:
+            return
+        key = prompt_key(text, voice, rate)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pcm)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            os.unlink(tmp)
+            return
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(pcm)
+            self._bytes += len(pcm)
+            self.stores += 1
+            self._evict()
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._bytes -= size
+
+    def _evict(self):
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue  # still mapped for playback (Windows); try again next time
+            self._forget(key)
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
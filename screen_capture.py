@@ -0,0 +1,83 @@
+"""
+## Screen capture
+Long-lived screen grabber for the "screen" video mode.
+
+The original _get_screen opened a new mss.mss() (a fresh X connection) on every
+call, PNG-compressed the whole virtual desktop, decoded the PNG again with PIL
+and re-encoded it as JPEG. ScreenGrabber keeps one mss instance per thread
+(mss handles are not safe to share across threads, and asyncio.to_thread may
+run us on any pool worker) and hands the raw BGRA buffer straight to a
+FrameEncoder, which downscales and JPEG-encodes it.
+"""
+
+import threading
+import time
+
+import mss
+import numpy as np
+
+from frame_encoder import FrameEncoder, MAX_SIZE
+
+
+class ScreenGrabber:
+    """Grabs a monitor and returns it as a downscaled JPEG message."""
+
+    def __init__(self, monitor_index=0, max_size=MAX_SIZE):
+        # 0 is the whole virtual desktop, 1.. are the individual monitors.
+        self.monitor_index = monitor_index
+        self.encoder = FrameEncoder(max_size=max_size)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._instances = []
+        # Bumped by close(); a thread's handle from an older generation has
+        # been closed and is replaced on its next grab.
+        self._generation = 0
+
+        self.startup_seconds = 0.0
+        self.frames = 0
+        self.grab_seconds = 0.0
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None or self._local.generation != self._generation:
+            start = time.perf_counter()
+            sct = mss.mss()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._local.sct = sct
+                self._local.generation = self._generation
+                self._instances.append(sct)
+                self.startup_seconds += elapsed
+        return sct
+
+    def grab(self):
+        """Grabs the monitor as an (h, w, 4) BGRA view over mss's own buffer."""
+        sct = self._sct()
+        start = time.perf_counter()
+        shot = sct.grab(sct.monitors[self.monitor_index])
+        frame = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        self.grab_seconds += time.perf_counter() - start
+        self.frames += 1
+        return frame
+
+    def grab_message(self):
+        """Grabs and encodes one frame for session.send(input=...)."""
+        return self.encoder.encode_message(self.grab())
+
+    def close(self):
+        """Closes every thread's mss handle; a later grab opens a new one."""
+        with self._lock:
+            instances, self._instances = self._instances, []
+            self._generation += 1
+        for sct in instances:
+            sct.close()
+
+    def stats(self):
+        frames = self.frames or 1
+        return {
+            "grabbers": len(self._instances),
+            "startup_ms": round(1000 * self.startup_seconds, 2),
+            "avg_grab_ms": round(1000 * self.grab_seconds / frames, 2),
+            **self.encoder.stats(),
+        }
@@ -0,0 +1,99 @@
+"""
+## Session host
+Runs many LiveInterviewAgent sessions concurrently in one event loop.
+
+Each interview used to need its own process: the agent used module-level
+PyAudio/genai singletons and terminated PyAudio when it finished. With the
+agent's media and client pluggable, one process can host many sessions:
+
+- every session gets its own audio source/sink and video source (passed
+  through to LiveInterviewAgent),
+- every session gets its own small thread pool for frame capture and
+  encoding, so one session's video can't starve the others' executor work,
+- shared resources (PyAudio, the genai client) are reference-counted or
+  shared read-only, so a session ending doesn't tear them down for the rest,
+- with a session_pool (live_pool.LiveSessionPool), sessions start on
+  pre-connected Live sessions instead of connecting on demand.
+
+    host = SessionHost(executor_workers=2)
+    agents = [host.create_agent(audio_source=..., audio_sink=..., video_mode="none")
+              for _ in range(n)]
+    reports = await host.run([(agent, script) for agent in agents])
+
+benchmarks/bench_session_host.py load-tests it against fake_live.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import itertools
+import time
+
+from live_interview_agent import LiveInterviewAgent
+
+EXECUTOR_WORKERS = 2  # capture + encode for one video stream
+
+SessionReport = collections.namedtuple("SessionReport", ["name", "duration_s", "error", "stats"])
+
+
+class SessionHost:
+    """Runs LiveInterviewAgent sessions side by side, each with its own executor."""
+
+    def __init__(self, executor_workers=EXECUTOR_WORKERS, max_sessions=None, genai_client=None,
+                 session_pool=None):
+        self.executor_workers = executor_workers
+        self.genai_client = genai_client
+        self.session_pool = session_pool
+        self._slots = asyncio.Semaphore(max_sessions) if max_sessions else None
+        self._ids = itertools.count(1)
+        self._names = {}
+        self.active = 0
+        self.peak_active = 0
+        self.reports = []
+
+    def create_agent(self, name=None, **kwargs):
+        """Creates an agent with its own executor; kwargs go to LiveInterviewAgent."""
+        name = name or f"session-{next(self._ids)}"
+        executor = concurrent.futures.ThreadPoolExecutor(self.executor_workers, thread_name_prefix=name)
+        kwargs.setdefault("genai_client", self.genai_client)
+        kwargs.setdefault("session_pool", self.session_pool)
+        agent = LiveInterviewAgent(executor=executor, **kwargs)
+        self._names[agent] = name
+        return agent
+
+    async def run_session(self, agent, script=None):
+        """Runs one agent's session to completion and records a SessionReport."""
+        async with self._slots or contextlib.nullcontext():
+            name = self._names.get(agent, "session")
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            start = time.monotonic()
+            error = None
+            try:
+                await agent.run_interview_session(script)
+            except Exception as e:
+                error = repr(e)
+            finally:
+                self.active -= 1
+                if agent.executor is not None:
+                    agent.executor.shutdown(wait=False, cancel_futures=True)
+                report = SessionReport(name, time.monotonic() - start, error, agent.stats())
+                self.reports.append(report)
+            return report
+
+    async def run(self, sessions):
+        """Runs (agent, script) pairs concurrently; returns their reports."""
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self.run_session(agent, script)) for agent, script in sessions]
+        return [task.result() for task in tasks]
+
+    def stats(self):
+        durations = sorted(r.duration_s for r in self.reports)
+        return {
+            "sessions": len(self.reports),
+            "failed": sum(1 for r in self.reports if r.error),
+            "peak_active": self.peak_active,
+            "median_duration_s": round(durations[len(durations) // 2], 2) if durations else None,
+        }
+
@@ -0,0 +1,48 @@
+"""
+## Shared resources
+Reference-counted process-wide resources for concurrent sessions.
+
+LiveInterviewAgent used to terminate the module-level PyAudio instance when
+its session ended, which broke every other session in the same process.
+SharedResource creates the resource on first acquire() and closes it when
+the last holder calls release():
+
+    pya = shared_pyaudio.acquire()
+    try:
+        ...
+    finally:
+        shared_pyaudio.release()
+"""
+
+import threading
+
+
+class SharedResource:
+    """Lazily created resource, closed when its last user releases it."""
+
+    def __init__(self, factory, close):
+        self._factory = factory
+        self._close = close
+        self._value = None
+        self._refs = 0
+        self._lock = threading.Lock()
+
+    @property
+    def refs(self):
+        return self._refs
+
+    def acquire(self):
+        with self._lock:
+            if self._refs == 0:
+                self._value = self._factory()
+            self._refs += 1
+            return self._value
+
+    def release(self):
+        with self._lock:
+            if self._refs == 0:
+                raise RuntimeError("release() without a matching acquire()")
+            self._refs -= 1
+            if self._refs == 0:
+                value, self._value = self._value, None
+                self._close(value)
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pyaudio")
+pytest.importorskip("google.cloud.speech")
+
+from fake_speech import FakeAudioSource, FakeSpeechAsyncClient
+from googleAPI import ResumableRecognizer
+
+CHUNK_MS = 100
+
+
+def test_rotation_keeps_finals_complete_in_order_with_offsets():
+    chunks = 100  # 10 s of audio
+
+    async def run():
+        source = FakeAudioSource(chunks, chunk_ms=CHUNK_MS, speed=50)  # a chunk every 2 ms
+        # 7 doesn't divide the chunks per stream, so every rotation has
+        # un-finalized audio to replay.
+        client = FakeSpeechAsyncClient(max_stream_s=3.0, final_every=7)
+        recognizer = ResumableRecognizer(source, client=client, stream_limit_s=2.0, prewarm_s=0.5)
+        await recognizer.run()
+        return recognizer, client
+
+    recognizer, client = asyncio.run(run())
+    assert recognizer.rotations >= 4
+    assert recognizer.replayed_ms > 0
+    words = " ".join(result.transcript for result in recognizer.results).split()
+    assert words == [f"w{i}" for i in range(chunks)]
+    for result in recognizer.results:
+        last_chunk = int(result.transcript.split()[-1][1:])
+        assert result.end_ms == pytest.approx((last_chunk + 1) * CHUNK_MS)
+    # Replay counts toward a stream's age: none carries more than the limit.
+    assert max(stream["audio_ms"] for stream in client.streams) <= 2000
+
+
+def test_final_inside_a_chunk_trims_it():
+    source = FakeAudioSource(0)
+    recognizer = ResumableRecognizer(source, client=FakeSpeechAsyncClient())
+    chunk = bytes(i % 256 for i in range(source.chunk_bytes))
+    recognizer._retain(chunk)  # 0-100 ms
+    recognizer._retain(chunk)  # 100-200 ms
+    recognizer._finalized(150)
+    assert len(recognizer._retained) == 1
+    start_ms, end_ms, trimmed = recognizer._retained[0]
+    assert (start_ms, end_ms) == (150, 200)
+    assert trimmed == chunk[len(chunk) // 2:]
@@ -0,0 +1,97 @@
+import asyncio
+
+from fake_live import FakeQuestionGenerator
+from interview_plan import InterviewPlan, Question
+
+
+def _plan(generator, next="deep_dive", **kwargs):
+    return InterviewPlan([
+        Question("intro", "Tell me about yourself.", next=next),
+        Question("deep_dive", follow_up="Go deeper.", next=None),
+        Question("other", follow_up="Go elsewhere.", next=None),
+    ], generator=generator, **kwargs)
+
+
+def test_uses_the_prefetched_follow_up():
+    async def run():
+        generator = FakeQuestionGenerator(0.01)
+        plan = _plan(generator)
+        intro, deep_dive = plan.questions["intro"], plan.questions["deep_dive"]
+        plan._speculate(intro, "I built a compiler")
+        await asyncio.sleep(0.05)
+        text, source = await plan._next_text(deep_dive, "I built a compiler")
+        return plan, generator, text, source
+
+    plan, generator, text, source = asyncio.run(run())
+    assert source == "speculative"
+    assert text == "Go deeper. (You said: I built a compiler)"
+    assert generator.calls == 1
+    assert plan.cancelled == 0
+
+
+def test_waits_for_a_speculation_still_in_flight():
+    async def run():
+        generator = FakeQuestionGenerator(0.05)
+        plan = _plan(generator)
+        plan._speculate(plan.questions["intro"], "I built a compiler")
+        return await plan._next_text(plan.questions["deep_dive"], "I built a compiler"), generator
+
+    (text, source), generator = asyncio.run(run())
+    assert source == "awaited"
+    assert generator.calls == 1
+
+
+def test_cancels_a_stale_speculation_when_the_route_changes():
+    async def run():
+        generator = FakeQuestionGenerator(0.05)
+        plan = _plan(generator, next=lambda answer: "other" if "rust" in answer else "deep_dive")
+        intro = plan.questions["intro"]
+        plan._speculate(intro, "I mostly write python")
+        stale = plan._speculation.task
+        plan._speculate(intro, "I mostly write python, lately rust")
+        await asyncio.sleep(0)
+        assert stale.cancelled()
+        text, source = await plan._next_text(plan.questions["other"], "I mostly write python, lately rust")
+        return plan, text, source
+
+    plan, text, source = asyncio.run(run())
+    assert plan.cancelled == 1
+    assert plan.speculations == 2
+    assert source == "awaited"
+    assert text.startswith("Go elsewhere.")
+
+
+def test_refinement_replaces_the_pending_follow_up():
+    async def run():
+        generator = FakeQuestionGenerator(0.01)
+        plan = _plan(generator, refine_chars=10)
+        intro, deep_dive = plan.questions["intro"], plan.questions["deep_dive"]
+        plan._speculate(intro, "A compiler")
+        plan._speculate(intro, "A compiler for a toy language")  # one in flight at a time
+        assert plan.speculations == 1
+        await asyncio.sleep(0.05)
+        plan._speculate(intro, "A compiler for a toy language")
+        assert plan.speculations == 2
+        await asyncio.sleep(0.05)
+        return await plan._next_text(deep_dive, "A compiler for a toy language")
+
+    text, source = asyncio.run(run())
+    assert source == "speculative"
+    assert text == "Go deeper. (You said: A compiler for a toy language)"
+
+
+def test_keeps_a_covering_follow_up_instead_of_waiting_for_its_refinement():
+    async def run():
+        generator = FakeQuestionGenerator(0.05)
+        plan = _plan(generator, refine_chars=5)
+        intro, deep_dive = plan.questions["intro"], plan.questions["deep_dive"]
+        plan._speculate(intro, "A compiler")
+        await asyncio.sleep(0.1)
+        plan._speculate(intro, "A compiler, in C")
+        result = await plan._next_text(deep_dive, "A compiler, in C")
+        return plan, result
+
+    plan, (text, source) = asyncio.run(run())
+    assert source == "speculative"
+    assert text == "Go deeper. (You said: A compiler)"
+    assert plan.cancelled == 1  # the refinement
@@ -0,0 +1,54 @@
+import asyncio
+
+from fake_live import FakeLiveClient
+from live_pool import LiveSessionPool
+
+
+def _pool(client, **kwargs):
+    return LiveSessionPool(lambda: client.aio.live.connect(), **kwargs)
+
+
+def test_hands_over_a_warm_session_and_refills():
+    async def run():
+        client = FakeLiveClient(connect_latency_s=0.05)
+        async with _pool(client, size=1, refresh_interval_s=0.01) as pool:
+            await asyncio.sleep(0.1)
+            assert len(client.sessions) == 1
+            async with pool.session() as session:
+                assert session is client.sessions[0]
+                await session.send(input="Hello?")
+            assert session.closed  # an interview's session isn't reused
+            await asyncio.sleep(0.1)
+            return pool, client
+
+    pool, client = asyncio.run(run())
+    assert (pool.hits, pool.misses) == (1, 0)
+    assert len(client.sessions) == 2  # the replacement
+    assert pool.handoff_latency.max_us < 50_000
+
+
+def test_replaces_sessions_before_the_idle_timeout():
+    async def run():
+        client = FakeLiveClient(idle_timeout_s=0.15)
+        async with _pool(client, size=1, max_idle_s=0.05, refresh_interval_s=0.01) as pool:
+            await asyncio.sleep(0.3)
+            async with pool.session() as session:
+                await session.send(input="Hello?")  # raises if the server dropped it
+            return pool, client
+
+    pool, client = asyncio.run(run())
+    assert pool.replaced >= 2
+    assert all(session.closed for session in client.sessions[:-1])
+
+
+def test_connects_on_the_spot_when_none_are_warm():
+    async def run():
+        client = FakeLiveClient(connect_latency_s=0.05)
+        async with _pool(client, size=1) as pool:
+            async with pool.session() as session:  # the pool is still connecting
+                await session.send(input="Hello?")
+            return pool
+
+    pool = asyncio.run(run())
+    assert (pool.hits, pool.misses) == (0, 1)
+    assert pool.handoff_latency.min_us >= 40_000
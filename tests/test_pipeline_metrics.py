@@ -0,0 +1,68 @@
+import pytest
+
+from pipeline_metrics import LogLinearHistogram
+
+
+def us(value):
+    return value / 1_000_000
+
+
+def test_small_values_are_exact():
+    h = LogLinearHistogram()  # 32 sub-buckets: exact below 64 us
+    for value in range(64):
+        assert h._index(value) == value
+        assert h._upper(value) == value
+
+
+def test_log_buckets_start_at_twice_the_sub_buckets():
+    h = LogLinearHistogram()
+    # 64..127 in buckets two wide, 128..255 four wide, and so on.
+    assert h._index(64) == h._index(65) == 64
+    assert h._index(66) == 65
+    assert h._upper(64) == 65
+    assert h._index(127) == 95 and h._upper(95) == 127
+    assert h._index(128) == 96 and h._upper(96) == 131
+    for value in (64, 100, 1000, 123_456, 10**9):
+        index = h._index(value)
+        assert h._upper(index - 1) < value <= h._upper(index)
+        assert h._upper(index) - value < value / 32
+
+
+def test_percentiles_report_bucket_upper_bounds():
+    h = LogLinearHistogram()
+    for value in (10, 100, 1000, 1000, 5000):
+        h.record(us(value))
+    assert h.quantile_us(0.2) == 10
+    assert h.quantile_us(0.4) == 101  # 100 is in the 100..101 bucket
+    assert h.quantile_us(0.8) == 1007  # 1000 is in 992..1007
+    assert h.quantile_us(1.0) == 5000  # clamped to the recorded max
+    assert LogLinearHistogram().quantile_us(0.5) is None
+
+
+def test_out_of_range_values_are_clamped():
+    h = LogLinearHistogram(max_value_us=1 << 20)
+    h.record(-1)
+    h.record(10_000)
+    assert (h.min_us, h.max_us) == (0, 1 << 20)
+    assert h.counts[-1] == 1
+
+
+def test_merge_adds_counts_and_extremes():
+    a, b, both = LogLinearHistogram(), LogLinearHistogram(), LogLinearHistogram()
+    for value in (5, 70, 300):
+        a.record(us(value))
+        both.record(us(value))
+    for value in (2, 70, 90_000):
+        b.record(us(value))
+        both.record(us(value))
+    assert a.merge(b) is a
+    assert a.counts == both.counts
+    assert (a.count, a.total_us, a.min_us, a.max_us) == (6, both.total_us, 2, 90_000)
+    assert a.snapshot(buckets=True) == both.snapshot(buckets=True)
+    a.merge(LogLinearHistogram())
+    assert a.count == 6
+
+
+def test_merge_rejects_different_buckets():
+    with pytest.raises(ValueError):
+        LogLinearHistogram().merge(LogLinearHistogram(sub_bucket_bits=4))
@@ -0,0 +1,52 @@
+import os
+
+from prompt_cache import PromptAudioCache, prompt_key
+
+RATE = 24000
+
+
+def test_miss_then_hit(tmp_path):
+    cache = PromptAudioCache(tmp_path)
+    assert cache.get("Hello.", "Zephyr", RATE) is None
+    cache.put("Hello.", "Zephyr", RATE, b"\x01\x02" * 100)
+    assert bytes(cache.get("Hello.", "Zephyr", RATE)) == b"\x01\x02" * 100
+    # Voice and rate are part of the key.
+    assert cache.get("Hello.", "Puck", RATE) is None
+    assert cache.get("Hello.", "Zephyr", 16000) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 3, 1)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = PromptAudioCache(tmp_path, max_bytes=300)
+    for text in ("a", "b", "c"):
+        cache.put(text, "v", RATE, b"x" * 100)
+    assert cache.get("a", "v", RATE) is not None  # "b" is now the oldest
+    cache.put("d", "v", RATE, b"x" * 100)
+    assert cache.evictions == 1
+    assert cache.get("b", "v", RATE) is None
+    assert not os.path.exists(tmp_path / (prompt_key("b", "v", RATE) + ".pcm"))
+    for text in ("a", "c", "d"):
+        assert cache.get(text, "v", RATE) is not None
+    assert cache.stats()["bytes"] == 300
+
+
+def test_lru_order_survives_restart(tmp_path):
+    cache = PromptAudioCache(tmp_path, max_bytes=200)
+    cache.put("old", "v", RATE, b"x" * 100)
+    cache.put("new", "v", RATE, b"x" * 100)
+    old = tmp_path / (prompt_key("old", "v", RATE) + ".pcm")
+    os.utime(old, (1, 1))  # make the file order unambiguous
+    reopened = PromptAudioCache(tmp_path, max_bytes=200)
+    assert reopened.stats()["entries"] == 2
+    reopened.put("newest", "v", RATE, b"x" * 100)
+    assert reopened.get("old", "v", RATE) is None
+    assert reopened.get("new", "v", RATE) is not None
+
+
+def test_skips_empty_and_oversized_clips(tmp_path):
+    cache = PromptAudioCache(tmp_path, max_bytes=100)
+    cache.put("empty", "v", RATE, b"")
+    cache.put("big", "v", RATE, b"x" * 101)
+    assert cache.stores == 0
+    assert cache.stats()["entries"] == 0
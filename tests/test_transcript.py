@@ -0,0 +1,50 @@
+import asyncio
+
+from transcript import Transcript
+
+
+async def collect(stream):
+    return [fragment.text async for fragment in stream]
+
+
+def test_stream_after_end_turn_replays_and_returns():
+    async def run():
+        transcript = Transcript()
+        transcript.begin_turn()
+        transcript.append("I built ")
+        transcript.append("a compiler.")
+        stream = transcript.stream()  # created during the turn, iterated late
+        transcript.end_turn()
+        late = await asyncio.wait_for(collect(stream), 1)
+        after = await asyncio.wait_for(collect(transcript.stream()), 1)
+        return late, after
+
+    late, after = asyncio.run(run())
+    assert late == ["I built ", "a compiler."]
+    assert after == late
+
+
+def test_append_after_end_turn_starts_a_new_turn():
+    transcript = Transcript()
+    answer = transcript.begin_turn()
+    transcript.append("My answer.")
+    transcript.end_turn()
+    fragment = transcript.append("Next question?")
+    assert fragment.turn_id != answer
+    assert transcript.turn_text(answer) == "My answer."
+    assert transcript.turn_text() == "Next question?"
+    assert not transcript.ended
+
+
+def test_stream_follows_open_turn_until_end():
+    async def run():
+        transcript = Transcript()
+        transcript.begin_turn()
+        transcript.append("a ")
+        task = asyncio.create_task(collect(transcript.stream()))
+        await asyncio.sleep(0)
+        transcript.append("b")
+        transcript.end_turn()
+        return await asyncio.wait_for(task, 1)
+
+    assert asyncio.run(run()) == ["a ", "b"]
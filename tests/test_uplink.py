@@ -0,0 +1,61 @@
+import asyncio
+
+from frame_scheduler import FrameScheduler
+from uplink import OutboundMux
+
+FRAME = {"mime_type": "image/jpeg", "data": b"jpeg"}
+
+
+async def capture(uplink, scheduler, frames):
+    for _ in range(frames):
+        scheduler.start()
+        uplink.put_video(FRAME)
+        await scheduler.wait(uplink.fill())
+
+
+def test_changed_frames_on_idle_uplink_stay_at_min_interval():
+    async def run():
+        uplink = OutboundMux(coalesce_ms=0)
+        scheduler = FrameScheduler(min_interval=0.01, max_interval=0.1, initial_interval=0.01)
+
+        async def send():
+            while True:
+                await uplink.get()
+
+        sender = asyncio.create_task(send())
+        await capture(uplink, scheduler, 20)
+        sender.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert scheduler.interval == scheduler.min_interval
+    assert scheduler.backoffs == 0
+
+
+def test_unsent_frame_backs_off():
+    async def run():
+        uplink = OutboundMux(coalesce_ms=0)
+        scheduler = FrameScheduler(min_interval=0.01, max_interval=0.1, initial_interval=0.01)
+        await capture(uplink, scheduler, 3)  # nothing sends, so frames pile up
+        return uplink, scheduler
+
+    uplink, scheduler = asyncio.run(run())
+    assert uplink.fill() == 1.0
+    assert scheduler.backoffs == 2
+
+
+def test_slow_send_decays_on_a_static_scene():
+    async def run():
+        scheduler = FrameScheduler(min_interval=0.001, max_interval=0.01, initial_interval=0.001)
+        scheduler.record_send(1.0)  # one slow frame send, then nothing changes
+        intervals = []
+        for _ in range(80):
+            scheduler.start()
+            await scheduler.wait(0.0)
+            intervals.append(scheduler.interval)
+        return scheduler, intervals
+
+    scheduler, intervals = asyncio.run(run())
+    assert max(intervals) == scheduler.max_interval
+    assert intervals[-1] == scheduler.min_interval
+    assert scheduler.speedups > 0
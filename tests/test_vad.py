@@ -0,0 +1,120 @@
+import numpy as np
+
+from vad import AdaptiveEndpointer, SpeechSegmenter, VoiceActivityGate
+
+FRAME_SAMPLES = 480  # 30 ms at 16 kHz
+WINDOW = 10
+
+
+def frame(value):
+    return np.full(FRAME_SAMPLES, value, dtype=np.int16).tobytes()
+
+
+def test_segmenter_ends_utterance_after_silence_window():
+    seg = SpeechSegmenter(FRAME_SAMPLES, WINDOW)
+    for i in range(10):
+        assert seg.push(frame(i), False) is None
+    for i in range(10, 29):
+        assert seg.push(frame(i), True) is None
+    assert seg.triggered
+    # The end rule needs more than 90% of a fresh window unvoiced.
+    for i in range(29, 38):
+        assert seg.push(frame(i), False) is None
+    utterance = seg.push(frame(38), False)
+    assert utterance is not None
+    assert not seg.triggered
+    # Lead-in: the window that triggered the start, including its silent frame.
+    values = utterance.reshape(-1, FRAME_SAMPLES)[:, 0].tolist()
+    assert values == list(range(9, 39))
+
+
+def test_segmenter_keeps_lead_in_when_window_wraps():
+    seg = SpeechSegmenter(FRAME_SAMPLES, WINDOW)
+    for i in range(25):  # wrap the ring a couple of times
+        seg.push(frame(i), False)
+    for i in range(25, 34):
+        seg.push(frame(i), True)
+    assert seg.speech_started
+    values = seg.current().reshape(-1, FRAME_SAMPLES)[:, 0].tolist()
+    assert values == list(range(24, 34))
+
+
+class _ScriptedClassifier:
+    """Stands in for SpeechClassifier; each chunk's first sample says if it's speech."""
+
+    def classify(self, chunk):
+        return int(np.frombuffer(chunk, dtype=np.int16)[0] > 0), 1
+
+    def reset(self):
+        pass
+
+
+def _gate(pre_pad_ms=90, post_pad_ms=60):
+    gate = VoiceActivityGate(16000, chunk_ms=30, pre_pad_ms=pre_pad_ms, post_pad_ms=post_pad_ms,
+                             keepalive_interval=60)
+    gate.classifier = _ScriptedClassifier()
+    return gate
+
+
+def test_gate_sends_pre_roll_with_first_speech():
+    gate = _gate()
+    silence = [frame(-i) for i in range(1, 6)]
+    for chunk in silence:
+        assert gate.process(chunk, now=0).chunks == []
+    speech = frame(1)
+    decision = gate.process(speech, now=0)
+    # The last pre_pad_ms of silence goes out ahead of the speech.
+    assert decision.chunks == silence[-3:] + [speech]
+
+
+def test_gate_ends_activity_after_post_padding():
+    gate = _gate()
+    gate.process(frame(1), now=0)
+    sent = [gate.process(frame(-1), now=0) for _ in range(3)]
+    assert [len(d.chunks) for d in sent] == [1, 1, 0]
+    assert [d.activity_end for d in sent] == [False, False, True]
+    assert gate.activity_ends == 1
+
+
+def _silence_to_endpoint(endpointer, limit=100):
+    for frames in range(1, limit + 1):
+        if endpointer.push(frame(0), False):
+            return frames
+    return None
+
+
+def test_endpointer_falls_back_to_max_silence_without_cues():
+    endpointer = AdaptiveEndpointer(frame_ms=30, max_silence_ms=600)
+    endpointer.start()
+    for _ in range(10):
+        endpointer.push(frame(1000), True)  # steady level: no trailing-off cue
+    assert _silence_to_endpoint(endpointer) == 600 // 30
+    assert endpointer.end()["cues"] == ()
+
+
+def test_endpointer_never_ends_before_min_silence():
+    endpointer = AdaptiveEndpointer(frame_ms=30, max_silence_ms=600, min_silence_ms=240)
+    endpointer.start()
+    for _ in range(8):  # learn very short mid-answer pauses
+        for _ in range(5):
+            endpointer.push(frame(1000), True)
+        for _ in range(3):
+            endpointer.push(frame(0), False)
+    for _ in range(5):
+        endpointer.push(frame(50), True)  # trailing off
+    endpointer.set_partial("That's all.")
+    frames = _silence_to_endpoint(endpointer)
+    assert frames == 240 // 30
+    endpoint = endpointer.end(saved_frames=600 // 30 - frames)
+    assert set(endpoint["cues"]) == {"punctuation", "energy"}
+    assert endpoint["silence_ms"] >= 240
+
+
+def test_endpointer_stats_average_saved_time():
+    endpointer = AdaptiveEndpointer(frame_ms=30)
+    for saved in (4, 0, 6):
+        endpointer.start()
+        endpointer.end(saved_frames=saved)
+    stats = endpointer.stats()
+    assert stats["early_endpoints"] == 2
+    assert stats["mean_saved_ms"] == 150
@@ -0,0 +1,122 @@
+"""
+## Transcript
+Incremental, timestamped transcript for LiveInterviewAgent.
+
+The agent used to grow transcribed_response with += for every text fragment,
+which is quadratic for long answers and throws away both the timing and the
+partial text until the answer is over. Transcript instead:
+
+- appends fragments to a list (amortized O(1)), each stamped with its arrival
+  time (time.monotonic()) and the turn it belongs to,
+- gives cheap snapshots and iteration per turn, joining text only on request,
+- lets any number of consumers follow the current turn as it arrives:
+
+    async for fragment in agent.transcript.stream():
+        ...  # starts before the answer is finished
+"""
+
+import asyncio
+import collections
+import time
+
+Fragment = collections.namedtuple("Fragment", ["text", "timestamp", "turn_id"])
+
+
+class Transcript:
+    """Append-only list of text fragments grouped into turns."""
+
+    def __init__(self):
+        self._fragments = []
+        self._turn_starts = [0]  # index of each turn's first fragment
+        self._subscribers = []
+        self._ended = False  # end_turn() was called on the current turn
+
+    @property
+    def turn_id(self):
+        return len(self._turn_starts) - 1
+
+    def begin_turn(self):
+        """Starts a new turn and returns its id. Open streams end here."""
+        self._close_streams()
+        self._turn_starts.append(len(self._fragments))
+        self._ended = False
+        return self.turn_id
+
+    def end_turn(self):
+        """Marks the current turn finished, ending any open streams.
+
+        Text appended after this starts a new turn instead of being added to
+        the finished one.
+        """
+        self._ended = True
+        self._close_streams()
+
+    @property
+    def ended(self):
+        return self._ended
+
+    def append(self, text, timestamp=None):
+        if self._ended:
+            self.begin_turn()
+        fragment = Fragment(text, time.monotonic() if timestamp is None else timestamp, self.turn_id)
+        self._fragments.append(fragment)
+        for queue in self._subscribers:
+            queue.put_nowait(fragment)
+        return fragment
+
+    def _span(self, turn_id):
+        if turn_id is None:
+            turn_id = self.turn_id
+        start = self._turn_starts[turn_id]
+        end = self._turn_starts[turn_id + 1] if turn_id + 1 < len(self._turn_starts) else len(self._fragments)
+        return start, end
+
+    def snapshot(self, turn_id=None):
+        """Fragments of a turn (default: the current one) as a tuple."""
+        start, end = self._span(turn_id)
+        return tuple(self._fragments[start:end])
+
+    def turn_text(self, turn_id=None):
+        start, end = self._span(turn_id)
+        return "".join(fragment.text for fragment in self._fragments[start:end])
+
+    def turn_length(self, turn_id=None):
+        """Number of fragments in a turn, without copying them."""
+        start, end = self._span(turn_id)
+        return end - start
+
+    def __iter__(self):
+        return iter(self._fragments[:])
+
+    def __len__(self):
+        return len(self._fragments)
+
+    async def stream(self):
+        """Yields the current turn's fragments as they arrive, until it ends.
+
+        Fragments that arrived before the call are replayed first, so a late
+        subscriber still sees the whole turn. If the turn has already ended
+        by the time iteration starts, only the replay is yielded.
+        """
+        if self._ended:
+            for fragment in self.snapshot():
+                yield fragment
+            return
+        queue = asyncio.Queue()
+        for fragment in self.snapshot():
+            queue.put_nowait(fragment)
+        self._subscribers.append(queue)
+        try:
+            while True:
+                fragment = await queue.get()
+                if fragment is None:
+                    return
+                yield fragment
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+
+    def _close_streams(self):
+        subscribers, self._subscribers = self._subscribers, []
+        for queue in subscribers:
+            queue.put_nowait(None)
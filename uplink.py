@@ -0,0 +1,198 @@
+"""
+## Outbound multiplexer
+Replaces the single out_queue that audio chunks and video frames used to share.
+
+With one FIFO, a slow ~100 KB JPEG send held up every 64 ms PCM chunk queued
+behind it, listen_audio blocked on put() and the microphone overflowed.
+OutboundMux keeps the two classes apart:
+
+- audio has strict priority. It sits in its own bounded FIFO, and put_audio
+  never blocks: if the FIFO is full the oldest chunk is dropped and counted,
+  since a stale chunk is worth less than keeping up with the mic.
+- video is latest-wins. There is a single slot, and a new frame replaces a
+  frame that hasn't been sent yet instead of queueing behind it.
+
+Audio can also be coalesced, in the same spirit as
+googleAPI.MicrophoneStream.generator: instead of one session.send per
+1024-sample read, get() joins whatever is buffered into one message. If less
+than coalesce_ms of audio is buffered, it waits for more, but never longer
+than coalesce_ms after the oldest chunk was queued, so the added latency
+stays bounded.
+
+put_audio_end() queues an AUDIO_STREAM_END marker behind the audio already
+buffered. send_realtime turns it into an audio_stream_end signal, e.g. when
+the VAD gate decides the speaker has stopped.
+
+With a PipelineMetrics, get() records how long the message it returns
+waited ("uplink_audio_wait" from the oldest chunk in a batch,
+"uplink_video_wait") and put_audio() samples the audio depth.
+"""
+
+import asyncio
+import collections
+import time
+
+AUDIO_MAXSIZE = 32  # chunks; ~2 s of 1024-sample chunks at 16 kHz
+AUDIO_BYTES_PER_MS = 32  # 16 kHz, 16-bit mono
+COALESCE_MS = 100
+MIN_COALESCE_MS = 20
+MAX_COALESCE_MS = 200
+
+# Queued with put_audio_end(); tells the server the mic went quiet.
+AUDIO_STREAM_END = object()
+
+
+def is_video(msg):
+    """True for a frame message, as opposed to audio or AUDIO_STREAM_END."""
+    return msg is not AUDIO_STREAM_END and msg["mime_type"].startswith("image/")
+
+
+class OutboundMux:
+    """Priority queue feeding send_realtime: audio first, then the newest frame."""
+
+    def __init__(self, audio_maxsize=AUDIO_MAXSIZE, coalesce_ms=COALESCE_MS,
+                 bytes_per_ms=AUDIO_BYTES_PER_MS, metrics=None):
+        if coalesce_ms and not MIN_COALESCE_MS <= coalesce_ms <= MAX_COALESCE_MS:
+            raise ValueError(
+                f"coalesce_ms must be 0 (off) or between {MIN_COALESCE_MS} and {MAX_COALESCE_MS}"
+            )
+        self.audio_maxsize = audio_maxsize
+        self.coalesce_ms = coalesce_ms
+        self._coalesce_bytes = coalesce_ms * bytes_per_ms
+        self._audio = collections.deque()  # (queued_at, msg)
+        self._audio_bytes = 0
+        self._audio_ends = 0  # AUDIO_STREAM_END markers in _audio
+        self._video = None
+        self._video_queued_at = None
+        self._video_backlog = False  # the last put_video replaced an unsent frame
+        self._ready = asyncio.Event()
+        self.metrics = metrics
+
+        self.audio_queued = 0
+        self.audio_sent = 0
+        self.audio_sends = 0
+        self.audio_bytes_sent = 0
+        self.audio_dropped = 0
+        self.audio_high_water = 0
+        self.video_queued = 0
+        self.video_sent = 0
+        self.video_replaced = 0
+
+    def put_audio(self, msg):
+        if len(self._audio) >= self.audio_maxsize:
+            self._drop_oldest_audio()
+        self._audio.append((time.monotonic(), msg))
+        self._audio_bytes += len(msg["data"])
+        self.audio_queued += 1
+        self.audio_high_water = max(self.audio_high_water, len(self._audio))
+        if self.metrics is not None:
+            self.metrics.gauge("uplink_audio_depth", len(self._audio))
+        self._ready.set()
+
+    def put_audio_end(self):
+        if len(self._audio) >= self.audio_maxsize:
+            self._drop_oldest_audio()
+        self._audio.append((time.monotonic(), AUDIO_STREAM_END))
+        self._audio_ends += 1
+        self._ready.set()
+
+    def _drop_oldest_audio(self):
+        _, dropped = self._audio.popleft()
+        if dropped is AUDIO_STREAM_END:
+            self._audio_ends -= 1
+        else:
+            self._audio_bytes -= len(dropped["data"])
+            self.audio_dropped += 1
+
+    def put_video(self, msg):
+        self._video_backlog = self._video is not None
+        if self._video_backlog:
+            self.video_replaced += 1
+        self._video = msg
+        self._video_queued_at = time.monotonic()
+        self.video_queued += 1
+        self._ready.set()
+
+    async def get(self):
+        """Waits for the next message to send, audio first."""
+        while True:
+            if self._audio:
+                if self._audio[0][1] is AUDIO_STREAM_END:
+                    self._audio.popleft()
+                    self._audio_ends -= 1
+                    return AUDIO_STREAM_END
+                if self.coalesce_ms:
+                    msg = await self._get_audio_batch()
+                    if msg is not None:
+                        return msg
+                    continue
+                queued_at, msg = self._audio.popleft()
+                if self.metrics is not None:
+                    self.metrics.since("uplink_audio_wait", queued_at)
+                self._audio_bytes -= len(msg["data"])
+                self._count_audio_send(1, len(msg["data"]))
+                return msg
+            if self._video is not None:
+                msg, self._video = self._video, None
+                if self.metrics is not None:
+                    self.metrics.since("uplink_video_wait", self._video_queued_at)
+                self.video_sent += 1
+                return msg
+            self._ready.clear()
+            await self._ready.wait()
+
+    async def _get_audio_batch(self):
+        deadline = self._audio[0][0] + self.coalesce_ms / 1000
+        # Don't hold audio back waiting for more once the speaker has stopped.
+        while self._audio_bytes < self._coalesce_bytes and not self._audio_ends:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                break
+
+        oldest = self._audio[0][0] if self._audio else None
+        msgs = []
+        while self._audio and self._audio[0][1] is not AUDIO_STREAM_END:
+            msgs.append(self._audio.popleft()[1])
+        if not msgs:
+            # Everything we were waiting on got dropped while we waited.
+            return None
+        if self.metrics is not None:
+            self.metrics.since("uplink_audio_wait", oldest)
+        data = b"".join(msg["data"] for msg in msgs)
+        self._audio_bytes -= len(data)
+        self._count_audio_send(len(msgs), len(data))
+        return {"data": data, "mime_type": msgs[0]["mime_type"]}
+
+    def _count_audio_send(self, chunks, nbytes):
+        self.audio_sent += chunks
+        self.audio_sends += 1
+        self.audio_bytes_sent += nbytes
+
+    def fill(self):
+        """How backed up the uplink is, from 0.0 to 1.0, for the frame scheduler.
+
+        A frame still waiting in the video slot when the next one is captured
+        counts as full. That is decided in put_video(), since the capture
+        loops call fill() right after queueing their own frame.
+        """
+        if self._video_backlog:
+            return 1.0
+        return len(self._audio) / self.audio_maxsize
+
+    def stats(self):
+        return {
+            "audio_queued": self.audio_queued,
+            "audio_sent": self.audio_sent,
+            "audio_sends": self.audio_sends,
+            "avg_audio_bytes_per_send": self.audio_bytes_sent // (self.audio_sends or 1),
+            "audio_dropped": self.audio_dropped,
+            "audio_high_water": self.audio_high_water,
+            "video_queued": self.video_queued,
+            "video_sent": self.video_sent,
+            "video_replaced": self.video_replaced,
+        }
@@ -0,0 +1,431 @@
+"""
+## Voice activity detection
+webrtcvad helpers shared by openai-whisper.py and the Live agents.
+
+- SpeechClassifier wraps webrtcvad.Vad. It accepts chunks of any length and
+  classifies them in 10/20/30 ms frames, carrying the remainder over to the
+  next call (the Live agents read 1024-sample chunks, which aren't a whole
+  number of VAD frames).
+- VoiceActivityGate is an optional gate on the Live API uplink. It only lets
+  speech through, with some padding before and after so word edges aren't
+  clipped. When speech stops it signals an activity end, and during long
+  silences it lets an occasional chunk through as a keepalive.
+- SpeechSegmenter is the endpointing state machine from openai-whisper.py's
+  main(), turning a stream of (frame, is_speech) pairs into utterances.
+- AdaptiveEndpointer runs alongside SpeechSegmenter and ends an utterance
+  earlier than its fixed silence rule when the pause looks final.
+"""
+
+import collections
+import math
+import re
+import time
+
+import numpy as np
+import webrtcvad
+
+FRAME_DURATION_MS = 30  # webrtcvad supports 10, 20 or 30 ms frames
+VAD_AGGRESSIVENESS = 0  # 0 (least aggressive) to 3 (most aggressive)
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+START_RATIO = 0.8  # voiced share of the window that starts an utterance
+END_RATIO = 0.9  # unvoiced share of the window that ends it
+INITIAL_UTTERANCE_S = 30
+SILENCE_THRESHOLD_MS = 700  # the fixed rule's pause: how long a silence ends an utterance
+
+PAUSE_QUANTILE = 0.95  # share of the speaker's mid-answer pauses to wait out
+PAUSE_HISTORY = 200  # pauses remembered per session
+MIN_PAUSES = 5  # pauses needed before the learned distribution is trusted
+MIN_PAUSE_MS = 90  # shorter silences are VAD flicker, not pauses
+PAUSE_MARGIN_MS = 60
+MIN_ENDPOINT_MS = 240
+PUNCTUATION_FACTOR = 0.6  # partial transcript ends a sentence
+ENERGY_FACTOR = 0.8  # speech trailed off before the pause
+ENERGY_DROP = 0.5  # trailing RMS below this share of the utterance's counts as trailing off
+TRAILING_FRAMES = 5
+
+PRE_SPEECH_PAD_MS = 300
+POST_SPEECH_PAD_MS = 500
+KEEPALIVE_INTERVAL = 5.0  # seconds
+
+
+class SpeechClassifier:
+    """webrtcvad.Vad that accepts arbitrary-length 16-bit mono PCM chunks."""
+
+    def __init__(self, rate, aggressiveness=VAD_AGGRESSIVENESS, frame_ms=FRAME_DURATION_MS):
+        self.rate = rate
+        self.frame_bytes = rate * frame_ms // 1000 * SAMPLE_WIDTH
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._carry = b""
+
+    def is_speech(self, frame):
+        """Classifies exactly one VAD frame."""
+        return self._vad.is_speech(frame, self.rate)
+
+    def classify(self, chunk):
+        """Returns (speech_frames, total_frames) for the whole frames in chunk.
+
+        Bytes that don't fill a frame are kept and prepended to the next chunk.
+        """
+        data = self._carry + chunk if self._carry else chunk
+        view = memoryview(data)
+        usable = len(data) - len(data) % self.frame_bytes
+        speech = 0
+        for offset in range(0, usable, self.frame_bytes):
+            if self._vad.is_speech(view[offset:offset + self.frame_bytes].tobytes(), self.rate):
+                speech += 1
+        self._carry = bytes(view[usable:])
+        return speech, usable // self.frame_bytes
+
+    def reset(self):
+        self._carry = b""
+
+
+GateDecision = collections.namedtuple("GateDecision", ["chunks", "activity_end"])
+
+
+class VoiceActivityGate:
+    """Drops silent mic chunks from the Live uplink, keeping speech plus padding."""
+
+    def __init__(self, rate, chunk_ms, aggressiveness=VAD_AGGRESSIVENESS,
+                 pre_pad_ms=PRE_SPEECH_PAD_MS, post_pad_ms=POST_SPEECH_PAD_MS,
+                 keepalive_interval=KEEPALIVE_INTERVAL):
+        self.classifier = SpeechClassifier(rate, aggressiveness)
+        self.chunk_ms = chunk_ms
+        self.post_pad_ms = post_pad_ms
+        self.keepalive_interval = keepalive_interval
+
+        self._preroll = collections.deque(maxlen=max(1, round(pre_pad_ms / chunk_ms)))
+        self._speaking = False
+        self._silence_ms = 0
+        self._last_sent = None
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.activity_ends = 0
+        self.keepalives = 0
+
+    def process(self, chunk, now=None):
+        """Feeds one mic chunk; returns the chunks to send and whether speech just ended."""
+        if now is None:
+            now = time.monotonic()
+        if self._last_sent is None:
+            self._last_sent = now
+        self.bytes_in += len(chunk)
+        speech, _ = self.classifier.classify(chunk)
+
+        chunks = []
+        activity_end = False
+        if speech:
+            if not self._speaking:
+                # Send the lead-in we held back, so the first syllable isn't clipped.
+                chunks.extend(self._preroll)
+                self._preroll.clear()
+                self._speaking = True
+            self._silence_ms = 0
+            chunks.append(chunk)
+        elif self._speaking:
+            self._silence_ms += self.chunk_ms
+            if self._silence_ms <= self.post_pad_ms:
+                chunks.append(chunk)
+            else:
+                self._speaking = False
+                activity_end = True
+                self.activity_ends += 1
+                self._preroll.append(chunk)
+        elif now - self._last_sent >= self.keepalive_interval:
+            self.keepalives += 1
+            chunks.append(chunk)
+        else:
+            self._preroll.append(chunk)
+
+        if chunks:
+            self._last_sent = now
+            self.bytes_out += sum(len(c) for c in chunks)
+        return GateDecision(chunks, activity_end)
+
+    def reset(self):
+        """Forgets any speech in progress, e.g. between answers."""
+        self._preroll.clear()
+        self._speaking = False
+        self._silence_ms = 0
+        self._last_sent = None
+        self.classifier.reset()
+
+    def stats(self):
+        suppressed = self.bytes_in - self.bytes_out
+        return {
+            "suppressed_pct": round(100 * suppressed / self.bytes_in, 1) if self.bytes_in else 0.0,
+            "activity_ends": self.activity_ends,
+            "keepalives": self.keepalives,
+        }
+
+
+class SpeechSegmenter:
+    """Splits a stream of VAD-labelled frames into utterances.
+
+    Same rules as the original loop in openai-whisper.py: start once more than
+    start_ratio of the last window_frames frames are voiced, keeping those
+    frames as lead-in, and end once more than end_ratio of the window since
+    then is unvoiced. The bookkeeping is O(1) per frame. Voiced counts are
+    updated on push/evict instead of recounted over the whole window, and
+    audio lives in a preallocated int16 ring plus a growable utterance
+    buffer instead of lists of bytes. Frames are copied in through byte
+    memoryviews over those arrays, so nothing is allocated per frame.
+    """
+
+    def __init__(self, frame_samples, window_frames, start_ratio=START_RATIO,
+                 end_ratio=END_RATIO, rate=16000):
+        self.frame_samples = frame_samples
+        self.window_frames = window_frames
+        self._frame_bytes = frame_samples * SAMPLE_WIDTH
+        self._start_threshold = start_ratio * window_frames
+        self._end_threshold = end_ratio * window_frames
+
+        self._ring = np.zeros(window_frames * frame_samples, dtype=np.int16)
+        self._ring_bytes = memoryview(self._ring).cast("B")
+        self._voiced = [False] * window_frames
+        self._pos = 0
+        self._count = 0
+        self._num_voiced = 0
+
+        self._utterance = np.empty(INITIAL_UTTERANCE_S * rate, dtype=np.int16)
+        self._utterance_bytes = memoryview(self._utterance).cast("B")
+        self._length = 0  # in bytes
+
+        self.triggered = False
+        self.speech_started = False  # True only for the push() that triggered
+
+    def _push_window(self, is_speech):
+        pos = self._pos
+        if self._count == self.window_frames:
+            self._num_voiced -= self._voiced[pos]  # bools count as 0/1
+        else:
+            self._count += 1
+        self._voiced[pos] = is_speech
+        self._num_voiced += is_speech
+        self._pos = pos + 1 if pos + 1 < self.window_frames else 0
+        return pos
+
+    def _clear_window(self):
+        self._pos = 0
+        self._count = 0
+        self._num_voiced = 0
+
+    def _append(self, data):
+        end = self._length + len(data)
+        if end > len(self._utterance_bytes):
+            grown = np.empty(max(end, 2 * len(self._utterance_bytes)) // SAMPLE_WIDTH, dtype=np.int16)
+            grown_bytes = memoryview(grown).cast("B")
+            grown_bytes[:self._length] = self._utterance_bytes[:self._length]
+            self._utterance, self._utterance_bytes = grown, grown_bytes
+        self._utterance_bytes[self._length:end] = data
+        self._length = end
+
+    def push(self, frame, is_speech):
+        """Feeds one frame of 16-bit PCM bytes (frame_samples long).
+
+        Returns the finished utterance as an int16 array when this frame ends
+        one, otherwise None.
+        """
+        self.speech_started = False
+        if not self.triggered:
+            pos = self._push_window(is_speech)
+            offset = pos * self._frame_bytes
+            self._ring_bytes[offset:offset + self._frame_bytes] = frame
+            if self._num_voiced > self._start_threshold:
+                self.triggered = True
+                self.speech_started = True
+                # Lead-in: the window's frames, oldest first.
+                oldest = (self._pos - self._count) % self.window_frames * self._frame_bytes
+                size = self._count * self._frame_bytes
+                first = min(size, len(self._ring_bytes) - oldest)
+                self._append(self._ring_bytes[oldest:oldest + first])
+                self._append(self._ring_bytes[:size - first])
+                self._clear_window()
+            return None
+
+        self._append(frame)
+        # Only the voiced flags matter while triggered; the audio is already
+        # in the utterance buffer.
+        self._push_window(is_speech)
+        if self._count - self._num_voiced > self._end_threshold:
+            return self.finish()
+        return None
+
+    def frames_to_end(self):
+        """Unvoiced frames the fixed rule still needs to end the utterance."""
+        count, unvoiced, pos = self._count, self._count - self._num_voiced, self._pos
+        for frames in range(1, self.window_frames + 1):
+            if count == self.window_frames:
+                unvoiced -= not self._voiced[pos]
+            else:
+                count += 1
+            unvoiced += 1
+            pos = pos + 1 if pos + 1 < self.window_frames else 0
+            if unvoiced > self._end_threshold:
+                return frames
+        return self.window_frames
+
+    def current(self):
+        """View of the utterance collected so far (valid until the next push)."""
+        return self._utterance[:self._length // SAMPLE_WIDTH]
+
+    def finish(self):
+        """Ends the current utterance now and returns it (empty if none)."""
+        utterance = self.current().copy()
+        self._length = 0
+        self.triggered = False
+        self._clear_window()
+        return utterance
+
+
+_SENTENCE_END = re.compile(r"[.?!][\"')\]]*\s*$")
+
+
+class AdaptiveEndpointer:
+    """Ends utterances early when the trailing silence looks final.
+
+    SpeechSegmenter waits for ~630 ms of silence after every utterance. This
+    learns how long the speaker pauses mid-answer (silences that were followed
+    by more speech), and ends the utterance once the current silence is longer
+    than PAUSE_QUANTILE of those. Two cues shorten the wait further:
+
+    - the latest partial transcript (set_partial) ends with . ? or !
+    - the last voiced frames were much quieter than the utterance average
+
+    The wait is capped at max_silence_ms, and the segmenter's own rule keeps
+    running, so an utterance never ends later than before. If speech resumes
+    within the time an early end saved, the cut was premature. That silence is
+    then recorded as a pause, which makes later endpoints more conservative.
+
+    Call start() when the segmenter triggers, push() for every other frame,
+    and end() when an utterance ends, passing the frames an early end saved.
+    """
+
+    def __init__(self, frame_ms=FRAME_DURATION_MS, max_silence_ms=SILENCE_THRESHOLD_MS,
+                 min_silence_ms=MIN_ENDPOINT_MS, quantile=PAUSE_QUANTILE, history=PAUSE_HISTORY,
+                 min_pauses=MIN_PAUSES):
+        self.frame_ms = frame_ms
+        self.max_frames = max_silence_ms // frame_ms
+        self.min_frames = math.ceil(min_silence_ms / frame_ms)
+        self.quantile = quantile
+        self.min_pauses = min_pauses
+        self._min_pause_frames = math.ceil(MIN_PAUSE_MS / frame_ms)
+        self._margin_frames = math.ceil(PAUSE_MARGIN_MS / frame_ms)
+        self.pauses = collections.deque(maxlen=history)  # in frames
+        self._learned = None  # cached quantile of pauses
+
+        self._active = False
+        self._silence = 0  # current run of unvoiced frames
+        self._mean_rms = 0.0
+        self._voiced = 0
+        self._trailing = collections.deque(maxlen=TRAILING_FRAMES)
+        self._partial = ""
+        self._watch = 0  # frames left in which resumed speech means a premature cut
+        self._watch_silence = 0
+        self._cues = ()
+
+        self.utterances = 0
+        self.early_endpoints = 0
+        self.premature_cuts = 0
+        self.saved_ms = 0  # total over early_endpoints
+        self.last_endpoint = None
+
+    def start(self):
+        """A new utterance has started."""
+        self._active = True
+        self._silence = 0
+        self._mean_rms = 0.0
+        self._voiced = 0
+        self._trailing.clear()
+        self._partial = ""
+        self._watch = 0
+
+    def set_partial(self, text):
+        """Latest partial transcript of the utterance in progress."""
+        self._partial = text
+
+    def required_frames(self):
+        """Trailing silence, in frames, that ends the utterance right now."""
+        if len(self.pauses) >= self.min_pauses:
+            if self._learned is None:
+                pauses = sorted(self.pauses)
+                self._learned = pauses[min(len(pauses) - 1, int(self.quantile * len(pauses)))]
+            frames = min(self.max_frames, self._learned + self._margin_frames)
+        else:
+            frames = self.max_frames
+        cues = []
+        factor = 1.0
+        if _SENTENCE_END.search(self._partial):
+            cues.append("punctuation")
+            factor *= PUNCTUATION_FACTOR
+        if self._voiced > len(self._trailing) and self._trailing and \
+                sum(self._trailing) / len(self._trailing) < ENERGY_DROP * self._mean_rms:
+            cues.append("energy")
+            factor *= ENERGY_FACTOR
+        self._cues = tuple(cues)
+        return max(self.min_frames, math.ceil(frames * factor))
+
+    def _record_pause(self, frames):
+        self.pauses.append(frames)
+        self._learned = None
+
+    def push(self, frame, is_speech):
+        """Feeds one frame. Returns True if the utterance should end now."""
+        if not self._active:
+            if self._watch:
+                if is_speech:
+                    # Speech came back before the fixed rule would have ended
+                    # the utterance, so this silence was only a pause.
+                    self.premature_cuts += 1
+                    self._record_pause(self._watch_silence)
+                    self._watch = 0
+                else:
+                    self._watch -= 1
+                    self._watch_silence += 1
+            return False
+
+        if is_speech:
+            if self._silence >= self._min_pause_frames:
+                self._record_pause(self._silence)
+            self._silence = 0
+            samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+            rms = float(np.sqrt(np.mean(samples * samples)))
+            self._voiced += 1
+            self._mean_rms += (rms - self._mean_rms) / self._voiced
+            self._trailing.append(rms)
+            return False
+
+        self._silence += 1
+        return self._silence >= self.required_frames()
+
+    def end(self, saved_frames=0):
+        """The utterance ended; saved_frames > 0 if push() ended it early.
+
+        Returns (and keeps in last_endpoint) a summary for logging.
+        """
+        self.utterances += 1
+        self.last_endpoint = {
+            "silence_ms": self._silence * self.frame_ms,
+            "saved_ms": saved_frames * self.frame_ms,
+            "cues": self._cues if saved_frames else (),
+        }
+        if saved_frames:
+            self.early_endpoints += 1
+            self.saved_ms += saved_frames * self.frame_ms
+            self._watch = saved_frames
+            self._watch_silence = self._silence
+        self._active = False
+        self._silence = 0
+        return self.last_endpoint
+
+    def stats(self):
+        pauses = sorted(self.pauses)
+        return {
+            "utterances": self.utterances,
+            "early_endpoints": self.early_endpoints,
+            "premature_cuts": self.premature_cuts,
+            "mean_saved_ms": round(self.saved_ms / self.early_endpoints) if self.early_endpoints else 0,
+            "pause_p95_ms": pauses[int(0.95 * (len(pauses) - 1))] * self.frame_ms if pauses else None,
+        }
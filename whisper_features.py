@@ -0,0 +1,168 @@
+"""
+## Incremental Whisper features
+Computes Whisper's log-mel spectrogram while the utterance is being spoken.
+
+whisper.transcribe() computes the log-mel of the whole utterance after speech
+ends, which puts the STFT on the critical path. IncrementalLogMel takes the
+30 ms VAD frames as they arrive and computes every STFT frame whose 400-sample
+window is complete, in vectorized blocks (numpy rfft over a strided view). At
+end of speech only the last couple of frames, the global max clamp and the
+scaling are left, and the decoder can start straight away:
+
+    features = IncrementalLogMel(n_mels=model.dims.n_mels)
+    ...                      # features.feed(frame) for every frame of speech
+    text = decode_features(model, features.finish(), fp16)
+
+The output matches whisper.audio.log_mel_spectrogram as transcribe() calls it
+(reflect padding at the start, 30 s of zero padding at the end, and the
+content frames sliced out and padded to 3000 frames).
+
+decode_batch() keeps transcribe()'s safeguards around whisper.decode: it
+retries at rising temperatures when the text looks repetitive (compression
+ratio) or unlikely (average log-probability), and returns "" for segments
+the model thinks contain no speech, so silence and noise don't turn into
+hallucinated text.
+"""
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_FFT, N_FRAMES, SAMPLE_RATE, mel_filters
+
+PAD = N_FFT // 2
+INITIAL_SECONDS = 30
+
+# transcribe()'s defaults.
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+class IncrementalLogMel:
+    """Log-mel frames for one utterance, computed as its audio arrives."""
+
+    def __init__(self, n_mels=80):
+        self.n_mels = n_mels
+        self._filters = mel_filters("cpu", n_mels).numpy()
+        # torch.hann_window's default is the periodic window.
+        self._window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(N_FFT) / N_FFT)).astype(np.float32)
+        # _padded holds PAD reflected samples followed by the audio, i.e. the
+        # signal torch.stft(center=True) windows over. Both buffers are reused
+        # across utterances and only grow.
+        self._padded = np.zeros(PAD + INITIAL_SECONDS * SAMPLE_RATE + N_FFT, dtype=np.float32)
+        self._mel = np.empty((n_mels, N_FRAMES + 8), dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """Starts a new utterance."""
+        self._samples = 0
+        self._prefixed = False
+        self._frames = 0
+
+    @property
+    def samples(self):
+        return self._samples
+
+    def feed(self, pcm):
+        """Adds 16-bit PCM (bytes or int16 array) and computes any complete frames."""
+        if isinstance(pcm, (bytes, bytearray, memoryview)):
+            pcm = np.frombuffer(pcm, dtype=np.int16)
+        end = PAD + self._samples + len(pcm)
+        if end > len(self._padded):
+            grown = np.zeros(max(end, 2 * len(self._padded)), dtype=np.float32)
+            grown[:PAD + self._samples] = self._padded[:PAD + self._samples]
+            self._padded = grown
+        np.multiply(pcm, 1 / 32768.0, out=self._padded[PAD + self._samples:end], casting="unsafe")
+        self._samples += len(pcm)
+
+        if not self._prefixed:
+            if self._samples <= PAD:
+                return
+            # Reflect padding: padded[k] = audio[PAD - k] for k < PAD.
+            self._padded[:PAD] = self._padded[2 * PAD:PAD:-1]
+            self._prefixed = True
+        # Frame i needs padded[i*HOP : i*HOP + N_FFT].
+        available = (PAD + self._samples - N_FFT) // HOP_LENGTH + 1
+        self._compute(available)
+
+    def _compute(self, upto):
+        if upto <= self._frames:
+            return
+        start = self._frames * HOP_LENGTH
+        stop = (upto - 1) * HOP_LENGTH + N_FFT
+        windows = np.lib.stride_tricks.sliding_window_view(self._padded[start:stop], N_FFT)[::HOP_LENGTH]
+        spectrum = np.fft.rfft(windows * self._window, axis=-1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        mel = self._filters @ power.T
+        if upto > self._mel.shape[1]:
+            grown = np.empty((self.n_mels, max(upto, 2 * self._mel.shape[1])), dtype=np.float32)
+            grown[:, :self._frames] = self._mel[:, :self._frames]
+            self._mel = grown
+        np.log10(np.maximum(mel, 1e-10), out=self._mel[:, self._frames:upto])
+        self._frames = upto
+
+    def finish(self):
+        """Returns the (n_mels, 3000) log-mel of the utterance, ready for decoding.
+
+        Returns None for utterances longer than 30 s (or too short to pad),
+        which should go through transcribe() instead.
+        """
+        content = self._samples // HOP_LENGTH
+        if content > N_FRAMES or not self._prefixed:
+            return None
+        # transcribe() pads the audio with zeros, so the frames past the end
+        # see silence; they're computed too because they count towards the max.
+        tail = PAD + self._samples + N_FFT
+        if tail > len(self._padded):
+            grown = np.zeros(tail, dtype=np.float32)
+            grown[:PAD + self._samples] = self._padded[:PAD + self._samples]
+            self._padded = grown
+        else:
+            self._padded[PAD + self._samples:tail] = 0
+        self._compute((self._samples + PAD) // HOP_LENGTH + 1)
+
+        log_spec = self._mel[:, :content]
+        peak = max(self._mel[:, :self._frames].max(), -10.0)
+        out = np.zeros((self.n_mels, N_FRAMES), dtype=np.float32)
+        np.maximum(log_spec, peak - 8.0, out=out[:, :content])
+        out[:, :content] += 4.0
+        out[:, :content] /= 4.0
+        return out
+
+
+def _needs_fallback(result):
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+        return False  # transcribe() doesn't retry what it's about to skip as silence
+    return (result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            or result.avg_logprob < LOGPROB_THRESHOLD)
+
+
+def _is_silence(result):
+    return result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob <= LOGPROB_THRESHOLD
+
+
+def decode_batch(model, mels, fp16=False):
+    """Decodes a (batch, n_mels, 3000) log-mel tensor with transcribe()'s fallback.
+
+    Returns one text per segment. Segments whose first decode fails the
+    compression-ratio or log-probability checks are decoded again together
+    at the next temperature; no-speech segments come back as "".
+    """
+    results = [None] * len(mels)
+    pending = list(range(len(mels)))
+    for temperature in TEMPERATURES:
+        options = whisper.DecodingOptions(language="en", fp16=fp16, without_timestamps=True,
+                                          temperature=temperature)
+        decoded = whisper.decode(model, mels[pending], options)
+        for i, result in zip(pending, decoded):
+            results[i] = result
+        pending = [i for i, result in zip(pending, decoded) if _needs_fallback(result)]
+        if not pending:
+            break
+    return ["" if _is_silence(result) else result.text.strip() for result in results]
+
+
+def decode_features(model, mel, fp16=False):
+    """Runs just the Whisper decoder on a precomputed (n_mels, 3000) log-mel."""
+    return decode_batch(model, torch.from_numpy(mel)[None].to(model.device), fp16)[0]
@@ -0,0 +1,51 @@
+"""
+## Whisper runtime
+Loads the Whisper model for CPU-only boxes.
+
+Without a GPU, DEVICE falls back to "cpu", fp16 is off, and small.en spends
+most of each utterance in fp32 matmuls. load_whisper() can instead apply int8
+dynamic quantization to the model's Linear layers (attention projections and
+MLPs, which dominate encoder and decoder time). Weights are stored as int8,
+and activations are quantized on the fly. Convolutions, layer norms and the
+token embedding stay in fp32. It also sets torch's intra-op thread count,
+which defaults to every core and oversubscribes when several workers run.
+
+    model = load_whisper("small.en", "cpu", precision="int8", threads=4)
+
+benchmarks/bench_whisper_cpu.py compares sizes and precisions for real-time
+factor, memory and word error rate.
+"""
+
+import torch
+import whisper
+from whisper import load_model
+
+PRECISIONS = ("fp32", "int8")
+
+
+def model_device(device, precision):
+    """Quantized kernels are CPU-only, so int8 always runs on the CPU."""
+    return "cpu" if precision == "int8" else device
+
+
+def quantize_int8(model):
+    """Applies int8 dynamic quantization to every Linear layer of a Whisper model."""
+    for module in model.modules():
+        # whisper.model.Linear only overrides forward() to cast the weights to
+        # the input dtype, a no-op in fp32. quantize_dynamic matches on exact
+        # types, so turn them back into plain nn.Linear first.
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_whisper(model_size, device, precision="fp32", threads=None):
+    """Loads a Whisper model at the given precision, optionally pinning torch's thread count."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}")
+    if threads:
+        torch.set_num_threads(threads)
+    model = load_model(model_size, device=model_device(device, precision))
+    if precision == "int8":
+        model = quantize_int8(model.eval())
+    return model
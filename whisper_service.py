@@ -0,0 +1,316 @@
+"""
+## Whisper transcription service
+One warm Whisper model shared by many microphones, over a Unix socket.
+
+Every run of openai-whisper.py used to pay the full load_model() cost and
+serve exactly one microphone. This service loads the model once and accepts
+utterances from any number of clients:
+
+- messages are a 4-byte big-endian header length, a JSON header, and an
+  optional payload (16 kHz mono int16 PCM for transcription requests),
+- utterances that arrive within batch_window_ms of each other are decoded
+  together: Whisper always pads its input to 30 s, so the log-mels stack into
+  one (batch, n_mels, 3000) tensor and run through a single forward pass,
+  with transcribe()'s temperature fallback and no-speech check
+  (whisper_features.decode_batch),
+- per-client latency histograms (pipeline_metrics.LogLinearHistogram) and
+  batch-size counts are kept and served by the "stats" request (and printed
+  on exit).
+
+Run it, then point openai-whisper.py at it:
+
+    python whisper_service.py --socket /tmp/whisper.sock --precision int8
+    python openai-whisper.py --service /tmp/whisper.sock
+    python whisper_service.py --socket /tmp/whisper.sock --stats
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import json
+import os
+import socket
+import stat
+import struct
+import threading
+import time
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_SAMPLES, log_mel_spectrogram, pad_or_trim
+
+from pipeline_metrics import LogLinearHistogram
+from whisper_features import decode_batch
+from whisper_runtime import PRECISIONS, load_whisper, model_device
+
+SOCKET_PATH = "/tmp/whisper.sock"
+RATE = 16000
+BATCH_WINDOW_MS = 20
+MAX_BATCH = 8
+
+HEADER = struct.Struct("!I")
+
+
+def encode_message(header, payload=b""):
+    body = json.dumps(dict(header, bytes=len(payload))).encode()
+    return HEADER.pack(len(body)) + body + payload
+
+
+async def read_message(reader):
+    """Reads one message from a StreamReader. Returns (None, None) on EOF."""
+    try:
+        size = HEADER.unpack(await reader.readexactly(HEADER.size))[0]
+    except asyncio.IncompleteReadError:
+        return None, None
+    header = json.loads(await reader.readexactly(size))
+    payload = await reader.readexactly(header.get("bytes", 0))
+    return header, payload
+
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    while view:
+        n = sock.recv_into(view)
+        if not n:
+            raise ConnectionError("transcription service closed the connection")
+        view = view[n:]
+    return buffer
+
+
+def recv_message(sock):
+    size = HEADER.unpack(_recv_exact(sock, HEADER.size))[0]
+    header = json.loads(_recv_exact(sock, size))
+    return header, bytes(_recv_exact(sock, header.get("bytes", 0)))
+
+
+def remove_stale_socket(path):
+    """Unlinks a socket left behind by a service that's no longer running.
+
+    Refuses to touch a path that isn't a socket, or one that a running
+    service still accepts connections on.
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise RuntimeError(f"a transcription service is already listening on {path}")
+
+
+class TranscriptionService:
+    """Batches concurrent transcription requests onto one warm model."""
+
+    def __init__(self, model, fp16=False, batch_window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.model = model
+        self.fp16 = fp16
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        # The model only ever runs on this one thread, off the event loop.
+        self._executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="whisper")
+        self._queue = None
+
+        self.requests = 0
+        self.batches = 0
+        self.batch_sizes = collections.Counter()
+        self.latency = collections.defaultdict(LogLinearHistogram)
+
+    def _mel(self, audio):
+        # The same features transcribe() computes for a clip under 30 s.
+        content = len(audio) // HOP_LENGTH
+        mel = log_mel_spectrogram(audio, self.model.dims.n_mels, padding=N_SAMPLES)[:, :content]
+        return pad_or_trim(mel)
+
+    def _decode_batch(self, audios):
+        """Executor body: one padded forward pass for every clip that fits in 30 s."""
+        texts = [None] * len(audios)
+        short = [i for i, audio in enumerate(audios) if len(audio) <= N_SAMPLES]
+        if short:
+            mels = torch.stack([self._mel(audios[i]) for i in short]).to(self.model.device)
+            for i, text in zip(short, decode_batch(self.model, mels, self.fp16)):
+                texts[i] = text
+        for i, audio in enumerate(audios):
+            if texts[i] is None:
+                # Longer clips need transcribe()'s sliding 30 s windows.
+                texts[i] = whisper.transcribe(self.model, audio, language="en", fp16=self.fp16)["text"].strip()
+        return texts
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+            self.batches += 1
+            self.batch_sizes[len(batch)] += 1
+            try:
+                texts = await loop.run_in_executor(self._executor, self._decode_batch, [a for a, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), text in zip(batch, texts):
+                if not future.done():
+                    future.set_result((text, len(batch)))
+
+    async def transcribe(self, audio):
+        """Queues float32 audio for the next batch. Returns (text, batch_size)."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((audio, future))
+        return await future
+
+    async def _handle(self, reader, writer):
+        client = "anonymous"
+        try:
+            while True:
+                header, payload = await read_message(reader)
+                if header is None:
+                    break
+                client = header.get("client", client)
+                op = header.get("op", "transcribe")
+                if op == "stats":
+                    response = {"stats": self.stats()}
+                elif op == "transcribe":
+                    received = time.monotonic()
+                    audio = np.frombuffer(payload, dtype=np.int16).astype(np.float32) / 32768.0
+                    try:
+                        text, batch_size = await self.transcribe(audio)
+                    except Exception as e:
+                        response = {"id": header.get("id"), "error": str(e)}
+                    else:
+                        latency = time.monotonic() - received
+                        latency_ms = 1000 * latency
+                        self.requests += 1
+                        self.latency[client].record(latency)
+                        response = {"id": header.get("id"), "text": text,
+                                    "batch_size": batch_size, "latency_ms": round(latency_ms, 1)}
+                else:
+                    response = {"id": header.get("id"), "error": f"unknown op {op!r}"}
+                writer.write(encode_message(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path=SOCKET_PATH):
+        remove_stale_socket(path)
+        self._queue = asyncio.Queue()
+        server = await asyncio.start_unix_server(self._handle, path)
+        batcher = asyncio.create_task(self._batcher())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self._executor.shutdown(wait=False)
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "batch_size": {
+                "mean": round(sum(size * n for size, n in self.batch_sizes.items()) / self.batches, 2)
+                if self.batches else None,
+                "counts": {str(size): n for size, n in sorted(self.batch_sizes.items())},
+            },
+            "latency": {client: h.snapshot() for client, h in self.latency.items()},
+        }
+
+
+class WhisperServiceClient:
+    """Blocking client; each thread gets its own connection, so worker
+    threads can have requests in flight at the same time."""
+
+    def __init__(self, path=SOCKET_PATH, client=None):
+        self.path = path
+        self.client = client or f"pid-{os.getpid()}"
+        self._local = threading.local()
+        self._sockets = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+
+    def _socket(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            self._local.sock = sock
+            with self._lock:
+                self._sockets.append(sock)
+        return sock
+
+    def _request(self, header, payload=b""):
+        sock = self._socket()
+        sock.sendall(encode_message(dict(header, client=self.client, id=next(self._ids)), payload))
+        response, _ = recv_message(sock)
+        if "error" in response:
+            raise RuntimeError(f"transcription service: {response['error']}")
+        return response
+
+    def transcribe(self, audio):
+        """Transcribes 16 kHz mono int16 PCM (bytes or array)."""
+        payload = audio.tobytes() if isinstance(audio, np.ndarray) else bytes(audio)
+        return self._request({"op": "transcribe"}, payload)["text"]
+
+    def stats(self):
+        return self._request({"op": "stats"})["stats"]
+
+    def close(self):
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            sock.close()
+
+
+def main(path=SOCKET_PATH, model_size="small.en", precision="fp32", threads=None,
+         batch_window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Loading Whisper model '{model_size}' ({precision}) on device '{model_device(device, precision)}'...")
+    model = load_whisper(model_size, device, precision, threads)
+    service = TranscriptionService(model, fp16=model_device(device, precision) == "cuda",
+                                   batch_window_ms=batch_window_ms, max_batch=max_batch)
+    print(f"Serving on {path} (press Ctrl+C to exit)")
+    try:
+        asyncio.run(service.serve(path))
+    except KeyboardInterrupt:
+        print("\nExiting.")
+    finally:
+        print(json.dumps(service.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--model", default="small.en")
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS,
+                        help="how long to wait for more utterances before decoding a batch")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--stats", action="store_true",
+                        help="print a running service's stats and exit")
+    args = parser.parse_args()
+    if args.stats:
+        client = WhisperServiceClient(args.socket, client="stats")
+        print(json.dumps(client.stats(), indent=2))
+        client.close()
+    else:
+        main(args.socket, args.model, args.precision, args.threads, args.batch_window_ms, args.max_batch)
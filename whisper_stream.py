@@ -0,0 +1,117 @@
+"""
+## Streaming Whisper transcription
+Partial transcripts while the candidate is still talking.
+
+openai-whisper.py used to call transcribe() once, after 700 ms of silence, on
+the whole utterance. A 60-second answer showed nothing for a minute and then
+sat through one long decode. StreamingTranscriber re-decodes a sliding window
+of the utterance every step_s seconds of new audio, and uses the
+"local agreement" policy to commit text:
+
+- a word is committed once two consecutive hypotheses agree on it (and on
+  everything before it),
+- the window then starts at the end of the last committed word, so committed
+  audio is never decoded again, and the committed text is passed as the
+  prompt to keep the decoder on track,
+- if the uncommitted window grows past max_window_s, everything but the
+  last few seconds is committed anyway, to stay inside Whisper's 30 s input.
+
+At the end of the utterance, finish() decodes the remaining tail once more and
+returns the full text.
+"""
+
+import collections
+import re
+
+import numpy as np
+from whisper import transcribe
+
+RATE = 16000
+STEP_S = 1.0
+MAX_WINDOW_S = 20.0
+FORCE_KEEP_S = 5.0  # tail left uncommitted when the window is forced forward
+PROMPT_WORDS = 50
+
+Word = collections.namedtuple("Word", ["text", "start", "end"])  # seconds into the utterance
+Partial = collections.namedtuple("Partial", ["committed", "tentative"])
+
+
+def _normalize(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class StreamingTranscriber:
+    """Incrementally transcribes one utterance at a time."""
+
+    def __init__(self, model, rate=RATE, step_s=STEP_S, max_window_s=MAX_WINDOW_S, fp16=False):
+        self.model = model
+        self.rate = rate
+        self.step_samples = int(step_s * rate)
+        self.max_window_samples = int(max_window_s * rate)
+        self.fp16 = fp16
+        self.reset()
+
+    def reset(self):
+        self.committed = []
+        self._hypothesis = []  # uncommitted words from the last decode
+        self._offset = 0  # window start, in samples
+        self._decoded_to = 0  # utterance length at the last decode
+        self.decodes = 0
+
+    def _decode(self, audio):
+        window = audio[self._offset:].astype(np.float32) / 32768.0
+        prompt = "".join(w.text for w in self.committed[-PROMPT_WORDS:]).strip() or None
+        result = transcribe(
+            self.model, window, language="en", fp16=self.fp16,
+            word_timestamps=True, initial_prompt=prompt,
+            condition_on_previous_text=False,
+        )
+        self.decodes += 1
+        start = self._offset / self.rate
+        return [
+            Word(w["word"], start + w["start"], start + w["end"])
+            for segment in result["segments"]
+            for w in segment.get("words", [])
+        ]
+
+    def _commit(self, words):
+        if not words:
+            return
+        self.committed.extend(words)
+        self._offset = max(self._offset, int(words[-1].end * self.rate))
+
+    def update(self, audio):
+        """Feeds the utterance so far (int16). Returns a Partial, or None if
+        there isn't a full step of new audio since the last decode."""
+        if len(audio) - self._decoded_to < self.step_samples:
+            return None
+        self._decoded_to = len(audio)
+        words = self._decode(audio)
+
+        agreed = 0
+        for old, new in zip(self._hypothesis, words):
+            if _normalize(old.text) != _normalize(new.text):
+                break
+            agreed += 1
+        self._commit(words[:agreed])
+        tentative = words[agreed:]
+
+        if len(audio) - self._offset > self.max_window_samples:
+            cutoff = (len(audio) - FORCE_KEEP_S * self.rate) / self.rate
+            forced = [w for w in tentative if w.end <= cutoff]
+            self._commit(forced)
+            tentative = tentative[len(forced):]
+
+        self._hypothesis = tentative
+        return Partial(self.text(), "".join(w.text for w in tentative).strip())
+
+    def text(self):
+        return "".join(w.text for w in self.committed).strip()
+
+    def finish(self, audio):
+        """Decodes whatever hasn't been committed and returns the final text."""
+        if len(audio) > self._offset:
+            self._commit(self._decode(audio))
+        text = self.text()
+        self.reset()
+        return text